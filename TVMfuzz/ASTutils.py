@@ -25,7 +25,7 @@ def getAllElementsFromAttrCallSubsName(value):
 
     return rcur
 
-def buildFullString(rcur, indent, surround):
+def buildFullString(ctx, rcur, indent, surround):
 
     fullstr = ''
     len_rcur = len(rcur)
@@ -39,32 +39,32 @@ def buildFullString(rcur, indent, surround):
             fullstr = buildAttributeString(ele, fullstr)
 
         elif isinstance(ele, ast.BinOp) or isinstance(ele, ast.UnaryOp):
-            param = recognizeMultiAssignment(ele, indent=indent)
-            rn = varNameGenerator(varnamesRead)
+            param = recognizeMultiAssignment(ctx, ele, indent=indent)
+            rn = varNameGenerator(ctx.varnamesRead, ctx.rng)
             varobject = pVar(rn)
-            dealWithStatement(param=param, varobjects=[varobject])
+            dealWithStatement(ctx, param=param, varobjects=[varobject])
             fullstr += rn
 
         elif isinstance(ele, ast.Subscript):
             if cnt < len_rcur:
-                fullstr = buildSubscriptString(ele, fullstr, indent)
+                fullstr = buildSubscriptString(ctx, ele, fullstr, indent)
             else:
-                return buildSubscriptString(ele, fullstr, indent, True)
+                return buildSubscriptString(ctx, ele, fullstr, indent, True)
 
         elif isinstance(ele, ast.Call):
             if cnt < len_rcur:
-                fullstr = buildCallString(ele, fullstr, indent, surround)
+                fullstr = buildCallString(ctx, ele, fullstr, indent, surround)
             else:
-                return buildCallString(ele, fullstr, indent, surround, True)
+                return buildCallString(ctx, ele, fullstr, indent, surround, True)
         
         elif isinstance(ele, ast.Constant):
             fullstr += '\'\'\'' + ele.value + '\'\'\''
 
     return fullstr    
 
-def buildCallString(ele, fullstr, indent, surround, rv=False):
+def buildCallString(ctx, ele, fullstr, indent, surround, rv=False):
 
-    params = fillInParams(ele.args, 
+    params = fillInParams(ctx, ele.args, 
                         ele.keywords, 
                         indent, 
                         surround)
@@ -78,10 +78,10 @@ def buildCallString(ele, fullstr, indent, surround, rv=False):
     if rv:
         return pfunc
 
-    name_func = varNameGenerator(varnamesRead)
+    name_func = varNameGenerator(ctx.varnamesRead, ctx.rng)
     varobject_func = pVar(name_func)
 
-    dealWithStatement(param=pfunc, varobjects=[varobject_func])
+    dealWithStatement(ctx, param=pfunc, varobjects=[varobject_func])
     
     fullstr = name_func
 
@@ -93,18 +93,18 @@ def buildNameString(ele, fullstr):
 def buildAttributeString(ele, fullstr):
     return fullstr+'.'+ele.attr
 
-def buildSubscriptString(ele, fullstr, indent, judge=False):
+def buildSubscriptString(ctx, ele, fullstr, indent, judge=False):
 
-    name = varNameGenerator(varnamesRead)
+    name = varNameGenerator(ctx.varnamesRead, ctx.rng)
     varobject = pVar(name)
     psubs = pSubs()
     psubs.add_prefix(pVar(fullstr))
     slice = ele.slice
-    rv = recognizeMultiAssignment(slice, outsideSlice=True)
+    rv = recognizeMultiAssignment(ctx, slice, outsideSlice=True)
 
     if isinstance(rv, pVar):
         fullstr += '[' + rv.name + ']' 
-        varnamesRead.add(rv.name)
+        ctx.varnamesRead.add(rv.name)
         psubs.add_content(rv)
     
     elif isinstance(rv, pNumber):
@@ -116,9 +116,9 @@ def buildSubscriptString(ele, fullstr, indent, judge=False):
         psubs.add_content(rv)
     
     elif isinstance(rv, pBinop) or isinstance(rv, pUop):
-        rn = varNameGenerator(varnamesRead)
+        rn = varNameGenerator(ctx.varnamesRead, ctx.rng)
         varobject = pVar(rn)
-        dealWithStatement(param=rv, varobjects=[varobject])
+        dealWithStatement(ctx, param=rv, varobjects=[varobject])
         psubs.add_content(varobject)
         fullstr += '[' + rn + ']'
 
@@ -143,9 +143,9 @@ def buildSubscriptString(ele, fullstr, indent, judge=False):
         fullstr += ']'
 
     else:
-        rn = varNameGenerator(varnamesRead)
+        rn = varNameGenerator(ctx.varnamesRead, ctx.rng)
         pvar = pVar(rn)
-        dealWithStatement(param=rv, varobjects=[pvar])
+        dealWithStatement(ctx, param=rv, varobjects=[pvar])
         fullstr += '[' + rn + ']'
         psubs.add_content(pvar)
 
@@ -154,24 +154,24 @@ def buildSubscriptString(ele, fullstr, indent, judge=False):
     if judge:
         return psubs
     
-    dealWithStatement(param=psubs, varobjects=[varobject])
+    dealWithStatement(ctx, param=psubs, varobjects=[varobject])
     fullstr = name
     return fullstr
 
-def nestplus(value, indent, surround):
+def nestplus(ctx, value, indent, surround):
 
     rcur = getAllElementsFromAttrCallSubsName(value)
     
-    return buildFullString(rcur, indent, surround)
+    return buildFullString(ctx, rcur, indent, surround)
 
 '''end'''
 
-def fillInParams(args_, keywords_, indent, surround):
+def fillInParams(ctx, args_, keywords_, indent, surround):
 
     params = []
     if args_:
         for arg in args_:
-            params.append(recognizeMultiAssignment(
+            params.append(recognizeMultiAssignment(ctx, 
                                             arg,
                                             outsideTuple=False, 
                                             outsideFunction=True, 
@@ -187,7 +187,7 @@ def fillInParams(args_, keywords_, indent, surround):
                     mod.set_input(**params)
                 '''
                 
-                pa = recognizeMultiAssignment(
+                pa = recognizeMultiAssignment(ctx, 
                                         keyw.value,
                                         outsideTuple=False, 
                                         outsideFunction=True, 
@@ -200,7 +200,7 @@ def fillInParams(args_, keywords_, indent, surround):
                 param = pKeyword()
                 param.add_keyWordStr(keyw.arg)
                 value = keyw.value
-                param.add_keywordContent(recognizeMultiAssignment(
+                param.add_keywordContent(recognizeMultiAssignment(ctx, 
                                                         value, 
                                                         outsideFunction=True, 
                                                         indent=indent,
@@ -208,35 +208,34 @@ def fillInParams(args_, keywords_, indent, surround):
                 params.append(param)
     return params 
 
-def judgeMutable(param):
+def judgeMutable(ctx, param):
     
     if param.Type == 'list' or param.Type == 'tuple':
         for c in param.content:
-            judgeMutable(c)
+            judgeMutable(ctx, c)
     elif param.Type == 'dict' or param.Type == 'const' or param.Type == 'variable':
-        global mutable
-        mutable = False
+        ctx.mutable = False
         return
     elif param.Type == 'number':
         return
     elif param.Type == 'keyword':
-        judgeMutable(param.keywordContent[0])
+        judgeMutable(ctx, param.keywordContent[0])
 
 '''recognizeMultiAssignment's components'''
-def recognizeNameAttr(value, 
+def recognizeNameAttr(ctx, value, 
                         indent,
                         surround):
 
-    name = nestplus(value, indent, surround)
+    name = nestplus(ctx, value, indent, surround)
     if name == None:
         raise Exception(Cyan('Expect string but receive None'))
     param = pVar(name)
     param.add_indent(indent)
     return param
 
-def recognizeSubs(value, indent, surround):
+def recognizeSubs(ctx, value, indent, surround):
 
-    return nestplus(value, indent, surround)
+    return nestplus(ctx, value, indent, surround)
     
 def recognizeConst(value, indent):
 
@@ -254,7 +253,7 @@ def recognizeConst(value, indent):
 
     return param
 
-def recognizeCall(value, 
+def recognizeCall(ctx, value, 
                   indent,
                   outsideFunction,
                   outsideList,
@@ -264,7 +263,7 @@ def recognizeCall(value,
                   outsideSet,
                   surround):
     
-    pfunc = nestplus(value, indent, surround)
+    pfunc = nestplus(ctx, value, indent, surround)
     pfunc.add_indent(indent)
 
     if outsideFunction or \
@@ -275,52 +274,52 @@ def recognizeCall(value,
                         outsideSet:
         
         pfunc.add_surround(surround)
-        name = varNameGenerator(varnamesRead)
+        name = varNameGenerator(ctx.varnamesRead, ctx.rng)
         varobject = pVar(name)
         
-        dealWithStatement(param=pfunc, varobjects=[varobject])
+        dealWithStatement(ctx, param=pfunc, varobjects=[varobject])
 
         return copy.deepcopy(varobject)
 
     return pfunc
 
-def recognizeKey(key, indent, param, surround):
+def recognizeKey(ctx, key, indent, param, surround):
     
-    rv = recognizeMultiAssignment(key, 
+    rv = recognizeMultiAssignment(ctx, key, 
                                   outsideDict=True, 
                                   indent=indent, 
                                   surround=surround)
     
     param.add_keyContents(rv)
 
-def recognizeValue(v,  indent, param, surround):
+def recognizeValue(ctx, v,  indent, param, surround):
 
-    rv = recognizeMultiAssignment(v, 
+    rv = recognizeMultiAssignment(ctx, v, 
                                   outsideDict=True, 
                                   indent=indent,
                                   surround=surround)
 
     param.add_valueContents(rv)
 
-def recognizeDict(value, indent, surround):
+def recognizeDict(ctx, value, indent, surround):
     
     param = pDict()
     param.add_indent(indent)
     for key, v in zip(value.keys, value.values):
 
-        recognizeKey(key, indent, param, surround)
+        recognizeKey(ctx, key, indent, param, surround)
 
-        recognizeValue(v, indent, param, surround)
+        recognizeValue(ctx, v, indent, param, surround)
         
     return param
 
-def recognizeSet(value, indent, surround):
+def recognizeSet(ctx, value, indent, surround):
 
     param = pSet()
     param.add_indent(indent)
     
     for elt in value.elts:
-        rv = recognizeMultiAssignment(elt, 
+        rv = recognizeMultiAssignment(ctx, elt, 
                                       indent=indent, 
                                       surround=surround,
                                       outsideSet=True)
@@ -328,55 +327,54 @@ def recognizeSet(value, indent, surround):
     
     return param
 
-def recognizeList(value,  indent, surround):
+def recognizeList(ctx, value,  indent, surround):
 
     param = pList()
     param.add_indent(indent)
     for ele in value.elts:
-        rv = recognizeMultiAssignment(ele, 
+        rv = recognizeMultiAssignment(ctx, ele, 
                                       outsideList=True, 
                                       indent=indent,
                                       surround=surround)
 
         param.add_content(rv)
 
-    judgeMutable(param)
-    global mutable
-    param.mutable = mutable
-    mutable = True
+    judgeMutable(ctx, param)
+    param.mutable = ctx.mutable
+    ctx.mutable = True
     return param
 
-def recognizeTupleInsideTuple(value,  indent, param, surround):
+def recognizeTupleInsideTuple(ctx, value,  indent, param, surround):
     
     for ele in value.elts:
-        rv = recognizeMultiAssignment(ele, 
+        rv = recognizeMultiAssignment(ctx, ele, 
                                       insideTuple=True, 
                                       indent=indent,
                                       surround=surround)
  
         param.add_content(rv)
 
-def recognizeIndependentTuple(value, indent, surround):
+def recognizeIndependentTuple(ctx, value, indent, surround):
     
     params = []
     for ele in value.elts:
-        params.append(recognizeMultiAssignment(ele, 
+        params.append(recognizeMultiAssignment(ctx, ele, 
                                                outsideTuple=True, 
                                                indent=indent,
                                                surround=surround))
     return params
 
-def recognizeTupleInsideFuncListDictTupleSet(value, indent, param, surround):
+def recognizeTupleInsideFuncListDictTupleSet(ctx, value, indent, param, surround):
     
     for ele in value.elts:
-        rv = recognizeMultiAssignment(ele, 
+        rv = recognizeMultiAssignment(ctx, ele, 
                                       insideTuple=True, 
                                       indent=indent, 
                                       surround=surround)
 
         param.add_content(rv)
 
-def recognizeNotTupleInsideTuple(outsideFunction,
+def recognizeNotTupleInsideTuple(ctx, outsideFunction,
                                  outsideList, 
                                  outsideDict, 
                                  outsideTuple, 
@@ -393,14 +391,14 @@ def recognizeNotTupleInsideTuple(outsideFunction,
         and not outsideTuple and not outsideSet and not insideTuple \
         and not outsideSlice and not outCalculation:
 
-        return recognizeIndependentTuple(value, indent, surround)
+        return recognizeIndependentTuple(ctx, value, indent, surround)
 
     else:
 
-        recognizeTupleInsideFuncListDictTupleSet(value, indent, param, surround)
+        recognizeTupleInsideFuncListDictTupleSet(ctx, value, indent, param, surround)
         return param 
         
-def recognizeTuple(outsideTuple, 
+def recognizeTuple(ctx, outsideTuple, 
                    outsideFunction, 
                    outsideList, 
                    outsideDict,
@@ -414,10 +412,10 @@ def recognizeTuple(outsideTuple,
     param = pTuple()
     param.add_indent(indent)
     if outsideTuple:
-        recognizeTupleInsideTuple(value,  indent, param, surround)
+        recognizeTupleInsideTuple(ctx, value,  indent, param, surround)
         
     else:
-        param = recognizeNotTupleInsideTuple(outsideFunction,
+        param = recognizeNotTupleInsideTuple(ctx, outsideFunction,
                                             outsideList, 
                                             outsideDict, 
                                             outsideTuple, 
@@ -447,17 +445,17 @@ def recogizeBinOpString(value, param):
     elif isinstance(op, ast.BitAnd): param.op = ' & '
     elif isinstance(op, ast.MatMult): param.op = ' @ '
 
-def recognizeBinOpLeftPart(value,  indent, param, surround):
+def recognizeBinOpLeftPart(ctx, value,  indent, param, surround):
 
-    rv = recognizeMultiAssignment(value.left, 
+    rv = recognizeMultiAssignment(ctx, value.left, 
                                   outCalculation=True, 
                                   indent=indent,
                                   surround=surround)
     param.add_left(rv)
 
-def recognizeBinOpRightPart(value,  indent, param, surround):
+def recognizeBinOpRightPart(ctx, value,  indent, param, surround):
 
-    rv = recognizeMultiAssignment(value.right, 
+    rv = recognizeMultiAssignment(ctx, value.right, 
                                   outCalculation=True, 
                                   indent=indent,
                                   surround=surround)
@@ -479,50 +477,50 @@ def recognizeCompOp(value, param):
         elif isinstance(op, ast.In): param.add_op(' in ')
         elif isinstance(op, ast.NotIn): param.add_op(' not in ')
 
-def recognizeCompLeftPart(value, indent, param, surround):
+def recognizeCompLeftPart(ctx, value, indent, param, surround):
     
-    rv = recognizeMultiAssignment(value.left, 
+    rv = recognizeMultiAssignment(ctx, value.left, 
                                   outCalculation=True, 
                                   indent=indent,
                                   surround=surround)
     param.add_left(rv)
 
-def recognizeCompRightPart(value, indent, param, surround):
+def recognizeCompRightPart(ctx, value, indent, param, surround):
 
     for comparator in value.comparators:
 
-        rv = recognizeMultiAssignment(comparator, 
+        rv = recognizeMultiAssignment(ctx, comparator, 
                                     outCalculation=True, 
                                     indent=indent,
                                     surround=surround)
 
         param.add_right(rv)
 
-def recognizeComp(value, indent, surround, i=None):
+def recognizeComp(ctx, value, indent, surround, i=None):
 
     param = pComp()
     param.add_indent(indent)
     recognizeCompOp(value, param)
-    recognizeCompLeftPart(value, indent, param, surround)
-    recognizeCompRightPart(value, indent, param, surround)
+    recognizeCompLeftPart(ctx, value, indent, param, surround)
+    recognizeCompRightPart(ctx, value, indent, param, surround)
     return param
 
-def recognizeLambda(value, indent, surround):
+def recognizeLambda(ctx, value, indent, surround):
 
     param = pLambda()
     param.add_indent(indent)
     for arg in value.args.args:
         param.add_arg(pVar(arg.arg))
-    param.add_body(recognizeMultiAssignment(value.body, indent=indent, surround=surround))
+    param.add_body(recognizeMultiAssignment(ctx, value.body, indent=indent, surround=surround))
     return param
 
-def recognizeBinOp(value, indent, surround):
+def recognizeBinOp(ctx, value, indent, surround):
     
     param = pBinop()
     param.add_indent(indent)
     recogizeBinOpString(value, param)
-    recognizeBinOpLeftPart(value, indent, param, surround)
-    recognizeBinOpRightPart(value, indent, param, surround)
+    recognizeBinOpLeftPart(ctx, value, indent, param, surround)
+    recognizeBinOpRightPart(ctx, value, indent, param, surround)
     return param
 
 def recognizeUopString(value, param):
@@ -532,13 +530,13 @@ def recognizeUopString(value, param):
     elif isinstance(op, ast.UAdd): param.op = '+' # +1
     elif isinstance(op, ast.USub): param.op = '-' # -1
 
-def recognizeUop(value, indent, surround):
+def recognizeUop(ctx, value, indent, surround):
 
     param = pUop()
     param.add_indent(indent)
     recognizeUopString(value, param)
 
-    rv = recognizeMultiAssignment(value.operand, 
+    rv = recognizeMultiAssignment(ctx, value.operand, 
                                   outCalculation=True, 
                                   indent=indent,
                                   surround=surround)
@@ -546,7 +544,7 @@ def recognizeUop(value, indent, surround):
     param.add_operand(rv)
     return param
 
-def recognizeMultiAssignment(value, 
+def recognizeMultiAssignment(ctx, value, 
                              outCalculation=False, 
                              outsideTuple=False, 
                              insideTuple=False, 
@@ -562,20 +560,20 @@ def recognizeMultiAssignment(value,
     if isinstance(value, ast.Name) or \
        isinstance(value, ast.Attribute):
 
-        return recognizeNameAttr(value, 
+        return recognizeNameAttr(ctx, value, 
                                 indent,
                                 surround)
     
     elif isinstance(value, ast.Subscript):
         
-        return recognizeSubs(value, indent, surround)
+        return recognizeSubs(ctx, value, indent, surround)
 
     elif isinstance(value, ast.Constant):
         
         return recognizeConst(value, indent)
 
     elif isinstance(value, ast.Call):
-        return recognizeCall(value, 
+        return recognizeCall(ctx, value, 
                              indent,
                              outsideFunction,
                              outsideList,
@@ -587,19 +585,19 @@ def recognizeMultiAssignment(value,
             
     elif isinstance(value, ast.Dict):
 
-        return recognizeDict(value,  indent, surround)
+        return recognizeDict(ctx, value,  indent, surround)
 
     elif isinstance(value, ast.Set):
 
-        return recognizeSet(value, indent, surround)
+        return recognizeSet(ctx, value, indent, surround)
 
     elif isinstance(value, ast.List):
         
-        return recognizeList(value,  indent, surround)
+        return recognizeList(ctx, value,  indent, surround)
     
     elif isinstance(value, ast.Tuple):
 
-        return recognizeTuple(outsideTuple, 
+        return recognizeTuple(ctx, outsideTuple, 
                             outsideFunction, 
                             outsideList, 
                             outsideDict, 
@@ -613,19 +611,19 @@ def recognizeMultiAssignment(value,
         
     elif isinstance(value, ast.BinOp):
 
-        return recognizeBinOp(value,  indent, surround)
+        return recognizeBinOp(ctx, value,  indent, surround)
     
     elif isinstance(value, ast.UnaryOp):
         
-        return recognizeUop(value,  indent, surround)
+        return recognizeUop(ctx, value,  indent, surround)
 
     elif isinstance(value, ast.Compare):
  
-        return recognizeComp(value, indent, surround)
+        return recognizeComp(ctx, value, indent, surround)
 
     elif isinstance(value, ast.Starred):
 
-        param = recognizeMultiAssignment(value.value, 
+        param = recognizeMultiAssignment(ctx, value.value, 
                              outCalculation, 
                              outsideTuple, 
                              insideTuple, 
@@ -646,7 +644,7 @@ def recognizeMultiAssignment(value,
 
     elif isinstance(value, ast.Lambda):
 
-        return recognizeLambda(value, indent, surround)
+        return recognizeLambda(ctx, value, indent, surround)
 
     else:
         raise Exception(Cyan('We never handle this ast Type: ' + str(type(value))))
@@ -656,7 +654,7 @@ def recognizeMultiAssignment(value,
 
 
 '''interpreter'''
-def interpreterForFunction(rn, ln, indent, surround):
+def interpreterForFunction(ctx, rn, ln, indent, surround):
     '''
     May contain bugs!!!
     
@@ -678,9 +676,9 @@ def interpreterForFunction(rn, ln, indent, surround):
         rn.add_Type('restrictedFunc')
     rn.add_indent(indent)
     rn.add_surround(surround)
-    dealWithStatement(param=rn, varobjects=varobjects)
+    dealWithStatement(ctx, param=rn, varobjects=varobjects)
 
-def interpreter(ln, rn, surround=None, indent=0):
+def interpreter(ctx, ln, rn, surround=None, indent=0):
 
     '''
     If ln and rn are both collections(e.g. tuple/list), then we should take apart the collections and get
@@ -698,20 +696,20 @@ def interpreter(ln, rn, surround=None, indent=0):
         else:
             varobjects.append(ln)
         rn.add_surround(surround)
-        dealWithStatement(param=rn, varobjects=varobjects)
+        dealWithStatement(ctx, param=rn, varobjects=varobjects)
 
     else:
         
-        interpreterForFunction(rn, ln, indent, surround)
+        interpreterForFunction(ctx, rn, ln, indent, surround)
 
 '''end'''
  
 '''Assign handler'''
-def assignNodeLeftHand(element, indent):
+def assignNodeLeftHand(ctx, element, indent):
 
     lparams = []
     for target in element.targets:
-        lps = recognizeMultiAssignment(target, indent=indent)
+        lps = recognizeMultiAssignment(ctx, target, indent=indent)
         if not isinstance(lps, list):
             lparams.append(lps)
         else:
@@ -719,10 +717,10 @@ def assignNodeLeftHand(element, indent):
 
     return lparams
 
-def assignNodeRightHand(element, indent, surround):
+def assignNodeRightHand(ctx, element, indent, surround):
 
     rparams = []
-    rps = recognizeMultiAssignment(element.value, 
+    rps = recognizeMultiAssignment(ctx, element.value, 
                                    indent=indent,
                                    surround=surround)
     if not isinstance(rps, list):
@@ -731,7 +729,7 @@ def assignNodeRightHand(element, indent, surround):
         rparams += rps
     return rparams
 
-def assignNodeReadyForInterpreter(lenleft, 
+def assignNodeReadyForInterpreter(ctx, lenleft, 
                                   lenright, 
                                   lparams, 
                                   rparams, 
@@ -749,8 +747,8 @@ def assignNodeReadyForInterpreter(lenleft,
         rn = pTuple()
         for ele in rparams:
             rn.add_content(ele)
-        varnamesRead.add(ln.name)
-        interpreter(ln, rn, surround=surround, indent=indent)
+        ctx.varnamesRead.add(ln.name)
+        interpreter(ctx, ln, rn, surround=surround, indent=indent)
 
     else:
         for i in range(lenright):
@@ -764,32 +762,32 @@ def assignNodeReadyForInterpreter(lenleft,
                 ln, rn = lparams[i], rparams[i]
             if isinstance(ln, list):
                 for i in ln:
-                    varnamesRead.add(i.name)
+                    ctx.varnamesRead.add(i.name)
             else:
                 if isinstance(ln, pVar):
-                    varnamesRead.add(ln.name)
-            interpreter(ln, rn, surround=surround, indent=indent)
+                    ctx.varnamesRead.add(ln.name)
+            interpreter(ctx, ln, rn, surround=surround, indent=indent)
 
-def AssignNode(element, surround=None, indent=0, func=None):
+def AssignNode(ctx, element, surround=None, indent=0, func=None):
 
     if not func:
-        helperStatDef_global.append(element)
+        ctx.helperStatDef_global.append(element)
     else:
-        if func in helperStatDef_local:
-            helperStatDef_local[func] += (element, )
+        if func in ctx.helperStatDef_local:
+            ctx.helperStatDef_local[func] += (element, )
         else:
-            helperStatDef_local[func] = (element, )
+            ctx.helperStatDef_local[func] = (element, )
 
     if not isinstance(surround, Param) and surround != None:
         raise Exception(Cyan('Type error! Expect Param but receive ' + str(type(surround))))
 
     '''left-hand side'''
-    lparams = assignNodeLeftHand(element, indent)
+    lparams = assignNodeLeftHand(ctx, element, indent)
 
     '''right-hand side'''
-    rparams = assignNodeRightHand(element, indent, surround)
+    rparams = assignNodeRightHand(ctx, element, indent, surround)
     '''deal'''
-    assignNodeReadyForInterpreter(len(lparams), 
+    assignNodeReadyForInterpreter(ctx, len(lparams), 
                                   len(rparams), 
                                   lparams, 
                                   rparams, 
@@ -1,52 +1,49 @@
-from TVMfuzz.utils import varNameGenerator
+from TVMfuzz.utils import varNameGenerator, IndexedSet
 from TVMfuzz.colors import *
 from TVMfuzz.syntax import *
 from TVMfuzz.elements import *
 import copy
 
-st_id = 0
-withid = 0
-
-def dealWithImport(type, fromWhat=None, importWhat=None, asWhat = None):
+def dealWithImport(ctx, type, fromWhat=None, importWhat=None, asWhat = None):
                             
     if type == 'import' and fromWhat != None  or \
         type == 'fromImport' and fromWhat == None:
         raise Exception(Cyan('Incorrect importClass initiation.'))
     
+    '''
+        uses are the dotted names whose appearance in a program
+        requires the import; import a.b.c is also required by b.c,
+        the submodule being reached through another binding of a.b
+    '''
     if type == 'import':
         fullname = 'import ' + importWhat + \
                         (' as ' + asWhat if asWhat != None else '')
+        if asWhat != None:
+            uses = (asWhat, )
+        else:
+            segments = importWhat.split('.')
+            uses = tuple('.'.join(segments[i:]) for i in range(len(segments)-1)) \
+                        or (importWhat, )
             
     else:
         fullname = 'from ' + fromWhat + ' import ' + importWhat + \
                         (' as ' + asWhat if asWhat != None else '')
+        if importWhat == '*' or fromWhat == '__future__':
+            uses = None
+        else:
+            uses = (asWhat if asWhat != None else importWhat, )
 
-    importSet.add(fullname)
-
-
-import os
-
-funcID_ = os.getenv('funcID')
-fileID_ = os.getenv('fileID')
-isFunc_ = bool(os.getenv('isFunc'))
-mark = '>>>'
-markGlobal = '>>>'
+    ctx.importSet.add(fullname)
+    ctx.importUses[fullname] = uses
 
-if isFunc_:
-    mark += fileID_ + '>>>' + funcID_
-    markGlobal += fileID_
-else:
-    mark += fileID_
-    markGlobal += fileID_
 
-def In_varTowith_IfNotPolysyllabic(params, ind, varname):
+def In_varTowith_IfNotPolysyllabic(symbol, params, ind):
 
-    pwith, withitem_id, st_id = varTowith[varname]
-    params[ind].update_varTowith_ele((pwith, withitem_id))
+    params[ind].update_varTowith_ele(symbol.value)
 
-def In_varTofuncst_IfNotPolysyllabic(param, params, ind, varname, paramType):
+def In_varTofuncst_IfNotPolysyllabic(symbol, param, params, ind, paramType):
 
-    param_, st_id = varTofuncst[varname]
+    param_ = symbol.value
     
     if paramType == 'function' or \
         paramType == 'with':
@@ -72,11 +69,10 @@ def In_varTofuncst_IfNotPolysyllabic(param, params, ind, varname, paramType):
 
     params[ind].update_varTofunc_ele(param_)
 
-def In_records_IfNotPolysyllabic(varname, param, params, ind, paramType):
+def In_records_IfNotPolysyllabic(symbol, param, params, ind, paramType):
     
     restname = params[ind].restname
-    parentParam, st_id = records[varname]
-    parentParam = copy.copy(parentParam)
+    parentParam = copy.copy(symbol.value)
     pref = params[ind].pref
     surround = params[ind].surround
     params[ind] = parentParam
@@ -114,9 +110,9 @@ def In_records_IfNotPolysyllabic(varname, param, params, ind, paramType):
             param.add_parent(master)
             master.add_child(param)
         
-def In_clsInstanceToParam_IfNotPolysyllabic(param, params, ind, varname, paramType):
+def In_clsInstanceToParam_IfNotPolysyllabic(symbol, param, params, ind, paramType):
 
-    parentParam, st_id = clsInstanceToParam[varname]
+    parentParam = symbol.value
 
     if paramType == 'records':
         if isinstance(param, pVar):
@@ -143,81 +139,29 @@ def In_clsInstanceToParam_IfNotPolysyllabic(param, params, ind, varname, paramTy
 
     params[ind].update_varTocls_ele(parentParam)
 
-def max3(a, b, c):
-    return max(max(a, b), c)
-
-def max4(a, b, c, d):
-    return max(a, max3(b, c, d))
-
-def buildRelationshipIfNotPolysyllabic(pres, param, params, ind, paramType):
+def buildRelationshipIfNotPolysyllabic(ctx, pres, param, params, ind, paramType):
     
-    pre = pres
-    find = False
-    varTofuncst_id = -1
-    clsInstanceToParam_id = -1
-    records_id = -1
-    with_id = -1
-
-    for mark_ in [mark, markGlobal]:
-        
-        varname = pre + mark_
-
-        if varname in varTofuncst:
-            varTofuncst_id = varTofuncst[varname][-1]
-
-        if varname in clsInstanceToParam:
-            clsInstanceToParam_id = clsInstanceToParam[varname][-1]
+    symbol = ctx.symbols.lookup(pres)
+    if symbol is None:
+        # print(Cyan('Seems like an unreferenced variable: ' + pres))
+        return
 
-        if varname in records:
-            records_id = records[varname][-1]
-
-        if varname in varTowith:
-            with_id = varTowith[varname][-1]
-
-        if varTofuncst_id != -1 or clsInstanceToParam_id != -1 or \
-            records_id != -1 or with_id != -1:
-            find = True
-        
-        maxi = max4(varTofuncst_id, clsInstanceToParam_id, records_id, with_id)
-
-        if find:
-            if maxi == varTofuncst_id:
-                In_varTofuncst_IfNotPolysyllabic(param, params, ind, varname, paramType)
-            
-            elif maxi == clsInstanceToParam_id:
-                In_clsInstanceToParam_IfNotPolysyllabic(param, params, ind, varname, paramType)
-            
-            elif maxi == records_id:
-                In_records_IfNotPolysyllabic(varname, param, params, ind, paramType)
-
-            elif maxi == with_id:
-                In_varTowith_IfNotPolysyllabic(params, ind, varname)
-
-            break
+    if symbol.kind == 'function':
+        In_varTofuncst_IfNotPolysyllabic(symbol, param, params, ind, paramType)
     
-    # if not find:
-    #     print(Cyan('Seems like an unreferenced variable: ' + pres))
-        # raise Exception(
-        #     Cyan('Unreferenced variable: ' + pres))
-
-def constitutePres(pres):
-    pre = ''
-    preslist = pres.split('.')
-    pres = []
-    for i in range(len(preslist)):
-        ele = preslist[i]
-        if pre == '':
-            pre = ele 
-        else:
-            pre += '.' + ele 
-        pres.append(pre)
-    return pres
+    elif symbol.kind == 'cls':
+        In_clsInstanceToParam_IfNotPolysyllabic(symbol, param, params, ind, paramType)
+    
+    elif symbol.kind == 'record':
+        In_records_IfNotPolysyllabic(symbol, param, params, ind, paramType)
+
+    elif symbol.kind == 'with':
+        In_varTowith_IfNotPolysyllabic(symbol, params, ind)
 
-def In_varTowith_IfPolysyllabic(params, pres, pre, mark_, ind):
+def In_varTowith_IfPolysyllabic(symbol, params, fullname, pre, ind):
 
-    pwith, withitem_id, st_id = varTowith[pre+mark_]
+    pwith, withitem_id = symbol.value
     params[ind].update_varTofunc_ele(pwith)
-    fullname = pres[len(pres)-1]
     restname = ''
     if pre != fullname: 
         restname = fullname[len(pre):]
@@ -225,9 +169,9 @@ def In_varTowith_IfPolysyllabic(params, pres, pre, mark_, ind):
     params[ind].add_restname(restname)
     params[ind].add_name(pre)
 
-def In_varTofuncst_IfPolysyllabic(param, params, pres, pre, mark_, ind, paramType):
+def In_varTofuncst_IfPolysyllabic(symbol, param, params, fullname, pre, ind, paramType):
     
-    parentParam, st_id = varTofuncst[pre+mark_]
+    parentParam = symbol.value
     
     if paramType == 'function' or paramType == 'with':
         param.add_parent(parentParam)
@@ -251,7 +195,6 @@ def In_varTofuncst_IfPolysyllabic(param, params, pres, pre, mark_, ind, paramTyp
             parentParam.add_adjunct(param)
     
     params[ind].update_varTofunc_ele(parentParam)
-    fullname = pres[len(pres)-1]
     restname = ''
     if pre != fullname: 
         restname = fullname[len(pre):]
@@ -259,10 +202,9 @@ def In_varTofuncst_IfPolysyllabic(param, params, pres, pre, mark_, ind, paramTyp
     params[ind].add_restname(restname)
     params[ind].add_name(pre)
 
-def In_clsInstanceToParam_IfPolysyllabic(param, params, pres, pre, mark_, ind, paramType):
+def In_clsInstanceToParam_IfPolysyllabic(symbol, param, params, fullname, pre, ind, paramType):
     
-    parentParam, st_id = clsInstanceToParam[pre+mark_]
-    fullname = pres[len(pres) - 1]
+    parentParam = symbol.value
     restname = ''
     if pre != fullname:
         restname = fullname[len(pre):]
@@ -293,17 +235,15 @@ def In_clsInstanceToParam_IfPolysyllabic(param, params, pres, pre, mark_, ind, p
             master.add_child(param)
             param.add_parent(master)
 
-def In_records_IfPolysyllabic(param, params, pres, pre, mark_, ind, paramType):
+def In_records_IfPolysyllabic(symbol, param, params, fullname, pre, ind, paramType):
 
-    fullname = pres[len(pres)-1]
     restname = ''
     if pre != fullname:
         restname = fullname[len(pre):]
 
-    parentParam, st_id = records[pre+mark_]
     pref = params[ind].pref
     surround = params[ind].surround
-    parentParam = copy.copy(parentParam)
+    parentParam = copy.copy(symbol.value)
     params[ind] = parentParam
     params[ind].pref = pref
     params[ind].add_surround(surround)
@@ -343,74 +283,42 @@ def In_records_IfPolysyllabic(param, params, pres, pre, mark_, ind, paramType):
             master.add_child(param)
             param.add_parent(master)
 
-def buildRelationshipIfPolysyllabic(pres, param, params, ind, paramType):
+def buildRelationshipIfPolysyllabic(ctx, fullname, param, params, ind, paramType):
     
-    find = False
-    pres = constitutePres(pres)
-
-    varTofuncst_id = -1
-    clsInstanceToParam_id = -1
-    records_id = -1
-    with_id = -1
-
-    for pre in pres[::-1]:
-        for mark_ in [mark, markGlobal]:
-            
-            if pre+mark_ in varTofuncst:
-                varTofuncst_id = varTofuncst[pre+mark_][-1]
-                
-            if pre+mark_ in clsInstanceToParam:
-                clsInstanceToParam_id = clsInstanceToParam[pre+mark_][-1]
-
-            if pre+mark_ in records:
-                records_id = records[pre+mark_][-1]
-
-            if pre+mark_ in varTowith:
-                with_id = varTowith[pre+mark_][-1]
-
-            if varTofuncst_id != -1 or clsInstanceToParam_id != -1 or \
-                records_id != -1 or with_id != -1:
-                find = True
-
-            maxi = max4(varTofuncst_id, clsInstanceToParam_id, records_id, with_id)
-
-            if find:
-                if maxi == varTofuncst_id:
-                    In_varTofuncst_IfPolysyllabic(param, 
-                            params, pres, pre, mark_, ind, paramType)
-                
-                elif maxi == clsInstanceToParam_id:
-                    In_clsInstanceToParam_IfPolysyllabic(param, 
-                            params, pres, pre, mark_, ind, paramType)
-                
-                elif maxi == records_id: 
-                    In_records_IfPolysyllabic(param, 
-                            params, pres, pre, mark_, ind, paramType)
-
-                elif maxi == with_id:
-                    In_varTowith_IfPolysyllabic(params, pres, pre, mark_, ind)
-
-                break
-        if find:
-            break
+    pre, symbol = ctx.symbols.lookupPrefix(fullname)
+    if symbol is None:
+        # print(Cyan('Seems like there is an unreferenced variable: ' + fullname))
+        return
+
+    if symbol.kind == 'function':
+        In_varTofuncst_IfPolysyllabic(symbol, param, 
+                params, fullname, pre, ind, paramType)
+    
+    elif symbol.kind == 'cls':
+        In_clsInstanceToParam_IfPolysyllabic(symbol, param, 
+                params, fullname, pre, ind, paramType)
+    
+    elif symbol.kind == 'record': 
+        In_records_IfPolysyllabic(symbol, param, 
+                params, fullname, pre, ind, paramType)
 
-    # if not find and pres[-1] not in functionDefNames:
-    #     print(Cyan('Seems like there is an unreferenced variable: ' + params[ind].name))
-        #     raise Exception(Cyan('Unreferenced variable: ' + params[ind].name))
+    elif symbol.kind == 'with':
+        In_varTowith_IfPolysyllabic(symbol, params, fullname, pre, ind)
 
-def buildRelationshipVar(params, ind, param, paramType):
+def buildRelationshipVar(ctx, params, ind, param, paramType):
     
     pres = params[ind].name
     if '.' not in pres:
-        buildRelationshipIfNotPolysyllabic(pres, param, params, ind, paramType)
+        buildRelationshipIfNotPolysyllabic(ctx, pres, param, params, ind, paramType)
         
     else:
-        buildRelationshipIfPolysyllabic(pres, param, params, ind, paramType)
+        buildRelationshipIfPolysyllabic(ctx, pres, param, params, ind, paramType)
 
-def buildRelationshipSubs(params, ind, param, paramType):
+def buildRelationshipSubs(ctx, params, ind, param, paramType):
     
-    if params[ind].fullstr+mark in fullstrTopsubs:
-        parentParam, st_id = fullstrTopsubs[params[ind].fullstr+mark]
+    symbol = ctx.symbols.lookup(params[ind].fullstr)
+    if symbol is not None and symbol.kind == 'subs':
+        parentParam = symbol.value
 
         if paramType == 'records':
             if isinstance(param, pVar):
@@ -438,57 +346,57 @@ def buildRelationshipSubs(params, ind, param, paramType):
         params[ind].update_subsTosubs_ele(parentParam)
     
     else:
-        replaceAndFindParentsOfParams(params[ind].prefix, 0, param, paramType)
-        replaceAndFindParentsOfParams(params[ind].content, 0, param, paramType)
+        replaceAndFindParentsOfParams(ctx, params[ind].prefix, 0, param, paramType)
+        replaceAndFindParentsOfParams(ctx, params[ind].content, 0, param, paramType)
 
-def replaceAndFindParentsOfParams(params, ind, param, paramType):
+def replaceAndFindParentsOfParams(ctx, params, ind, param, paramType):
 
     if params[ind].Type == 'variable':
-        buildRelationshipVar(params, ind, param, paramType)
+        buildRelationshipVar(ctx, params, ind, param, paramType)
 
     elif params[ind].Type == 'subscript':
 
-        buildRelationshipSubs(params, ind, param, paramType)
+        buildRelationshipSubs(ctx, params, ind, param, paramType)
 
     elif params[ind].Type == 'tuple' or params[ind].Type == 'list':
         
         for i in range(len(params[ind].content)):
-            replaceAndFindParentsOfParams(params[ind].content, i, param, paramType)
+            replaceAndFindParentsOfParams(ctx, params[ind].content, i, param, paramType)
 
     elif params[ind].Type == 'dict':
 
         for i in range(len(params[ind].valueContents)):
-            replaceAndFindParentsOfParams(params[ind].valueContents, i, param, paramType)
+            replaceAndFindParentsOfParams(ctx, params[ind].valueContents, i, param, paramType)
 
         for i in range(len(params[ind].keyContents)):
-            replaceAndFindParentsOfParams(params[ind].keyContents, i, param, paramType)
+            replaceAndFindParentsOfParams(ctx, params[ind].keyContents, i, param, paramType)
 
     elif params[ind].Type == 'set':
 
         for i in range(len(params[ind].content)):
-            replaceAndFindParentsOfParams(params[ind].content, i, param, paramType)
+            replaceAndFindParentsOfParams(ctx, params[ind].content, i, param, paramType)
 
     elif params[ind].Type == 'keyword':
-        replaceAndFindParentsOfParams(params[ind].keywordContent, 0, param, paramType)
+        replaceAndFindParentsOfParams(ctx, params[ind].keywordContent, 0, param, paramType)
 
     elif params[ind].Type == 'binop':
-        replaceAndFindParentsOfParams(params[ind].left, 0, param, paramType)      
-        replaceAndFindParentsOfParams(params[ind].right, 0, param, paramType)
+        replaceAndFindParentsOfParams(ctx, params[ind].left, 0, param, paramType)      
+        replaceAndFindParentsOfParams(ctx, params[ind].right, 0, param, paramType)
     
     elif params[ind].Type == 'uop':
-        replaceAndFindParentsOfParams(params[ind].operand, 0, param, paramType)
+        replaceAndFindParentsOfParams(ctx, params[ind].operand, 0, param, paramType)
 
     elif params[ind].Type == 'compare':
-        replaceAndFindParentsOfParams(params[ind].left, 0, param, paramType) 
+        replaceAndFindParentsOfParams(ctx, params[ind].left, 0, param, paramType) 
         for i in range(len(params[ind].right)):     
-            replaceAndFindParentsOfParams(params[ind].right, i, param, paramType)
+            replaceAndFindParentsOfParams(ctx, params[ind].right, i, param, paramType)
     
     elif params[ind].Type == 'lambda':
         if not isinstance(params[ind].body[0], pFunc):
-            replaceAndFindParentsOfParams(params[ind].body, 0, param, paramType)
+            replaceAndFindParentsOfParams(ctx, params[ind].body, 0, param, paramType)
         else:
             for i in range(len(params[ind].body[0].params)):
-                replaceAndFindParentsOfParams(params[ind].body[0].params, i, param, 'function') 
+                replaceAndFindParentsOfParams(ctx, params[ind].body[0].params, i, param, 'function') 
 
 def generateFullFuncName(Type, funcName, restrictedVar, suffix):
     
@@ -502,7 +410,7 @@ def generateFullFuncName(Type, funcName, restrictedVar, suffix):
     
     return keyname
 
-def handleRestricted_in_varTowith(param, pre, pres, varname):
+def handleRestricted_in_varTowith(param, pre, fullname, varname):
     if param.Type == 'function':
         param.Type = 'restrictedFunc'
 
@@ -510,7 +418,6 @@ def handleRestricted_in_varTowith(param, pre, pres, varname):
         param.Type == 'restrictedOnlyFunc'
     
     param.add_restricted(pVar(pre))
-    fullname = pres[len(pres) - 1]
     restname = ''
     if pre != fullname:
         restname = fullname[len(pre):]
@@ -519,7 +426,7 @@ def handleRestricted_in_varTowith(param, pre, pres, varname):
     param.restricted.update_varTofunc_ele(parentParam)
 
 
-def handleRestricted_in_varTofuncst(param, pre, pres, varname):
+def handleRestricted_in_varTofuncst(symbol, param, pre, fullname):
     
     if param.Type == 'function':
         param.Type = 'restrictedFunc'
@@ -527,13 +434,12 @@ def handleRestricted_in_varTofuncst(param, pre, pres, varname):
     elif param.Type == 'onlyFunc':
         param.Type == 'restrictedOnlyFunc'
     
-    parentParam = varTofuncst[varname][0]
+    parentParam = symbol.value
     param.add_parent(parentParam)
     parentParam.add_child(param)
     # restricted here is of pVar
     param.add_restricted(pVar(pre))
 
-    fullname = pres[len(pres) - 1]
     restname = ''
     if pre != fullname:
         restname = fullname[len(pre):]
@@ -541,7 +447,7 @@ def handleRestricted_in_varTofuncst(param, pre, pres, varname):
     param.restricted.add_restname(restname) 
     param.restricted.update_varTofunc_ele(parentParam)
 
-def handleRestricted_in_clsInstanceToParam(param, varname, pre, pres):
+def handleRestricted_in_clsInstanceToParam(symbol, param, pre, fullname):
     
     if param.Type == 'function':
         param.Type = 'restrictedFunc'
@@ -549,7 +455,7 @@ def handleRestricted_in_clsInstanceToParam(param, varname, pre, pres):
     elif param.Type == 'onlyFunc':
         param.Type == 'restrictedOnlyFunc'
     
-    parentParam = clsInstanceToParam[varname][0]
+    parentParam = symbol.value
     
     for master in parentParam.masters:
         master.add_child(param)
@@ -560,109 +466,57 @@ def handleRestricted_in_clsInstanceToParam(param, varname, pre, pres):
     # restricted here may be not of pVar
     param.restricted.update_varTocls_ele(parentParam)
 
-    fullname = pres[len(pres) - 1]
     restname = ''
     if pre != fullname:
         restname = fullname[len(pre):]
 
     param.restricted.add_restname(restname)
 
-def handleRestricted_in_records(param, pre, pres, varname):
+def handleRestricted_in_records(symbol, param, pre, fullname):
     
-    fullname = pres[len(pres) - 1]
     restname = ''
     if pre != fullname:
         restname = fullname[len(pre):]
 
-    records_copy, st_id = copy.copy(records[varname])
-    param.add_restricted(records_copy)
+    param.add_restricted(symbol.value)
     param.restricted.add_restname(restname)
 
-def handleRestricted(param):
-
-    find = False
-    varTofuncst_id = -1
-    records_id = -1
-    clsInstanceToParam_id = -1
-    with_id = -1
-
-    pres = constitutePres(param.funcName)
-
-    for pre in pres[::-1]:
-        for mark_ in [mark, markGlobal]:
-            
-            varname = pre+mark_
-            if varname in varTofuncst:
-                varTofuncst_id = varTofuncst[varname][-1]
-
-            elif varname in records:
-                records_id = records[varname][-1]
-
-            elif varname in clsInstanceToParam:
-                clsInstanceToParam_id = clsInstanceToParam[varname][-1]
-
-            elif varname in varTowith:
-                with_id = varTowith[varname][-1]
+def handleRestricted(ctx, param):
 
-            if records_id != -1 or varTofuncst_id != -1 or \
-                clsInstanceToParam_id != -1 or with_id != -1:
-                find = True 
+    fullname = param.funcName
+    pre, symbol = ctx.symbols.lookupPrefix(fullname)
+    if symbol is None:
+        return
 
-            maxi = max4(records_id, varTofuncst_id, clsInstanceToParam_id, with_id)
-            
-            if find:
-                if maxi == records_id:
-                    handleRestricted_in_records(param, pre, pres, varname)
-                    
-                elif maxi == varTofuncst_id:
-                    handleRestricted_in_varTofuncst(param, pre, pres, varname)
-                
-                elif maxi == clsInstanceToParam_id:
-                    handleRestricted_in_clsInstanceToParam(param, varname, pre, pres)
-                
-                break
-        if find:
-            break
+    if symbol.kind == 'record':
+        handleRestricted_in_records(symbol, param, pre, fullname)
+        
+    elif symbol.kind == 'function':
+        handleRestricted_in_varTofuncst(symbol, param, pre, fullname)
+    
+    elif symbol.kind == 'cls':
+        handleRestricted_in_clsInstanceToParam(symbol, param, pre, fullname)
 
     # return param.Type, param.restrictedVar
 
 def handle_restname_name(varobject,
-                         pres,
+                         fullname,
                          pre):
 
     varobject.add_name(pre)
-    fullname = pres[len(pres) - 1]
     restname = fullname[len(pre):]
     varobject.add_restname(restname)
 
-def buildPres(varobject):
-
-    if isinstance(varobject, pSubs):
-        varobject = varobject.var
-
-    preslist = varobject.name.split('.')
-    pre = ''
-    pres = []
-    for i in range(len(preslist)):
-        ele = preslist[i]
-        if pre == '':
-            pre = ele 
-        else:
-            pre += '.' + ele 
-        pres.append(pre)
-    return pres
-
-def findin_varTofuncst(varobject, 
+def findin_varTofuncst(symbol, varobject, 
                         param, 
-                        pres, 
+                        fullname, 
                         pre,
-                        mark_,
                         paramType):
     
-    pfunc, st_id = varTofuncst[pre+mark_]
-    if pres:
+    pfunc = symbol.value
+    if fullname:
         handle_restname_name(varobject,
-                            pres,
+                            fullname,
                             pre)
 
     varobject.update_varTofunc_ele(pfunc)
@@ -679,36 +533,32 @@ def findin_varTofuncst(varobject,
         param.add_parent(pfunc)
         pfunc.add_child(param)
 
-def findin_varTowith(varobject, 
+def findin_varTowith(symbol, varobject, 
                     param, 
-                    pres, 
+                    fullname, 
                     pre,
-                    mark_,
                     paramType):
 
-    pwith, withitem_id, st_id = varTowith[pre+mark_]
-    if pres:
+    if fullname:
         handle_restname_name(varobject,
-                            pres,
+                            fullname,
                             pre)
     if paramType != 'subs-content' and paramType != 'subs-prefix':
         param.add_varobject(varobject)
-    varobject.update_varTowith_ele((pwith, withitem_id))
+    varobject.update_varTowith_ele(symbol.value)
 
-def findin_clsInstanceToParam(key, 
+def findin_clsInstanceToParam(symbol, 
                               pre, 
-                              pres,
+                              fullname,
                               param,
                               varobject,
                               paramType):
 
-    
-
-    paramcls, st_id = clsInstanceToParam[key]
+    paramcls = symbol.value
 
-    if pres:
+    if fullname:
         handle_restname_name(varobject,
-                            pres,
+                            fullname,
                             pre)
 
     if paramType != 'subs-content' and paramType != 'subs-prefix':
@@ -730,19 +580,16 @@ def findin_clsInstanceToParam(key,
             param.add_parent(master)
             master.add_child(param)
     
-def findin_records(varobjects,
+def findin_records(symbol, varobjects,
                    ind,
                    param,
-                   pres,
+                   fullname,
                    pre,
-                   mark_,
                    paramType):
 
-    record_param, st_id = records[pre+mark_]
-    record_param = copy.copy(record_param)
+    record_param = copy.copy(symbol.value)
     
-    fullname = pres[len(pres)-1] if pres else ''
-    restname = fullname[len(pre):] if pres else ''
+    restname = fullname[len(pre):] if fullname else ''
     varobjects[ind] = record_param
     varobjects[ind].add_restname(record_param.restname+restname)
     
@@ -766,145 +613,60 @@ def findin_records(varobjects,
             param.add_parent(master)
             master.add_child(param) 
 
-def FindParentsOfVarobjectsIfNotPolysyllabic(param, varobjects, ind, paramType):
-    find = False
-    varTofuncst_id = -1
-    clsInstanceToParam_id = -1
-    records_id = -1
-    with_id = -1
+def findin_symbol(symbol, param, varobjects, ind, fullname, pre, paramType):
 
-    pre = varobjects[ind].name
-
-    for mark_ in [mark, markGlobal]:    
-            
-        if pre+mark_ in varTofuncst:
-            varTofuncst_id = varTofuncst[pre+mark_][-1]
-
-        if pre+mark_ in clsInstanceToParam:
-            clsInstanceToParam_id = clsInstanceToParam[pre+mark_][-1]
-
-        if pre+mark_ in records:
-            records_id = records[pre+mark_][-1]
-        
-        if pre+mark_ in varTowith:
-            with_id = varTowith[pre+mark_][-1]
-
-        if varTofuncst_id != -1 or clsInstanceToParam_id != -1 or \
-            records_id != -1 or with_id != -1:
-            find = True
-        
-        maxi = max4(varTofuncst_id, clsInstanceToParam_id, records_id, with_id)
+    if symbol.kind == 'function':
+        findin_varTofuncst(symbol, varobjects[ind],
+                        param, 
+                        fullname, 
+                        pre,
+                        paramType)
 
-        if find:
-            if maxi == varTofuncst_id:
-                findin_varTofuncst(varobjects[ind],
-                                param, 
-                                None, 
+    elif symbol.kind == 'cls':
+        findin_clsInstanceToParam(symbol,
                                 pre,
-                                mark_,
-                                paramType)
-
-            elif maxi == clsInstanceToParam_id:
-                findin_clsInstanceToParam(pre+mark_,
-                                        pre,
-                                        None,
-                                        param,
-                                        varobjects[ind],
-                                        paramType)
-            
-            elif maxi == records_id:
-                findin_records(varobjects,
-                               ind,
+                                fullname,
                                 param,
-                                None,
-                                pre,
-                                mark_,
-                                paramType)
-            
-            elif maxi == with_id:
-                findin_varTowith(varobjects[ind],
-                                param, 
-                                None, 
-                                pre,
-                                mark_,
+                                varobjects[ind],
                                 paramType)
+    
+    elif symbol.kind == 'record':
+        findin_records(symbol, varobjects,
+                        ind,
+                        param,
+                        fullname,
+                        pre,
+                        paramType)
+    
+    elif symbol.kind == 'with':
+        findin_varTowith(symbol, varobjects[ind],
+                        param, 
+                        fullname, 
+                        pre,
+                        paramType)
 
-            break
+def FindParentsOfVarobjectsIfNotPolysyllabic(ctx, param, varobjects, ind, paramType):
 
-def FindParentsOfVarobjectsIfPolysyllabic(param, varobjects, ind, paramType):
-    
-    pres = buildPres(varobjects[ind])
-    find = False
-    varTofuncst_id = -1
-    clsInstanceToParam_id = -1
-    records_id = -1
-    with_id = -1
-
-    for pre in pres[:-1][::-1]:
-        for mark_ in [mark, markGlobal]:    
-            
-            if pre+mark_ in varTofuncst:
-                varTofuncst_id = varTofuncst[pre+mark_][-1]
+    pre = varobjects[ind].name
+    symbol = ctx.symbols.lookup(pre)
+    if symbol is not None:
+        findin_symbol(symbol, param, varobjects, ind, None, pre, paramType)
 
-            if pre+mark_ in clsInstanceToParam:
-                clsInstanceToParam_id = clsInstanceToParam[pre+mark_][-1]
+def FindParentsOfVarobjectsIfPolysyllabic(ctx, param, varobjects, ind, paramType):
+    
+    varobject = varobjects[ind]
+    if isinstance(varobject, pSubs):
+        varobject = varobject.var
 
-            if pre+mark_ in records:
-                records_id = records[pre+mark_][-1]
-            
-            if pre+mark_ in varTowith:
-                with_id = varTowith[pre+mark_][-1]
-            
-            if varTofuncst_id != -1 or clsInstanceToParam_id != -1 or \
-                records_id != -1 or with_id != -1:
-                find = True
-            
-            maxi = max4(varTofuncst_id, clsInstanceToParam_id, records_id, with_id)
-
-            if find:
-                if maxi == varTofuncst_id:
-                    findin_varTofuncst(varobjects[ind], 
-                                    param, 
-                                    pres, 
-                                    pre,
-                                    mark_,
-                                    paramType)
-
-                elif maxi == clsInstanceToParam_id:
-                    findin_clsInstanceToParam(pre+mark_,
-                                            pre,
-                                            pres,
-                                            param,
-                                            varobjects[ind],
-                                            paramType)
-                
-                elif maxi == records_id:
-                    findin_records(varobjects,
-                                    ind, 
-                                    param,
-                                    pres,
-                                    pre,
-                                    mark_,
-                                    paramType)
-                
-                elif maxi == with_id:
-                    findin_varTowith(varobjects[ind], 
-                                    param, 
-                                    pres, 
-                                    pre,
-                                    mark_,
-                                    paramType)
-
-                break
-        if find: 
-            break
-
-    if not find:
+    '''the name itself is what is being defined, only its owners count'''
+    fullname = varobject.name
+    pre, symbol = ctx.symbols.lookupPrefix(fullname, proper=True)
+    if symbol is not None:
+        findin_symbol(symbol, param, varobjects, ind, fullname, pre, paramType)
+    else:
         param.add_varobject(varobjects[ind])
 
-    # return param_
-
-def FindParentsOfVarobjects(param, varobjects, paramType):
+def FindParentsOfVarobjects(ctx, param, varobjects, paramType):
     
     '''
     varnames which are on the leftside of a function statment cannnot be randomly generated 
@@ -939,16 +701,29 @@ def FindParentsOfVarobjects(param, varobjects, paramType):
 
             if '.' not in name:
                 if paramType == 'subs-prefix' or paramType == 'subs-content':
-                    FindParentsOfVarobjectsIfNotPolysyllabic(param, varobjects, ind, paramType)
+                    FindParentsOfVarobjectsIfNotPolysyllabic(ctx, param, varobjects, ind, paramType)
                 else:
                     param.add_varobject(varobjects[ind])
             else:
-                FindParentsOfVarobjectsIfPolysyllabic(param, varobjects, ind, paramType)
+                FindParentsOfVarobjectsIfPolysyllabic(ctx, param, varobjects, ind, paramType)
     # param.update_varobjectsList()
     
 
+def tagBody(ctx, param):
+
+    '''the statement was met in the body being analyzed, None for module level'''
+
+    if param.bodies is None:
+        param.bodies = IndexedSet()
+    param.bodies.add(ctx.body)
+
 def handleRepetition(lengh, params_, params, param_, param):
 
+    if param.bodies:
+        if param_.bodies is None:
+            param_.bodies = IndexedSet()
+        param_.bodies.update(param.bodies)
+
     for parent in param.parents:
         parent.children.remove(param)
 
@@ -975,7 +750,7 @@ def handleRepetition(lengh, params_, params, param_, param):
             # params[i],varTofunc only contains one element
 
             if params[i].varTofunc:
-                parentParam = list(params[i].varTofunc)[0]
+                parentParam = params[i].varTofunc[0]
 
                 findParentParam = False
                 for ele in params_[i].varTofunc:
@@ -989,11 +764,11 @@ def handleRepetition(lengh, params_, params, param_, param):
                     parentParam.add_child(param_)
         
 
-def recordNewStatementIfMetBefore(param):
+def recordNewStatementIfMetBefore(ctx, param):
     
     funcName = param.funcName
     params = param.params
-    param_ = funcNameTopFunc[funcName]
+    param_ = ctx.funcNameTopFunc[funcName]
     params_ = param_.params
     len1 = len(params_)
     len2 = len(params)
@@ -1004,7 +779,7 @@ def recordNewStatementIfMetBefore(param):
 
     return param
 
-def recordNewStatementIfNotMetBefore(param):
+def recordNewStatementIfNotMetBefore(ctx, param):
 
     params = param.params
     funcName = param.funcName
@@ -1018,30 +793,29 @@ def recordNewStatementIfNotMetBefore(param):
         
         cnt += 1
 
-    funcNameTopFunc[funcName] = param
-    ingredient.append(param)
+    ctx.funcNameTopFunc[funcName] = param
+    ctx.ingredient.append(param)
 
-def recordNewStatement(param):
+def recordNewStatement(ctx, param):
     
-    if param.funcName in funcNameTopFunc: 
-        param_ = recordNewStatementIfMetBefore(param)  # here !!!
+    if param.funcName in ctx.funcNameTopFunc: 
+        param_ = recordNewStatementIfMetBefore(ctx, param)  # here !!!
         return param_, True
         
     else: 
-        recordNewStatementIfNotMetBefore(param)
+        recordNewStatementIfNotMetBefore(ctx, param)
         return param, False
 
-def updateVarTofuncst(varobjects, param, param_funcName_in_funcNameTopFunc):
+def updateVarTofuncst(ctx, varobjects, param, param_funcName_in_funcNameTopFunc):
 
-    global st_id 
     if param.Type == 'restrictedOnlyFunc':
         
         if param_funcName_in_funcNameTopFunc:
-            varTofuncst[param.restrictedVar.name+param.restrictedVar.restname+mark] \
-                = (funcNameTopFunc[param.funcName], st_id)
+            ctx.symbols.define(param.restrictedVar.name+param.restrictedVar.restname,
+                'function', ctx.funcNameTopFunc[param.funcName], ctx.st_id)
         else:
-            varTofuncst[param.restrictedVar.name+param.restrictedVar.restname+mark] \
-                = (param, st_id)
+            ctx.symbols.define(param.restrictedVar.name+param.restrictedVar.restname,
+                'function', param, ctx.st_id)
 
     if varobjects:
         # cnt = 0
@@ -1050,10 +824,10 @@ def updateVarTofuncst(varobjects, param, param_funcName_in_funcNameTopFunc):
         varname = varobjects[0].name
 
         if not param_funcName_in_funcNameTopFunc:
-            varTofuncst[varname+mark] = (param, st_id)
+            ctx.symbols.define(varname, 'function', param, ctx.st_id)
         else: 
-            varTofuncst[varname+mark] = \
-                (funcNameTopFunc[param.funcName], st_id)
+            ctx.symbols.define(varname, 'function', 
+                ctx.funcNameTopFunc[param.funcName], ctx.st_id)
 
             # cnt += 1
 
@@ -1072,7 +846,7 @@ def handleSurround(param):
     if param.surround:
         param.surround.add_body(param) 
 
-def handlefuncNameandSuffix(param, varobjects):
+def handlefuncNameandSuffix(ctx, param, varobjects):
     
     fullname = generateFullFuncName(param.Type, 
                                     param.funcName, 
@@ -1080,18 +854,18 @@ def handlefuncNameandSuffix(param, varobjects):
                                     param.suffix)
     numberOfparams = len(param.params)
     numberOfvarnames = len(varobjects) if varobjects else 0
-    surround_id = withid if param.surround else 0
+    surround_id = ctx.withid if param.surround else 0
     hasLambda = False
     lambda_id = 0
     for ele in param.params:
         if isinstance(ele, pLambda):
             hasLambda = True
     if hasLambda:
-        if fullname in funcTolambda:
-            lambda_id = funcTolambda[fullname] 
-            funcTolambda[fullname] = lambda_id + 1
+        if fullname in ctx.funcTolambda:
+            lambda_id = ctx.funcTolambda[fullname] 
+            ctx.funcTolambda[fullname] = lambda_id + 1
         else:
-            funcTolambda[fullname] = 2
+            ctx.funcTolambda[fullname] = 2
             lambda_id = 1
 
     fullnameSuffix = '_' + str(numberOfparams) + '_' + str(numberOfvarnames) +\
@@ -1099,62 +873,62 @@ def handlefuncNameandSuffix(param, varobjects):
     param.add_funcName(fullname+fullnameSuffix)
     param.add_funcNameSuffix(fullnameSuffix)
 
-def handle_pSubs_onTheLeft(param, varobjects):
+def handle_pSubs_onTheLeft(ctx, param, varobjects):
 
     if isinstance(param, pFunc):
-        name = varNameGenerator(varnamesRead)
+        name = varNameGenerator(ctx.varnamesRead, ctx.rng)
         pvar = pVar(name)
-        dealWithStatement(param, varobjects=[pvar])
+        dealWithStatement(ctx, param, varobjects=[pvar])
         param = copy.deepcopy(pvar)
 
     if len(varobjects) > 1:
         raise Exception(Cyan(\
             'varobjects shouldn\'t have more than 1 varobject' ))
     
-    fullstrTopsubs[varobjects[0].fullstr+mark] = (param, st_id)
+    ctx.symbols.define(varobjects[0].fullstr, 'subs', param, ctx.st_id)
 
     paramlist = [param]
     param.add_varobject(varobjects[0])
-    replaceAndFindParentsOfParams(paramlist, 0, param, 'subs')
+    replaceAndFindParentsOfParams(ctx, paramlist, 0, param, 'subs')
     if isinstance(param, pVar):
         param = paramlist[0]
         if not param.varobjects:
             param.add_varobject(varobjects[0])
 
     prefixlist = [varobjects[0].prefix[0]]
-    FindParentsOfVarobjects(param, prefixlist, 'subs-prefix')
+    FindParentsOfVarobjects(ctx, param, prefixlist, 'subs-prefix')
     varobjects[0].prefix[0] = prefixlist[0]
     
     if isinstance(varobjects[0].content[0], pVar):
         contentlist = [varobjects[0].content[0]]
-        FindParentsOfVarobjects(param, contentlist, 'subs-content')
+        FindParentsOfVarobjects(ctx, param, contentlist, 'subs-content')
         varobjects[0].content[0] = contentlist[0]
     
-def handle_pVar_onTheLeft(param, varobjects):
+def handle_pVar_onTheLeft(ctx, param, varobjects):
 
     if isinstance(param, pFunc):
-        name = varNameGenerator(varnamesRead)
+        name = varNameGenerator(ctx.varnamesRead, ctx.rng)
         pvar = pVar(name)
-        dealWithStatement(param, varobjects=[pvar])
+        dealWithStatement(ctx, param, varobjects=[pvar])
         param = copy.deepcopy(pvar)
 
     if len(varobjects) > 1:
         raise Exception(Cyan(\
             'varobjects shouldn\'t have more than 1 varobject' ))
 
-    clsInstanceToParam[varobjects[0].name+mark] = (param, st_id)
+    ctx.symbols.define(varobjects[0].name, 'cls', param, ctx.st_id)
 
     paramlist = [param]
-    replaceAndFindParentsOfParams(paramlist, 0, param, 'cls')
+    replaceAndFindParentsOfParams(ctx, paramlist, 0, param, 'cls')
     if isinstance(param, pVar):
         param = paramlist[0]
-    FindParentsOfVarobjects(param, varobjects, 'cls')
+    FindParentsOfVarobjects(ctx, param, varobjects, 'cls')
 
-def decompose_multi_varobjects(len_varobjects, param, varobjects):
+def decompose_multi_varobjects(ctx, len_varobjects, param, varobjects):
 
-    name = varNameGenerator(varnamesRead)
+    name = varNameGenerator(ctx.varnamesRead, ctx.rng)
     pvar = pVar(name)
-    dealWithStatement(param, varobjects=[pvar])
+    dealWithStatement(ctx, param, varobjects=[pvar])
 
     if isinstance(param, pFunc):
         for i in range(len_varobjects):
@@ -1163,14 +937,14 @@ def decompose_multi_varobjects(len_varobjects, param, varobjects):
             psubs.add_prefix(copy.deepcopy(pvar))
             psubs.add_content(pNumber(i))
             psubs.add_fullstr(name + '[' + str(i) + ']')
-            dealWithStatement(psubs, [varobject])
+            dealWithStatement(ctx, psubs, [varobject])
     
     else:
         for i in range(len_varobjects):
             varobject = varobjects[i]
-            dealWithStatement(param, [varobject])
+            dealWithStatement(ctx, param, [varobject])
 
-def handle_pFunc(param, varobjects=None):
+def handle_pFunc(ctx, param, varobjects=None):
 
     '''
         handle the closure situation like
@@ -1184,25 +958,25 @@ def handle_pFunc(param, varobjects=None):
             restrictedFunction when passing
             but is actually closure
     '''
-    handleRestricted(param)
+    handleRestricted(ctx, param)
     
-    handlefuncNameandSuffix(param, varobjects)
+    handlefuncNameandSuffix(ctx, param, varobjects)
 
     if varobjects:
-        FindParentsOfVarobjects(param, varobjects, 'function')
+        FindParentsOfVarobjects(ctx, param, varobjects, 'function')
 
     for i in range(len(param.params)):
-        replaceAndFindParentsOfParams(param.params, i, param, 'function')    
+        replaceAndFindParentsOfParams(ctx, param.params, i, param, 'function')    
 
     handleSurround(param)
 
     param_, \
         param_funcName_in_funcNameTopFunc \
-            = recordNewStatement(param) 
+            = recordNewStatement(ctx, param) 
 
-    updateVarTofuncst(varobjects, param_, param_funcName_in_funcNameTopFunc)
+    updateVarTofuncst(ctx, varobjects, param_, param_funcName_in_funcNameTopFunc)
 
-def handle_pWith(param, varobjects):
+def handle_pWith(ctx, param, varobjects):
     
     if varobjects:
         raise Exception(Cyan(\
@@ -1212,43 +986,43 @@ def handle_pWith(param, varobjects):
     for item, asitem in param.withitems:
         if not item.varTofunc:
             paramlist = [item]
-            replaceAndFindParentsOfParams(paramlist, 0, param, 'with')
+            replaceAndFindParentsOfParams(ctx, paramlist, 0, param, 'with')
             item = paramlist[0]
 
-        if asitem: varTowith[asitem.name+mark] = (param, cnt, st_id)
-        else: varTowith[item.name+mark] = (param, cnt, st_id)
+        if asitem: ctx.symbols.define(asitem.name, 'with', (param, cnt), ctx.st_id)
+        else: ctx.symbols.define(item.name, 'with', (param, cnt), ctx.st_id)
         cnt += 1
-    param.set_id(withid)
-    ingredient.append(param)
+    param.set_id(ctx.withid)
+    ctx.ingredient.append(param)
 
-def dealWithStatement(param, varobjects=None):
+def dealWithStatement(ctx, param, varobjects=None):
     
+    tagBody(ctx, param)
     if varobjects:
         len_varobjects = len(varobjects)
         if len_varobjects > 1:
-            decompose_multi_varobjects(len_varobjects, param, varobjects)
+            decompose_multi_varobjects(ctx, len_varobjects, param, varobjects)
             return 
 
-    global st_id, withid
-    st_id += 1
-    withid += 1
+    ctx.st_id += 1
+    ctx.withid += 1
 
     if isinstance(param, pWith):
-        handle_pWith(param, varobjects)
+        handle_pWith(ctx, param, varobjects)
 
     elif varobjects == None:
-        handle_pFunc(param)
+        handle_pFunc(ctx, param)
 
     elif isinstance(varobjects[0], pSubs): 
-        handle_pSubs_onTheLeft(param, varobjects)
+        handle_pSubs_onTheLeft(ctx, param, varobjects)
 
     elif isinstance(varobjects[0], pVar) and \
             '.' in varobjects[0].name:
 
-        handle_pVar_onTheLeft(param, varobjects)
+        handle_pVar_onTheLeft(ctx, param, varobjects)
 
     elif isinstance(param, pFunc):
-        handle_pFunc(param, varobjects)
+        handle_pFunc(ctx, param, varobjects)
 
     else:
 
@@ -1260,9 +1034,9 @@ def dealWithStatement(param, varobjects=None):
             not isinstance(param, pConst):
             
             paramlist = [param]
-            replaceAndFindParentsOfParams(paramlist, 0, param, 'records')
+            replaceAndFindParentsOfParams(ctx, paramlist, 0, param, 'records')
             
             if isinstance(param, pVar):
                 param = paramlist[0]
 
-        records[varobjects[0].name+mark] = (param, st_id)
\ No newline at end of file
+        ctx.symbols.define(varobjects[0].name, 'record', param, ctx.st_id)
\ No newline at end of file
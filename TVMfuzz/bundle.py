@@ -0,0 +1,272 @@
+import io
+import os
+import json
+import tempfile
+from TVMfuzz.colors import *
+from TVMfuzz.generation import generateProgram
+from TVMfuzz.execution import runProgram, describe, sandboxEnv, ForkServer, outputLimit
+
+'''
+    a bundle is one file holding many generated programs, each
+    wrapped in a function of its own; the interpreter and the
+    imports are paid once for all of them, a Python exception
+    ends only its own program, and a native crash, which takes
+    the whole interpreter down, is narrowed down by running the
+    programs that did not finish again in halves
+'''
+
+runner = '''
+import io
+import sys
+import json
+import time
+import signal
+import builtins
+import linecache
+import traceback
+import contextlib
+
+class SnippetTimeout(Exception):
+    pass
+
+def alarm(signum, frame):
+    raise SnippetTimeout('the program ran out of time')
+
+def clipped(text):
+
+    """the head and the tail of text, as the parent keeps them"""
+
+    if len(text) > OUTPUT_LIMIT:
+        text = text[:OUTPUT_LIMIT // 2] + '\\n...\\n' + text[-OUTPUT_LIMIT // 2:]
+    return text
+
+def compileSnippet(i):
+    name = '<program_' + str(i) + '>'
+    lines = SOURCES[i].splitlines(True)
+    linecache.cache[name] = (len(SOURCES[i]), None, lines, name)
+    return compile(SOURCES[i], name, 'exec')
+
+def snippetFrames(e):
+
+    """
+        the traceback from the frame of the program on, as python
+        would print it for the program alone, without the frames
+        of the runner
+    """
+
+    tb = e.__traceback__
+    while tb and not tb.tb_frame.f_code.co_filename.startswith('<program_'):
+        tb = tb.tb_next
+    return tb
+
+def runSnippet(i, timeout):
+
+    out = io.StringIO()
+    err = io.StringIO()
+    returncode = 0
+    timedOut = False
+    start = time.monotonic()
+    try:
+        with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+            signal.setitimer(signal.ITIMER_REAL, timeout)
+            try:
+                PROGRAMS[i]()
+            finally:
+                signal.setitimer(signal.ITIMER_REAL, 0)
+    except SnippetTimeout:
+        timedOut = True
+        returncode = -signal.SIGALRM
+    except SystemExit as e:
+        returncode = e.code if isinstance(e.code, int) else int(e.code is not None)
+    except BaseException as e:
+        err.write(''.join(traceback.format_exception(type(e), e, snippetFrames(e))))
+        returncode = 1
+    return {'index': i,
+            'returncode': returncode,
+            'timedOut': timedOut,
+            'duration': time.monotonic() - start,
+            'stdout': clipped(out.getvalue()),
+            'stderr': clipped(err.getvalue())}
+
+def main():
+
+    """
+        python bundle.py [RESULTS TIMEOUT [INDEX ...]]; a line is
+        written for every program as soon as it ends
+    """
+
+    sink = open(sys.argv[1], 'a') if len(sys.argv) > 1 else sys.stdout
+    timeout = float(sys.argv[2]) if len(sys.argv) > 2 else 60
+    indices = [int(ele) for ele in sys.argv[3:]] or range(len(PROGRAMS))
+
+    signal.signal(signal.SIGALRM, alarm)
+    for i in indices:
+        sink.write(json.dumps(runSnippet(i, timeout)) + '\\n')
+        sink.flush()
+
+if __name__ == '__main__':
+    main()
+'''
+
+def writeBundle(programs, f):
+
+    '''
+        every program runs in globals of its own, as if it were
+        the main module, so it behaves as it would in a file
+    '''
+
+    f.write('# a bundle of ' + str(len(programs)) + ' programs generated by TVMfuzz\n')
+    f.write('SOURCES = [\n')
+    for program in programs:
+        f.write('    ' + repr(program) + ',\n')
+    f.write(']\n')
+
+    for i in range(len(programs)):
+        f.write('\ndef program_' + str(i) + '():\n')
+        f.write('    exec(compileSnippet(' + str(i) + '), ' + \
+                "{'__name__': '__main__', '__builtins__': builtins})\n")
+
+    f.write('\nOUTPUT_LIMIT = ' + str(outputLimit) + '\n')
+    f.write('\nPROGRAMS = [' + \
+            ', '.join('program_' + str(i) for i in range(len(programs))) + ']\n')
+    f.write(runner)
+
+def generateBundle(ctx, f, number, seeds=None):
+
+    '''
+        write a bundle of number programs into f, leaving out the
+        ones that could not be generated. seeds, when given, holds
+        the seed of each program. returns, for each program the
+        bundle holds, which of the number it is, so that snippet i
+        of the bundle is program kept[i]
+    '''
+
+    programs = []
+    kept = []
+    for i in range(number):
+        ctx.reset(seeds[i] if seeds else None)
+        program = io.StringIO()
+        try:
+            generateProgram(ctx, program)
+        except Exception as e:
+            print(Red('program ' + str(i) + ' of the bundle failed: ' + str(e)))
+            continue
+        programs.append(program.getvalue())
+        kept.append(i)
+
+    writeBundle(programs, f)
+    return kept
+
+def readResults(path):
+
+    finished = {}
+    with open(path, 'r') as results:
+        for line in results:
+            if not line.endswith('\n'):
+                break # cut off by a crash
+            record = json.loads(line)
+            finished[record['index']] = record
+    return finished
+
+def runBundle(path, indices, timeout, run):
+
+    '''
+        run the programs indices of the bundle path once; returns
+        the record of the process and those of the programs that
+        ended
+    '''
+
+    fd, results = tempfile.mkstemp(prefix='tvmfuzz-', suffix='.jsonl')
+    os.close(fd)
+    try:
+        '''one timeout of slack for starting the interpreter'''
+        record = run(path, timeout * (len(indices) + 1),
+                     [results, str(timeout)] + [str(i) for i in indices])
+        finished = readResults(results)
+    finally:
+        os.remove(results)
+    return record, finished
+
+def executeBundle(path, count, timeout=60, run=None):
+
+    '''
+        the records of the count programs of the bundle path, in
+        order; run(path, timeout, args) runs the bundle in a child
+        and returns its record, runProgram by default.
+
+        when the interpreter dies, the programs that ended keep
+        their records and the rest is run again, halved until a
+        program taking the interpreter down is alone; a crash that
+        needs the programs run before it may not show up alone,
+        and the program then gets the record of its lone run
+    '''
+
+    if run is None:
+        env = sandboxEnv()
+        run = lambda path, timeout, args: runProgram(path, timeout, env, args=args)
+
+    records = [None] * count
+    groups = [list(range(count))]
+    while groups:
+        indices = groups.pop()
+        if not indices:
+            continue
+        record, finished = runBundle(path, indices, timeout, run)
+
+        for i, snippet in finished.items():
+            records[i] = describe(path + '#' + str(i),
+                                  snippet['returncode'],
+                                  snippet['timedOut'],
+                                  snippet['duration'],
+                                  snippet['stdout'].encode(),
+                                  snippet['stderr'].encode())
+
+        rest = [i for i in indices if i not in finished]
+        if len(rest) == 1:
+            record['program'] = path + '#' + str(rest[0])
+            records[rest[0]] = record
+        elif rest:
+            groups.append(rest[len(rest) // 2:])
+            groups.append(rest[:len(rest) // 2])
+
+    return records
+
+def executeBundles(bundles, results=None, jobs=None, timeout=60,
+                   pythonpath=(), python=None, preload=None):
+
+    '''
+        executePrograms for bundles, a list of (path, count); the
+        records of all their programs are returned, bundle after
+        bundle
+    '''
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    jobs = jobs or os.cpu_count() or 1
+    env = sandboxEnv(pythonpath)
+    server = None
+    if preload is not None:
+        server = ForkServer(preload, jobs, pythonpath, python)
+        run = lambda path, timeout, args: server.submit(path, timeout, args).result()
+    else:
+        run = lambda path, timeout, args: runProgram(path, timeout, env, python, args)
+
+    sink = open(results, 'w') if results else None
+    records = []
+    try:
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            futures = [pool.submit(executeBundle, path, count, timeout, run)
+                       for path, count in bundles]
+            for future in futures:
+                for record in future.result():
+                    records.append(record)
+                    if sink:
+                        sink.write(json.dumps(record) + '\n')
+                        sink.flush()
+    finally:
+        if server:
+            server.close()
+        if sink:
+            sink.close()
+
+    return records
@@ -0,0 +1,72 @@
+import os
+import random
+import hashlib
+from TVMfuzz.generation import generate
+
+'''
+    the seed of program i of a campaign is a keyed hash of the
+    campaign seed and the counter i, not the i-th draw of one
+    generator: any program is drawn again from its index alone,
+    and workers sharing out the indices never draw the same
+    stream twice, however many of them there are
+'''
+
+def streamSeed(campaign, index):
+    digest = hashlib.blake2b(str(index).encode(), digest_size=8,
+                             key=str(campaign).encode()).digest()
+    return int.from_bytes(digest, 'big') >> 1
+
+def newCampaign():
+    return random.SystemRandom().getrandbits(63)
+
+def programPath(output, index):
+    return os.path.join(output, 'program_' + str(index) + '.py')
+
+def generateOne(ctx, output, campaign, index):
+
+    '''program index of the campaign; (index, path, seed, error)'''
+
+    path = programPath(output, index)
+    seed = streamSeed(campaign, index)
+    try:
+        generate(ctx, path, seed)
+    except Exception as e:
+        if os.path.exists(path):
+            os.remove(path)
+        return index, None, seed, str(e)
+    return index, path, seed, None
+
+worker = None # (ctx, output, campaign) inherited by forked workers
+
+def generateShare(indices):
+    ctx, output, campaign = worker
+    return [generateOne(ctx, output, campaign, index) for index in indices]
+
+def generatePrograms(ctx, output, number, campaign, jobs=1):
+
+    '''
+        programs 0 to number-1 of the campaign into output, on jobs
+        forked workers that inherit the graph instead of unpickling
+        it; the outcomes of generateOne in the order of the indices.
+        where processes cannot fork, as on Windows, they are drawn
+        one after another
+    '''
+
+    import multiprocessing
+
+    if jobs <= 1 or number <= 1 or 'fork' not in multiprocessing.get_all_start_methods():
+        return [generateOne(ctx, output, campaign, index) for index in range(number)]
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    global worker
+    worker = (ctx, output, campaign)
+    try:
+        shares = [list(range(start, number, jobs)) for start in range(jobs)]
+        with ProcessPoolExecutor(max_workers=jobs,
+                                 mp_context=multiprocessing.get_context('fork')) as pool:
+            outcomes = [outcome for share in pool.map(generateShare, shares)
+                        for outcome in share]
+    finally:
+        worker = None
+    return sorted(outcomes, key=lambda outcome: outcome[0])
@@ -0,0 +1,347 @@
+import ast
+import os
+import sys
+import pickle
+import hashlib
+import TVMfuzz
+from TVMfuzz.colors import *
+from TVMfuzz.syntax import Param, pFunc, pVar
+from TVMfuzz.utils import IndexedSet
+from TVMfuzz.elements import *
+
+cacheDir = 'byproduct/cache'
+fragmentDir = os.path.join(cacheDir, 'files')
+record_path = 'byproduct/astTree.txt'
+
+def corpusKey(dir, filelist):
+
+    '''
+        the snapshot is only valid for exactly these test files
+        and this version of TVMfuzz, so both go into the key
+    '''
+
+    sha = hashlib.sha256()
+    sha.update(TVMfuzz.__version__.encode())
+    for file in sorted(filelist):
+        with open(os.path.join(dir, file), 'rb') as source:
+            digest = hashlib.sha256(source.read()).hexdigest()
+        sha.update((file + ':' + digest + '\n').encode())
+    return sha.hexdigest()
+
+def deepRecursion():
+    '''the Param graph is deeply linked, pickle walks it recursively'''
+    limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(max(limit, 100000))
+    return limit
+
+def loads(data):
+
+    limit = deepRecursion()
+    try:
+        return pickle.loads(data)
+    finally:
+        sys.setrecursionlimit(limit)
+
+def dumps(obj):
+
+    limit = deepRecursion()
+    try:
+        return pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+    finally:
+        sys.setrecursionlimit(limit)
+
+def writeAtomically(path, data):
+    tmp = path + '.' + str(os.getpid()) + '.tmp'
+    with open(tmp, 'wb') as cache:
+        cache.write(data)
+    os.replace(tmp, path)
+
+def loadPickle(path):
+    with open(path, 'rb') as cache:
+        return loads(cache.read())
+
+def savePickle(path, obj):
+    writeAtomically(path, dumps(obj))
+
+def saveSnapshot(path, ctx):
+
+    for old in os.listdir(cacheDir):
+        if old.startswith('corpus-') and old.endswith('.pkl'):
+            os.remove(os.path.join(cacheDir, old))
+
+    savePickle(path, ctx)
+
+def analyzeFile(file_path):
+
+    '''
+        every test file is analyzed in a context of its own, so
+        that what it contributes does not depend on other files
+    '''
+
+    from TVMfuzz.getAST import NodeTransformer
+
+    ctx = AnalysisContext()
+    ctx.source = os.path.basename(file_path)
+    ctx.rng.seed(ctx.source)
+
+    with open(file_path, 'r') as source:
+        tree_node = ast.parse(source.read())
+
+    writeAtomically(record_path, ast.dump(tree_node, indent=2).encode())
+
+    NodeTransformer(ctx).visit(tree_node)
+    return ctx
+
+def analyzeFileInWorker(file_path, path=None):
+
+    '''
+        runs in a worker process; the fragment travels back
+        already pickled, so that the parent never unpickles the
+        deep Param graph on the executor's result thread
+    '''
+
+    data = dumps(analyzeFile(file_path))
+    if path:
+        writeAtomically(path, data)
+    return data
+
+def fileKey(file_path):
+    sha = hashlib.sha256()
+    sha.update(TVMfuzz.__version__.encode() + b'\n')
+    with open(file_path, 'rb') as source:
+        sha.update(source.read())
+    return sha.hexdigest()
+
+def fragmentPath(file_path, useCache):
+    if not useCache:
+        return None
+    return os.path.join(fragmentDir, fileKey(file_path) + '.pkl')
+
+def loadFragment(file_path, path):
+
+    '''
+        the analysis of one test file, taken from its own snapshot
+        when the file is unchanged since it was last analyzed
+    '''
+
+    if path and os.path.exists(path):
+        try:
+            return loadPickle(path)
+        except Exception as e:
+            print(Red('ignoring broken snapshot ' + path + ': ' + str(e)))
+    return None
+
+def pruneFragments(paths):
+
+    '''drop the fragments of test files that changed or are gone'''
+
+    keep = set(os.path.basename(path) for path in paths if path)
+    for old in os.listdir(fragmentDir):
+        if old.endswith('.pkl') and old not in keep:
+            os.remove(os.path.join(fragmentDir, old))
+
+def analyzeFragments(file_paths, paths, jobs):
+
+    '''
+        analyze the given files, in a pool of worker processes
+        when there is more than one of them
+    '''
+
+    if jobs == 1 or len(file_paths) <= 1:
+        frags = []
+        for file_path, path in zip(file_paths, paths):
+            frag = analyzeFile(file_path)
+            if path:
+                savePickle(path, frag)
+            frags.append(frag)
+        return frags
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(analyzeFileInWorker, file_path, path)
+                   for file_path, path in zip(file_paths, paths)]
+        return [loads(future.result()) for future in futures]
+
+def graphParams(roots):
+
+    '''every Param reachable from roots'''
+
+    seen = {}
+    stack = list(roots)
+    while stack:
+        ele = stack.pop()
+        if isinstance(ele, Param):
+            if id(ele) not in seen:
+                seen[id(ele)] = ele
+                stack.extend(vars(ele).values())
+        elif isinstance(ele, (list, tuple, IndexedSet)):
+            stack.extend(ele)
+        elif isinstance(ele, dict):
+            stack.extend(ele.keys())
+            stack.extend(ele.values())
+    return list(seen.values())
+
+def redirected(value, merged):
+    if isinstance(value, Param):
+        return merged.get(value, value)
+    if isinstance(value, list):
+        value[:] = [redirected(ele, merged) for ele in value]
+    elif isinstance(value, tuple):
+        return tuple(redirected(ele, merged) for ele in value)
+    elif isinstance(value, IndexedSet) and any(ele in merged for ele in value):
+        return IndexedSet(redirected(ele, merged) for ele in value)
+    return value
+
+def redirect(param, merged, names):
+
+    '''
+        point the links names of param at the statements merged
+        maps the statements folded away to; a statement that
+        becomes a parent of param gets param as a child
+    '''
+
+    for name in names:
+        if name not in vars(param):
+            continue
+        if name == 'parents':
+            parents = {}
+            for parent, count in param.parents.items():
+                kept = merged.get(parent, parent)
+                parents[kept] = parents.get(kept, 0) + count
+                if kept is not parent:
+                    kept.add_child(param)
+            param.parents = parents
+        else:
+            setattr(param, name, redirected(getattr(param, name), merged))
+
+def mergeFragment(ctx, frag):
+
+    '''
+        a statement already met in an earlier file is folded
+        into that one, just as repeated statements are folded
+        within a single file; statements inside a with block
+        always stay apart. the rest of the file is then pointed
+        at the statement it was folded into, as it would have
+        been, had both been met in one file
+    '''
+
+    from TVMfuzz.analyzeSyntax import handleRepetition
+
+    merged = {} # statement of frag -> the one of ctx it is folded into
+    names = dict(ctx.funcNameTopFunc)
+    for ing in frag.ingredient:
+        if isinstance(ing, pFunc) and not ing.surround and ing.funcName in names:
+            if len(names[ing.funcName].params) == len(ing.params):
+                merged[ing] = names[ing.funcName]
+        elif isinstance(ing, pFunc):
+            names[ing.funcName] = ing
+
+    '''
+        children last: handleRepetition takes a folded statement
+        out of the children of its parents itself
+    '''
+    params = [param for param in graphParams(frag.ingredient) if param not in merged]
+    if merged:
+        for param in params:
+            redirect(param, merged, [name for name in vars(param) if name != 'children'])
+
+    for ing in frag.ingredient:
+        if ing in merged:
+            ing_ = merged[ing]
+            handleRepetition(len(ing.params), ing_.params, ing.params, ing_, ing)
+            continue
+
+        if isinstance(ing, pFunc) and ing.funcName not in ctx.funcNameTopFunc:
+            ctx.funcNameTopFunc[ing.funcName] = ing
+        ctx.ingredient.append(ing)
+
+    if merged:
+        for param in params:
+            redirect(param, merged, ['children'])
+
+    ctx.helperFuncDef.update(frag.helperFuncDef)
+    ctx.funcDefParents.update(frag.funcDefParents)
+    ctx.helperNames.update(frag.helperNames)
+    ctx.helperSource.update(frag.helperSource)
+    ctx.importSet.update(frag.importSet)
+    ctx.importUses.update(frag.importUses)
+
+def checkProducers(ctx):
+
+    '''
+        every statement a variable is produced by must be an
+        ingredient, or a statement of a with block, which stays
+        with its block; anything else was folded away and lost
+    '''
+
+    ingredient = set(ctx.ingredient)
+    for param in graphParams(ctx.ingredient):
+        if isinstance(param, pVar):
+            for producer in param.varTofunc:
+                if producer not in ingredient and not producer.surround:
+                    raise Exception(Cyan(param.name + ' is produced by ' + \
+                        producer.funcName + ', which is no ingredient'))
+
+def analyzeFiles(dir, filelist, useCache=True, jobs=None):
+
+    file_paths = [os.path.join(dir, file) for file in sorted(filelist)]
+    paths = [fragmentPath(file_path, useCache) for file_path in file_paths]
+    frags = [loadFragment(file_path, path)
+             for file_path, path in zip(file_paths, paths)]
+
+    missing = [i for i in range(len(frags)) if frags[i] is None]
+    if missing:
+        print(Yellow('analyzing ' + str(len(missing)) + ' of ' + \
+            str(len(frags)) + ' test files'))
+        analyzed = analyzeFragments([file_paths[i] for i in missing],
+                                    [paths[i] for i in missing],
+                                    jobs or os.cpu_count() or 1)
+        for i, frag in zip(missing, analyzed):
+            frags[i] = frag
+
+    '''merged in file-name order whatever order the workers finished in'''
+    ctx = AnalysisContext()
+    for frag in frags:
+        mergeFragment(ctx, frag)
+    checkProducers(ctx)
+
+    if useCache:
+        pruneFragments(paths)
+    return ctx
+
+def analyzeCorpus(dir, useCache=True, jobs=None):
+
+    '''
+        build the ingredient graph of all test files in dir,
+        or load it from the snapshot of an earlier run when
+        none of the files changed since; otherwise only the
+        changed or new files are analyzed again
+    '''
+
+    filelist = os.listdir(dir)
+    key = corpusKey(dir, filelist)
+
+    if not useCache:
+        ctx = analyzeFiles(dir, filelist, useCache=False, jobs=jobs)
+        ctx.snapshot = key
+        return ctx
+
+    if not os.path.exists(fragmentDir):
+        os.makedirs(fragmentDir)
+
+    path = os.path.join(cacheDir, 'corpus-' + key + '.pkl')
+    if os.path.exists(path):
+        try:
+            ctx = loadPickle(path)
+            if not isinstance(ctx, AnalysisContext):
+                raise Exception('not an AnalysisContext')
+            print(Green('loaded analysis snapshot ' + path))
+            return ctx
+        except Exception as e:
+            print(Red('ignoring broken snapshot ' + path + ': ' + str(e)))
+
+    ctx = analyzeFiles(dir, filelist, jobs=jobs)
+    ctx.snapshot = key
+    saveSnapshot(path, ctx)
+    return ctx
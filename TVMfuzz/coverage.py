@@ -0,0 +1,129 @@
+import os
+import sys
+import json
+import runpy
+import threading
+
+'''
+    the lines and branches of a target package a program reaches.
+    with sys.monitoring every location reports once and is then
+    switched off, so covered code runs at full speed afterwards;
+    older interpreters fall back to a trace function that only
+    traces the frames of the target
+'''
+
+hits = set()
+output = None
+
+def startCoverage(target, path):
+
+    global output
+    target = os.path.realpath(target) + os.sep
+    output = path
+
+    monitoring = getattr(sys, 'monitoring', None)
+    if monitoring is not None:
+        tool = monitoring.COVERAGE_ID
+        monitoring.use_tool_id(tool, 'TVMfuzz')
+
+        def line(code, lineno):
+            if code.co_filename.startswith(target):
+                hits.add(code.co_filename + ':' + str(lineno))
+            return monitoring.DISABLE
+
+        '''
+            a BRANCH event stands for both ways out of an instruction,
+            so it is switched off once both were taken; BRANCH_LEFT
+            and BRANCH_RIGHT, where they exist, are one way each
+        '''
+        split = hasattr(monitoring.events, 'BRANCH_RIGHT')
+        taken = {} # (code, source) -> destinations reached
+
+        def branch(code, source, destination):
+            if not code.co_filename.startswith(target):
+                return monitoring.DISABLE
+            hits.add(code.co_filename + ':@' + str(source) + '>' + str(destination))
+            if split:
+                return monitoring.DISABLE
+            ways = taken.setdefault((code, source), set())
+            ways.add(destination)
+            if len(ways) > 1:
+                return monitoring.DISABLE
+
+        events = monitoring.events.LINE
+        monitoring.register_callback(tool, monitoring.events.LINE, line)
+        for name in ('BRANCH_LEFT', 'BRANCH_RIGHT', 'BRANCH'):
+            if hasattr(monitoring.events, name):
+                event = getattr(monitoring.events, name)
+                monitoring.register_callback(tool, event, branch)
+                events |= event
+                if name == 'BRANCH_RIGHT':
+                    break
+        monitoring.set_events(tool, events)
+        return
+
+    '''a branch is an arc between two lines run one after the other'''
+    def call(frame, event, arg):
+        filename = frame.f_code.co_filename
+        if not filename.startswith(target):
+            return None
+        last = [frame.f_lineno]
+
+        def local(frame, event, arg):
+            if event == 'line':
+                hits.add(filename + ':' + str(last[0]) + '>' + str(frame.f_lineno))
+                last[0] = frame.f_lineno
+            return local
+        return local
+
+    threading.settrace(call)
+    sys.settrace(call)
+
+def stopCoverage():
+
+    '''write what was reached to the file given to startCoverage'''
+
+    global output
+    if output is None:
+        return
+    sys.settrace(None)
+    threading.settrace(None)
+    with open(output, 'w') as covered:
+        json.dump(sorted(hits), covered)
+    output = None
+
+def readCoverage(path):
+    try:
+        with open(path, 'r') as covered:
+            return set(json.load(covered))
+    except (OSError, ValueError):
+        return set()
+
+def main():
+
+    '''python -m TVMfuzz.coverage TARGET OUTPUT PROGRAM [ARG ...]'''
+
+    import traceback
+
+    target, path, program = sys.argv[1:4]
+    program = os.path.abspath(program)
+    sys.argv = sys.argv[3:]
+    sys.path[0] = os.path.dirname(program)
+    startCoverage(target, path)
+    try:
+        runpy.run_path(program, run_name='__main__')
+    except SystemExit:
+        raise
+    except BaseException as e:
+
+        '''the traceback python program would have shown'''
+        tb = e.__traceback__
+        while tb and tb.tb_frame.f_code.co_filename != program:
+            tb = tb.tb_next
+        traceback.print_exception(type(e), e, tb or e.__traceback__)
+        sys.exit(1)
+    finally:
+        stopCoverage()
+
+if __name__ == '__main__':
+    main()
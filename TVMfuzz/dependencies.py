@@ -0,0 +1,116 @@
+import ast
+import json
+from TVMfuzz.helpers import loadedNames
+
+'''
+    which top-level statements of a program each statement needs:
+    for every name it reads, the last statement before it that
+    bound the name. a set of statements closed under this relation
+    never fails with a NameError the whole program would not have
+'''
+
+def definedNames(node):
+
+    '''
+        the names a top-level statement binds anywhere in it, not
+        counting those local to the functions and classes it defines
+    '''
+
+    if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+        return set([node.name])
+    if isinstance(node, (ast.Import, ast.ImportFrom)):
+        return set((alias.asname or alias.name).split('.')[0]
+                   for alias in node.names if alias.name != '*')
+
+    names = set()
+    todo = [node]
+    while todo:
+        ele = todo.pop()
+        if isinstance(ele, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            names.add(ele.name)
+            continue
+        if isinstance(ele, ast.Name) and not isinstance(ele.ctx, ast.Load):
+            names.add(ele.id)
+        todo.extend(ast.iter_child_nodes(ele))
+    return names
+
+def usedNames(node):
+
+    '''
+        the names a statement reads, including the object of an
+        attribute or item it assigns to: a.b = 1 and a += 1 need a
+    '''
+
+    names = loadedNames(node)
+    for ele in ast.walk(node):
+        if isinstance(ele, ast.AugAssign) and isinstance(ele.target, ast.Name):
+            names.add(ele.target.id)
+        if isinstance(ele, (ast.Attribute, ast.Subscript)) and \
+            not isinstance(ele.ctx, ast.Load):
+            while isinstance(ele, (ast.Attribute, ast.Subscript)):
+                ele = ele.value
+            if isinstance(ele, ast.Name):
+                names.add(ele.id)
+    return names
+
+def statementDependencies(source):
+
+    '''
+        for each top-level statement of source, the indices of the
+        earlier statements it needs directly
+    '''
+
+    body = ast.parse(source).body
+    binder = {} # name -> last statement binding it
+    late = {} # def -> names its body reads that were not bound yet
+    dependencies = []
+    for i in range(len(body)):
+        used = usedNames(body[i])
+        needs = set(binder[name] for name in used if name in binder)
+
+        '''a function reads its globals when called, not when defined'''
+        for j in list(needs):
+            needs.update(binder[name] for name in late.get(j, ()) if name in binder)
+        if isinstance(body[i], (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            late[i] = set(name for name in used if name not in binder)
+
+        needs.discard(i)
+        dependencies.append(sorted(needs))
+        for name in definedNames(body[i]):
+            binder[name] = i
+    return dependencies
+
+def sidecarPath(path):
+    return path[:-3] + '.deps.json' if path.endswith('.py') else path + '.deps.json'
+
+def writeDependencies(path, source):
+
+    '''
+        the sidecar of the program path: its statements by their
+        first and last line, and the statements each one needs
+    '''
+
+    try:
+        body = ast.parse(source).body
+    except SyntaxError:
+        return
+    with open(sidecarPath(path), 'w') as sidecar:
+        json.dump({'statements': [[stmt.lineno, stmt.end_lineno] for stmt in body],
+                   'dependencies': statementDependencies(source)}, sidecar)
+
+def readDependencies(path, source):
+
+    '''
+        the dependencies in the sidecar of the program path, if it
+        describes the statements of source
+    '''
+
+    try:
+        with open(sidecarPath(path), 'r') as sidecar:
+            data = json.load(sidecar)
+        statements = [[stmt.lineno, stmt.end_lineno] for stmt in ast.parse(source).body]
+    except (OSError, ValueError, KeyError, SyntaxError):
+        return None
+    if data.get('statements') != statements:
+        return None
+    return data['dependencies']
@@ -1,58 +1,99 @@
+import random
+from TVMfuzz.symbolTable import SymbolTable
+from TVMfuzz.utils import Multiset
 
-'''ASTutils.py'''
-varnamesRead = set()
-mutable = True
-
-'''generation.py'''
-
-funcPool = {}
-varPool = set()
-withPool = set()
-clsPool = {}
-subsPool = {}
-lazy = []
-restAdjuncts = []
-
-'''analyzeSyntax'''
-importSet = set()
-funcNameTopFunc = {}
-constants = set()
-records = {}
-
-id = 0
-
-varTofuncst = {}
+taboo = ['gpu']
+forbiddenFuncDef = ['random_bsr_matrix']
 
-varTowith = {}
+class AnalysisContext:
 
-taboo = ['gpu']
-ingredient = []
+    '''
+        everything the analysis of test files builds up;
+        one instance per analyzed file, merged afterwards
+    '''
 
-clsInstanceToParam = {}
-fullstrTopsubs = {}
+    def __init__(self):
+
+        '''ASTutils.py'''
+        self.varnamesRead = set()
+        self.rng = random.Random(0) # names made up during analysis, reseeded per file
+        self.mutable = True
+
+        '''analyzeSyntax'''
+        self.importSet = set()
+        self.importUses = {} # import -> dotted names that need it, None for always
+        self.funcNameTopFunc = {}
+        self.symbols = SymbolTable()
+        self.ingredient = []
+        self.functionDefNames = set(['relay.multiply',
+                                     'relay.divide',
+                                     'relay.add',
+                                     'relay.subtract',
+                                     'relay.less',
+                                     'relay.greater',
+                                     'relay.less_equal',
+                                     'relay.greater_equal',
+                                     'relay.equal',
+                                     'relay.not_equal'])
+        self.funcTolambda = {}
+        self.st_id = 0
+        self.withid = 0
+
+        '''getAST'''
+        self.source = '' # name of the test file being analyzed
+        self.body = None # the test function whose body is being analyzed
+        self.helperFuncDef = {}
+        self.helperStatDef_global = []
+        self.helperStatDef_local = {}
+        self.funcDefParents = {}
+        self.funcDefs = []
+        self.helperNames = {} # names a helper needs that its parents do not define
+        self.helperSource = {} # node -> unparsed text
+
+        '''corpus'''
+        self.snapshot = None # the corpus key, the analysis is a function of it
+
+class ProgramContext:
 
+    '''
+        what has been emitted so far into the program being built;
+        every draw comes from rng, so the seed and the graph fix
+        the program
+    '''
 
-functionDefNames = set(['relay.multiply',
-                        'relay.divide',
-                        'relay.add',
-                        'relay.subtract',
-                        'relay.less',
-                        'relay.greater',
-                        'relay.less_equal',
-                        'relay.greater_equal',
-                        'relay.equal',
-                        'relay.not_equal'])
+    def __init__(self, seed=None):
+        if seed is None:
+            seed = random.getrandbits(63)
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.funcPool = {}
+        self.varPool = set()
+        self.withPool = set()
+        self.clsPool = {}
+        self.subsPool = {}
+        self.lazy = Multiset() # statements being emitted further up
+        self.restAdjuncts = []
+        self.helpers = set() # helper nodes already written
+        self.bodies = {} # test function body -> whether the program draws from it
+        self.used = {} # id of a set of candidates -> (the set, those from bodies drawn from, their sampler)
+        self.root = None # the ingredient the program was grown from
+        self.consts = set() # constants the scheduler drew
+
+class FuzzContext:
 
-funcTolambda = {}
+    '''
+        the analyzed graph plus the state of the program being
+        generated from it; contexts sharing one AnalysisContext
+        can generate side by side
+    '''
 
-'''getAST'''
+    def __init__(self, analysis=None):
+        self.analysis = analysis if analysis else AnalysisContext()
+        self.program = ProgramContext()
+        self.scheduler = None # weighs roots and producers, uniform when None
 
-helperFuncDef = {}
-helperStatDef_global = []
-helperStatDef_local = {}
-funcDefParents = {}
-forbiddenFuncDef = ['random_bsr_matrix']
-funcDefs = []
+    def reset(self, seed=None):
+        self.program = ProgramContext(seed)
 
 
 '''autorun'''
@@ -0,0 +1,471 @@
+import os
+import sys
+import json
+import time
+import signal
+import shutil
+import select
+import tempfile
+import threading
+import subprocess
+
+'''
+    generated programs are run in child processes, each in a
+    session and a scratch directory of its own, so that a hang,
+    a native crash or stray files never reach the fuzzer; the
+    outcome of every program becomes one line of JSON
+'''
+
+outputLimit = 64 * 1024 # bytes of stdout and stderr kept per program
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) # the folder of TVMfuzz
+
+def sandboxEnv(pythonpath=()):
+
+    '''
+        the environment of a child; the folders in pythonpath come
+        first, so that a stub tvm package can stand in for TVM
+    '''
+
+    env = dict(os.environ)
+    paths = [os.path.abspath(path) for path in pythonpath]
+    if env.get('PYTHONPATH'):
+        paths.append(env['PYTHONPATH'])
+    if paths:
+        env['PYTHONPATH'] = os.pathsep.join(paths)
+    env['PYTHONDONTWRITEBYTECODE'] = '1'
+    env['PYTHONFAULTHANDLER'] = '1'
+    return env
+
+def clip(data):
+    text = data.decode('utf-8', 'replace')
+    if len(text) > outputLimit:
+        text = text[:outputLimit // 2] + '\n...\n' + text[-outputLimit // 2:]
+    return text
+
+def extractTraceback(stderr):
+
+    '''the last Python traceback in stderr and its final line'''
+
+    start = stderr.rfind('Traceback (most recent call last):')
+    if start == -1:
+        return None, None
+    traceback = stderr[start:].rstrip('\n')
+    lines = [line for line in traceback.split('\n') if line.strip()]
+    exception = None
+    for line in reversed(lines):
+        if not line.startswith(' '):
+            exception = line
+            break
+    return traceback, exception
+
+def killGroup(pid):
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+def runProgram(path, timeout=60, env=None, python=None, args=(), coverage=None):
+
+    '''
+        run one program and describe the outcome; status is ok,
+        error (a Python exception), crash (killed by a signal) or
+        timeout. with coverage, the folder of a package, the record
+        also holds the set of its lines and branches the program
+        reached
+    '''
+
+    scratch = tempfile.mkdtemp(prefix='tvmfuzz-')
+    command = [python or sys.executable, os.path.abspath(path)]
+    if coverage:
+        fd, covered = tempfile.mkstemp(prefix='tvmfuzz-', suffix='.json')
+        os.close(fd)
+        command = command[:1] + ['-m', 'TVMfuzz.coverage',
+                                   os.path.abspath(coverage), covered] + command[1:]
+        env = dict(env if env is not None else os.environ)
+        env['PYTHONPATH'] = os.pathsep.join([ele for ele in
+            (env.get('PYTHONPATH'), root) if ele])
+    '''output goes to files, of which only the clipped part is read'''
+    outFile = tempfile.TemporaryFile(prefix='tvmfuzz-')
+    errFile = tempfile.TemporaryFile(prefix='tvmfuzz-')
+    start = time.monotonic()
+    try:
+        proc = subprocess.Popen(command + list(args),
+                                cwd=scratch,
+                                env=env,
+                                stdin=subprocess.DEVNULL,
+                                stdout=outFile,
+                                stderr=errFile,
+                                start_new_session=True)
+        timedOut = False
+        try:
+            proc.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            timedOut = True
+            killGroup(proc.pid)
+            proc.wait()
+        finally:
+            killGroup(proc.pid) # whatever the program left running
+            shutil.rmtree(scratch, ignore_errors=True)
+        duration = time.monotonic() - start
+        stdout, stderr = readClipped(outFile), readClipped(errFile)
+    finally:
+        outFile.close()
+        errFile.close()
+
+    record = describe(path, proc.returncode, timedOut, duration, stdout, stderr)
+    if coverage:
+        from TVMfuzz.coverage import readCoverage
+        record['coverage'] = readCoverage(covered)
+        os.remove(covered)
+    return record
+
+def describe(path, returncode, timedOut, duration, stdout, stderr):
+
+    stderr = clip(stderr)
+    traceback, exception = extractTraceback(stderr)
+
+    if timedOut:
+        status = 'timeout'
+    elif returncode < 0:
+        status = 'crash'
+    elif returncode:
+        status = 'error'
+    else:
+        status = 'ok'
+
+    signame = None
+    if status == 'crash':
+        try:
+            signame = signal.Signals(-returncode).name
+        except ValueError:
+            signame = str(-returncode)
+
+    return {
+        'program': path,
+        'status': status,
+        'returncode': returncode,
+        'signal': signame,
+        'duration': round(duration, 3),
+        'stdout': clip(stdout),
+        'stderr': stderr,
+        'traceback': traceback,
+        'exception': exception,
+    }
+
+def runChild(path, scratch, args=(), coverage=None):
+
+    '''
+        the body of a forked child: behave like python path would,
+        on top of the modules the server imported already; with
+        coverage, what it reaches of that folder goes to the file
+        coverage.json of scratch
+    '''
+
+    import random
+    import builtins
+    import traceback
+    import faulthandler
+
+    code = 0
+    try:
+        os.setsid()
+        os.chdir(scratch)
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+        null = os.open(os.devnull, os.O_RDONLY)
+        os.dup2(null, 0)
+        for fd, name in ((1, 'stdout'), (2, 'stderr')):
+            out = os.open(os.path.join(scratch, name), os.O_WRONLY | os.O_CREAT, 0o600)
+            os.dup2(out, fd)
+        sys.stdin = open(0, 'r', closefd=False)
+        sys.stdout = open(1, 'w', closefd=False)
+        sys.stderr = open(2, 'w', closefd=False)
+        faulthandler.enable(sys.stderr)
+
+        '''children must not share the random state of the server'''
+        random.seed()
+        if 'numpy' in sys.modules:
+            sys.modules['numpy'].random.seed()
+
+        if coverage:
+            from TVMfuzz.coverage import startCoverage
+            startCoverage(coverage, os.path.join(scratch, 'coverage.json'))
+
+        path = os.path.abspath(path)
+        sys.argv = [path] + list(args)
+        sys.path[0] = os.path.dirname(path)
+        with open(path, 'rb') as source:
+            program = compile(source.read(), path, 'exec')
+        exec(program, {'__name__': '__main__',
+                       '__file__': path,
+                       '__builtins__': builtins})
+    except SystemExit as e:
+        if e.code is None:
+            code = 0
+        elif isinstance(e.code, int):
+            code = e.code
+        else:
+            print(e.code, file=sys.stderr)
+            code = 1
+    except BaseException as e:
+        '''the frames of the program only, as python path prints them'''
+        tb = e.__traceback__
+        while tb and tb.tb_frame.f_code.co_filename != path:
+            tb = tb.tb_next
+        if tb is None and not isinstance(e, SyntaxError):
+            tb = e.__traceback__
+        traceback.print_exception(type(e), e, tb)
+        code = 1
+    finally:
+        try:
+            if coverage:
+                from TVMfuzz.coverage import stopCoverage
+                stopCoverage()
+            sys.stdout.flush()
+            sys.stderr.flush()
+        finally:
+            os._exit(code)
+
+def readClipped(output):
+
+    '''
+        the open file output, or only its head and its tail when it
+        is longer than outputLimit, the last traceback being there
+    '''
+
+    size = os.fstat(output.fileno()).st_size
+    output.seek(0)
+    if size <= outputLimit:
+        return output.read()
+    head = output.read(outputLimit // 2)
+    output.seek(size - outputLimit // 2)
+    return head + b'\n...\n' + output.read(outputLimit // 2)
+
+def readScratch(scratch, name):
+    try:
+        with open(os.path.join(scratch, name), 'rb') as output:
+            return readClipped(output)
+    except OSError:
+        return b''
+
+def serve(preload, jobs):
+
+    '''
+        the fork server: import preload once, then fork a child per
+        request read from stdin, at most jobs of them at a time; a
+        request is {"id", "path", "timeout", "args", "coverage"} and
+        the reply the record of the program with the same id, one
+        JSON per line
+    '''
+
+    '''the replies own the real stdout, imports may print'''
+    channel = os.fdopen(os.dup(1), 'w')
+    null = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(null, 1)
+
+    for statement in preload:
+        try:
+            exec(statement, {})
+        except BaseException:
+            pass
+
+    pending = []
+    running = {} # pid -> (request, scratch, start)
+    buffer = b''
+    stdinOpen = True
+
+    while stdinOpen or pending or running:
+
+        if stdinOpen:
+            wait = 0.01 if running or pending else None
+            readable, _, _ = select.select([0], [], [], wait)
+            if readable:
+                data = os.read(0, 65536)
+                if not data:
+                    stdinOpen = False
+                buffer += data
+                lines = buffer.split(b'\n')
+                buffer = lines.pop()
+                pending.extend(json.loads(line) for line in lines if line.strip())
+        else:
+            time.sleep(0.01)
+
+        while pending and len(running) < jobs:
+            request = pending.pop(0)
+            scratch = tempfile.mkdtemp(prefix='tvmfuzz-')
+            sys.stdout.flush()
+            sys.stderr.flush()
+            pid = os.fork()
+            if pid == 0:
+                channel.close()
+                runChild(request['path'], scratch, request.get('args', ()),
+                         request.get('coverage'))
+            running[pid] = (request, scratch, time.monotonic())
+
+        finished = []
+        while running:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                break
+            if pid in running:
+                finished.append((pid, os.waitstatus_to_exitcode(status), False))
+
+        now = time.monotonic()
+        for pid, (request, scratch, start) in list(running.items()):
+            if now - start > request['timeout'] and \
+                pid not in [ele[0] for ele in finished]:
+                killGroup(pid)
+                '''a child yet to call setsid has no group of its own'''
+                try:
+                    os.kill(pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+                _, status = os.waitpid(pid, 0)
+                finished.append((pid, os.waitstatus_to_exitcode(status), True))
+
+        for pid, returncode, timedOut in finished:
+            request, scratch, start = running.pop(pid)
+            killGroup(pid) # whatever the program left running
+            record = describe(request['path'], returncode, timedOut,
+                              time.monotonic() - start,
+                              readScratch(scratch, 'stdout'),
+                              readScratch(scratch, 'stderr'))
+            if request.get('coverage'):
+                from TVMfuzz.coverage import readCoverage
+                record['coverage'] = sorted(readCoverage(os.path.join(scratch, 'coverage.json')))
+            shutil.rmtree(scratch, ignore_errors=True)
+            record['id'] = request['id']
+            channel.write(json.dumps(record) + '\n')
+            channel.flush()
+
+class ForkServer:
+
+    '''
+        a server process that imported the modules of preload once
+        and forks the programs off itself, so that each of them
+        starts with TVM already imported; submit may be called
+        from any thread and returns a future of the record
+    '''
+
+    def __init__(self, preload=(), jobs=None, pythonpath=(), python=None):
+
+        env = sandboxEnv(tuple(pythonpath) + (root, ))
+        self.proc = subprocess.Popen([python or sys.executable, '-c',
+                                      'import sys, json\n'
+                                      'from TVMfuzz.execution import serve\n'
+                                      'serve(json.loads(sys.argv[1]), int(sys.argv[2]))',
+                                      json.dumps(list(preload)),
+                                      str(jobs or os.cpu_count() or 1)],
+                                     env=env,
+                                     stdin=subprocess.PIPE,
+                                     stdout=subprocess.PIPE,
+                                     start_new_session=True)
+        self.lock = threading.Lock()
+        self.futures = {}
+        self.nextId = 0
+        self.reader = threading.Thread(target=self.read, daemon=True)
+        self.reader.start()
+
+    def submit(self, path, timeout=60, args=(), coverage=None):
+
+        from concurrent.futures import Future
+
+        future = Future()
+        with self.lock:
+            id = self.nextId
+            self.nextId += 1
+            self.futures[id] = future
+            request = {'id': id, 'path': os.path.abspath(path),
+                       'timeout': timeout, 'args': list(args),
+                       'coverage': coverage and os.path.abspath(coverage)}
+            self.proc.stdin.write((json.dumps(request) + '\n').encode())
+            self.proc.stdin.flush()
+        return future
+
+    def read(self):
+        for line in self.proc.stdout:
+            record = json.loads(line)
+            if 'coverage' in record:
+                record['coverage'] = set(record['coverage'])
+            with self.lock:
+                future = self.futures.pop(record.pop('id'))
+            future.set_result(record)
+
+        '''the server is gone, nothing else is coming'''
+        with self.lock:
+            futures = list(self.futures.values())
+            self.futures.clear()
+        for future in futures:
+            future.set_exception(Exception('the fork server exited'))
+
+    def close(self):
+        try:
+            self.proc.stdin.close()
+        except BrokenPipeError:
+            pass
+        self.proc.wait()
+        self.reader.join()
+
+def executePrograms(paths, results=None, jobs=None, timeout=60,
+                    pythonpath=(), python=None, preload=None, coverage=None,
+                    server=None):
+
+    '''
+        run the programs in paths on jobs workers, one per core by
+        default; each record is written to the JSON lines file
+        results as soon as its program ends, and all records are
+        returned in the order of paths. with preload, a list of
+        import statements, the programs are forked off a server
+        that ran those imports once. with coverage, the records
+        hold what each program reached of that folder, which is not
+        written to results. server, a ForkServer, is used instead
+        of starting one, and is left running
+    '''
+
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+
+    jobs = jobs or os.cpu_count() or 1
+    records = [None] * len(paths)
+    sink = open(results, 'w') if results else None
+
+    pool = None
+    own = None
+    try:
+        if server is None and preload is not None:
+            server = own = ForkServer(preload, jobs, pythonpath, python)
+        if server is not None:
+            futures = {server.submit(path, timeout, (), coverage): i
+                       for i, path in enumerate(paths)}
+        else:
+            '''the work happens in the children, a thread only waits on one'''
+            env = sandboxEnv(pythonpath)
+            pool = ThreadPoolExecutor(max_workers=jobs)
+            futures = {pool.submit(runProgram, path, timeout, env, python, (), coverage): i
+                       for i, path in enumerate(paths)}
+
+        for future in as_completed(futures):
+            record = future.result()
+            records[futures[future]] = record
+            if sink:
+                sink.write(json.dumps({key: record[key] for key in record
+                                       if key != 'coverage'}) + '\n')
+                sink.flush()
+    finally:
+        if pool:
+            pool.shutdown()
+        if own:
+            own.close()
+        if sink:
+            sink.close()
+
+    return records
+
+def summarize(records):
+    counts = {}
+    for record in records:
+        counts[record['status']] = counts.get(record['status'], 0) + 1
+    return ', '.join(str(counts[status]) + ' ' + status
+                     for status in ('ok', 'error', 'crash', 'timeout')
+                     if status in counts)
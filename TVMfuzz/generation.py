@@ -1,87 +1,134 @@
-import random
+import io
+import re
 from TVMfuzz.colors import *
 from TVMfuzz.syntax import *
-from TVMfuzz.utils import varNameGenerator
+from TVMfuzz.utils import varNameGenerator, WeightedSampler
 from TVMfuzz.elements import *
-import astunparse
+from TVMfuzz.helpers import emitHelper
+from TVMfuzz.dependencies import writeDependencies
 
-random.seed()
+def integerGenerator(rng, a, b):
+    return rng.randint(a, b)
 
-def integerGenerator(a, b):
-    return random.randint(a, b)
-
-def floatGenerator(str_):
+def floatGenerator(rng, str_):
 
     if 'e' in str_:
-        return '1e-' + str(integerGenerator(1, 7))
+        return '1e-' + str(integerGenerator(rng, 1, 7))
     else:
         lt = str_.split('.')
         integer = lt[0]
         floats = lt[1]
-        integer = integerGenerator(0, int(integer))
-        floats = integerGenerator(0, int(floats))
+        integer = integerGenerator(rng, 0, int(integer))
+        floats = integerGenerator(rng, 0, int(floats))
         return str(integer) + '.' + str(floats)
 
-def listGenerator():
-    n = integerGenerator(1, 5)
-    m = integerGenerator(1, 5)
+def listGenerator(rng):
+    n = integerGenerator(rng, 1, 5)
+    m = integerGenerator(rng, 1, 5)
     string = '['
     for i in range(n):
         string += '['
         for i in range(m):
-            string += str(integerGenerator(1, 10)) + ','
+            string += str(integerGenerator(rng, 1, 10)) + ','
         string = string[:-1]
         string += '],'
     string = string[:-1]
     string += ']'
     return string
 
-def tupleGenerator():
-    n = integerGenerator(1, 5)
-    m = integerGenerator(1, 5)
+def tupleGenerator(rng):
+    n = integerGenerator(rng, 1, 5)
+    m = integerGenerator(rng, 1, 5)
     string = '('
     for i in range(n):
         string += '('
         for i in range(m):
-            string += str(integerGenerator(1, 10)) + ','
+            string += str(integerGenerator(rng, 1, 10)) + ','
         string = string[:-1]
         string += '),'
     string = string[:-1]
     string += ')'
     return string
 
-def constGenerator():
+def constGenerator(rng):
     space = ['a', 'b', 'c', 'd', 'e', 'f', 'g', 'h', 'i', 'j', 'k', 'l',
                     'm', 'n', 'o', 'p', 'q', 'r', 's', 't', 'u', 'v', 'w', 'x', 'y', 'z']
-    name = ''.join(random.choices(space, k=1))
+    name = ''.join(rng.choices(space, k=1))
     space += ['1', '2', '3', '4', '5', '6', '7', '8', '9', '0']
-    name += ''.join(random.choices(space, k=random.randint(0, 4)))
+    name += ''.join(rng.choices(space, k=rng.randint(0, 4)))
     return name
 
-def decryptConst(param, string, PARAM):
+class Snippet:
+
+    '''
+        the text of one statement while it is being emitted.
+        statements hoisted in front of it are kept in a list in
+        reverse order, so prepending costs as little as appending,
+        and the pieces are joined once in getvalue
+    '''
+
+    def __init__(self, text=''):
+        self.pre = []
+        self.body = []
+        self.write(text)
+
+    def write(self, text):
+        if text:
+            self.body.append(text)
+
+    def prepend(self, text):
+        if text:
+            self.pre.append(text)
+
+    def last(self):
+        if self.body:
+            return self.body[-1][-1]
+        for text in self.pre:
+            if text:
+                return text[-1]
+        return ''
+
+    def trim(self):
+
+        '''drop the last character, as string[:-1] did'''
+
+        if self.body:
+            text = self.body.pop()[:-1]
+            if text:
+                self.body.append(text)
+            return
+        for i in range(len(self.pre)):
+            if self.pre[i]:
+                self.pre[i] = self.pre[i][:-1]
+                return
+
+    def getvalue(self):
+        return ''.join(reversed(self.pre)) + ''.join(self.body)
+
+def decryptConst(ctx, param, out, PARAM):
     
     if len(param.consts) == 0:
         output = param.const
-    else: 
-        id = random.randint(0, len(param.consts)-1)
-        output = list(param.consts)[id]
+    elif ctx.scheduler is None:
+        output = param.consts.choice(ctx.program.rng)
+    else:
+        output = ctx.scheduler.choose(param.consts, ctx.program.rng)
+        ctx.program.consts.add(output)
     if output == 'float16' or output == 'float32' or \
         output == 'float64' or output == 'int16' or \
             output == 'int32' or output == 'int64' or \
                 output == 'uint16' or output == 'uint32' or \
                     output == 'uint64':
-        output = random.choices(['float', 'int', 'uint'], k=1)[0] + \
-            random.choices(['16', '32', '64'], k=1)[0]
+        output = ctx.program.rng.choices(['float', 'int', 'uint'], k=1)[0] + \
+            ctx.program.rng.choices(['16', '32', '64'], k=1)[0]
 
     elif 'llvm' == output or 'cuda' == output:
         output = 'llvm'
     elif 'cpu' == output or 'gpu' == output:
         output = 'cpu'
-    string += param.pref + '\'\'\'' + output + '\'\'\'' + param.restname + ','
-    
-    return string
+    out.write(param.pref + '\'\'\'' + output + '\'\'\'' + param.restname)
 
-def decryptListTuple(param, string, PARAM, f, noBracket, rv):
+def decryptListTuple(ctx, param, out, PARAM, f, noBracket, rv):
 
     begin = ''
     end = ''
@@ -92,85 +139,77 @@ def decryptListTuple(param, string, PARAM, f, noBracket, rv):
         if not noBracket:
             begin = '('
             end = ')'
-    string += param.pref + begin
+    out.write(param.pref + begin)
     if param.Type == 'tuple' \
         or param.Type == 'list' or \
         not param.mutable:
         
+        '''every element keeps its comma, so (a,) stays a tuple'''
         for c in param.content:
-            string = decrypt(c, PARAM, f, string=string, rv=rv) + ','
+            decrypt(ctx, c, PARAM, f, out, rv=rv)
+            out.write(',')
         
     else:
-        string += listGenerator()
-    string += end + param.restname + ','
-    return string
+        out.write(listGenerator(ctx.program.rng))
+    out.write(end + param.restname)
 
-def decryptDict(param, string, PARAM, f, rv):
+def decryptDict(ctx, param, out, PARAM, f, rv):
 
-    string += param.pref + '{'
+    out.write(param.pref + '{')
+    sep = ''
     for key, value in zip(param.keyContents, param.valueContents):
-        string = decrypt(key, PARAM, f, string=string, rv=rv)
-        string += ':'
-        string = decrypt(value, PARAM, f, string=string, rv=rv) + ','
-    if param.keyContents:
-        string = string[:-1]
-    string += '}' + param.restname + ','
-    return string
+        out.write(sep)
+        decrypt(ctx, key, PARAM, f, out, rv=rv)
+        out.write(':')
+        decrypt(ctx, value, PARAM, f, out, rv=rv)
+        sep = ','
+    out.write('}' + param.restname)
 
-def decryptComp(param, string, PARAM, f, rv):
-    string += param.pref + '('
-    string = decrypt(param.left[0], PARAM, f, string=string, rv=rv)
+def decryptComp(ctx, param, out, PARAM, f, rv):
+    out.write(param.pref + '(')
+    decrypt(ctx, param.left[0], PARAM, f, out, rv=rv)
 
     for i in range(len(param.right)):
-        string += param.ops[i]
-        string = decrypt(param.right[i], PARAM, f, string=string, rv=rv)
-    string += ')' + param.restname + ','
-    return string
+        out.write(param.ops[i])
+        decrypt(ctx, param.right[i], PARAM, f, out, rv=rv)
+    out.write(')' + param.restname)
 
-def decryptBinop(param, string, PARAM, f, rv):
-    string += param.pref + '('
-    string = decrypt(param.left[0], PARAM, f, string=string, rv=rv)
-    string += param.op
-    string = decrypt(param.right[0], PARAM, f, string=string, rv=rv)
-    string += ')'
-    string += param.restname
-    string += ','
-    return string
+def decryptBinop(ctx, param, out, PARAM, f, rv):
+    out.write(param.pref + '(')
+    decrypt(ctx, param.left[0], PARAM, f, out, rv=rv)
+    out.write(param.op)
+    decrypt(ctx, param.right[0], PARAM, f, out, rv=rv)
+    out.write(')' + param.restname)
 
-def decryptUop(param, string, PARAM, f, rv):
-    string += param.pref + '('
-    string += param.op
-    string = decrypt(param.operand[0], PARAM, f, string=string, rv=rv)
-    string += ')'
-    string += param.restname
-    string += ','
-    return string
+def decryptUop(ctx, param, out, PARAM, f, rv):
+    out.write(param.pref + '(' + param.op)
+    decrypt(ctx, param.operand[0], PARAM, f, out, rv=rv)
+    out.write(')' + param.restname)
 
-def decryptVariable_if_varTocls(pvar, f, string, PARAM, rv):
+def decryptVariable_if_varTocls(ctx, pvar, f, out, PARAM, rv):
 
-    randit_ = random.randint(0, len(pvar.varTocls)-1)
-    parentParam = list(pvar.varTocls)[randit_]
+    parentParam = pvar.varTocls.choice(ctx.program.rng)
     
     for master in parentParam.masters:
-        if master not in lazy and master not in funcPool:
+        if master not in ctx.program.lazy and master not in ctx.program.funcPool:
             if rv and master.surround == PARAM.surround:
-                string = generateFunc(master, f, False, True) + string
+                out.prepend(generateFunc(ctx, master, f, False, True))
             else:
-                generateFunc(master, f, False)
+                generateFunc(ctx, master, f, False)
         else:
             if isinstance(parentParam.varobjects[0], pVar) and \
-                parentParam not in clsPool:
+                parentParam not in ctx.program.clsPool:
                 if rv and parentParam.surround == PARAM.surround:
-                    string = generateAdjuncts(parentParam, f, master, True) + string
+                    out.prepend(generateAdjuncts(ctx, parentParam, f, master, True))
                 else:
-                    generateAdjuncts(parentParam, f, master)
+                    generateAdjuncts(ctx, parentParam, f, master)
             
             elif isinstance(parentParam.varobjects[0], pSubs) and \
-                parentParam not in subsPool:
+                parentParam not in ctx.program.subsPool:
                 if rv and parentParam.surround == PARAM.surround:
-                    string = generateAdjuncts(parentParam, f, master, True) + string
+                    out.prepend(generateAdjuncts(ctx, parentParam, f, master, True))
                 else:
-                    generateAdjuncts(parentParam, f, master)
+                    generateAdjuncts(ctx, parentParam, f, master)
             
     
     '''
@@ -187,7 +226,7 @@ def decryptVariable_if_varTocls(pvar, f, string, PARAM, rv):
         fun3(a[0].c)
     The parent of "a[0].c" (in fun3(a[0].c)) is "a[0].c = 2", a subs
     '''
-    if parentParam not in clsPool and parentParam not in subsPool:
+    if parentParam not in ctx.program.clsPool and parentParam not in ctx.program.subsPool:
 
         if isinstance(parentParam.varobjects[0], pVar):
             raise Exception(Cyan('parentParam, whose varobject\'s name is ' + \
@@ -200,275 +239,323 @@ def decryptVariable_if_varTocls(pvar, f, string, PARAM, rv):
 
     if isinstance(parentParam.varobjects[0], pVar):
 
-        lt = clsPool[parentParam]
-        rn = lt[random.randint(0, len(lt)-1)]
+        lt = ctx.program.clsPool[parentParam]
+        rn = lt[ctx.program.rng.randint(0, len(lt)-1)]
         name = rn + pvar.restname
-        string += pvar.pref + name + ','
-        return string
+        out.write(pvar.pref + name)
     
     elif isinstance(parentParam.varobjects[0], pSubs):
 
-        lt = subsPool[parentParam]
-        rn = lt[random.randint(0, len(lt)-1)]
+        lt = ctx.program.subsPool[parentParam]
+        rn = lt[ctx.program.rng.randint(0, len(lt)-1)]
         name = rn + pvar.restname
-        string += name + ','
-        return string
+        out.write(name)
+
+bodyOdds = 15 # a program draws from one test function body in bodyOdds
 
-def decryptVariable_if_varTofunc(PARAM, pvar, f, string, rv):
+def bodyUsed(ctx, param):
+
+    '''
+        whether the program draws from a body param was met in; the
+        analysis reads every body, and which ones a program uses is
+        decided here, once per body and program
+    '''
+
+    if not param.bodies:
+        return True
+    for body in param.bodies:
+        if body is None:
+            return True
+        if body not in ctx.program.bodies:
+            ctx.program.bodies[body] = not ctx.program.rng.randint(0, bodyOdds - 1)
+        if ctx.program.bodies[body]:
+            return True
+    return False
+
+def chooseStatement(ctx, candidates, draw):
+
+    '''
+        a draw of candidates from a body the program uses; when
+        draws keep missing, the choice is made among those left,
+        weighed as the scheduler weighs them, and when none is left,
+        the program takes up the body of a draw, as a variable may
+        only be produced in other bodies. those left are worked out
+        once per program and set of candidates
+    '''
+
+    for i in range(32):
+        ele = draw(candidates)
+        if bodyUsed(ctx, ele):
+            return ele
+
+    key = id(candidates)
+    if key not in ctx.program.used:
+        used = [ele for ele in candidates if bodyUsed(ctx, ele)]
+        sampler = None
+        if used and ctx.scheduler is not None:
+            sampler = WeightedSampler(used, [ctx.scheduler.weightOf(ele) for ele in used])
+        ctx.program.used[key] = (candidates, used, sampler)
+    candidates, used, sampler = ctx.program.used[key]
+
+    if sampler is not None:
+        return sampler.sample(ctx.program.rng)
+    if used:
+        return ctx.program.rng.choice(used)
+    for body in ele.bodies:
+        ctx.program.bodies[body] = True
+    del ctx.program.used[key]
+    return ele
+
+def chooseProducer(ctx, candidates):
+
+    '''the statement producing a variable, as the scheduler weighs them'''
+
+    if ctx.scheduler is None:
+        return chooseStatement(ctx, candidates, lambda ele: ele.choice(ctx.program.rng))
+    return chooseStatement(ctx, candidates,
+                           lambda ele: ctx.scheduler.choose(ele, ctx.program.rng))
+
+def decryptVariable_if_varTofunc(ctx, PARAM, pvar, f, out, rv):
     
     leftname = None
     pfunc_ = None
     if isinstance(PARAM, pFunc):
         while True:
-            randit_ = random.randint(0, len(pvar.varTofunc)-1)
-            pfunc_ = list(pvar.varTofunc)[randit_]
+            pfunc_ = chooseProducer(ctx, pvar.varTofunc)
             if pfunc_ != PARAM and \
                 (PARAM not in pfunc_.parents or \
-                    not random.randint(0, 10)):
+                    not ctx.program.rng.randint(0, 10)):
                 break
 
         if pfunc_ == None:
             raise Exception(Cyan('pfunc_ is none'))
         
-        if pfunc_ not in lazy and pfunc_ not in funcPool:
+        if pfunc_ not in ctx.program.lazy and pfunc_ not in ctx.program.funcPool:
             if rv and pfunc_.surround == PARAM.surround:
-                string = generateFunc(pfunc_, f, False, True) + string
+                out.prepend(generateFunc(ctx, pfunc_, f, False, True))
             else:
-                generateFunc(pfunc_, f, False)
+                generateFunc(ctx, pfunc_, f, False)
 
-        if pfunc_ not in funcPool:
+        if pfunc_ not in ctx.program.funcPool:
 
             raise Exception(Cyan(pfunc_.funcName + \
                     ' not in funcPool!' + \
                     ' And the pvar is ' + pvar.name + \
                         ' while the pfunc is ' + PARAM.funcName))
     else:
-        randit_ = random.randint(0, len(pvar.varTofunc)-1)
-        pfunc_ = list(pvar.varTofunc)[randit_]
-        if pfunc_ not in lazy and pfunc_ not in funcPool:
-            generateFunc(pfunc_, f, False)
+        pfunc_ = chooseProducer(ctx, pvar.varTofunc)
+        if pfunc_ not in ctx.program.lazy and pfunc_ not in ctx.program.funcPool:
+            generateFunc(ctx, pfunc_, f, False)
         OTfunc = PARAM
-        if pfunc_ not in funcPool:
+        if pfunc_ not in ctx.program.funcPool:
             raise Exception(Cyan(pfunc_.funcName + \
                     ' not in funcPool!' + \
                     ' And the pvar is ' + pvar.name + \
                         ' while the OTparam type is ' + OTfunc.Type))
 
-    lt = funcPool[pfunc_]
+    lt = ctx.program.funcPool[pfunc_]
 
     length = len(lt)
-    leftname = lt[random.randint(0, length-1)]
-    string += pvar.pref + leftname + pvar.restname + ','
-    return string
+    leftname = lt[ctx.program.rng.randint(0, length-1)]
+    out.write(pvar.pref + leftname + pvar.restname)
 
-def decryptVariable(pvar, string, PARAM, f, rv):
+def decryptVariable(ctx, pvar, out, PARAM, f, rv):
 
     if pvar.varTofunc:
-        return decryptVariable_if_varTofunc(PARAM, pvar, f, string, rv)
+        decryptVariable_if_varTofunc(ctx, PARAM, pvar, f, out, rv)
     
     elif pvar.varTocls:
-        return decryptVariable_if_varTocls(pvar, f, string, PARAM, rv)
+        decryptVariable_if_varTocls(ctx, pvar, f, out, PARAM, rv)
 
     else:
         
-        if pvar.name in helperFuncDef:
-            f.write(astunparse.unparse(helperFuncDef[pvar.name]))
-        return string + pvar.pref + pvar.name + pvar.restname + ','
+        emitHelper(ctx, pvar.name, f)
+        out.write(pvar.pref + pvar.name + pvar.restname)
     
-def decryptNumber(param, string):
+def decryptNumber(ctx, param, out):
     
-    if random.randint(0, 1):
+    if ctx.program.rng.randint(0, 1):
 
-        string += param.pref + str(param.num) + param.restname + ','
+        out.write(param.pref + str(param.num) + param.restname)
 
     else:
         if isinstance(param.num, int):
-            string += param.pref + str(integerGenerator(0, param.num)) + param.restname + ','
+            out.write(param.pref + str(integerGenerator(ctx.program.rng, 0, param.num)) + param.restname)
 
         elif isinstance(param.num, float):
-            string += param.pref + str(floatGenerator(str(param.num))) + param.restname + ','
-            
-    return string
+            out.write(param.pref + str(floatGenerator(ctx.program.rng, str(param.num))) + param.restname)
 
-def decryptSubs(param, string, PARAM, f, rv):
+def decryptSubs(ctx, param, out, PARAM, f, rv):
 
     if param.subsTosubs:
         find = False
         for master in param.subsTosubs.masters:
-            if master not in lazy and master not in funcPool:
+            if master not in ctx.program.lazy and master not in ctx.program.funcPool:
                 find = True 
                 if rv and PARAM.surround == param.surround:
-                    string = generateFunc(master, f, False, True) + string
+                    out.prepend(generateFunc(ctx, master, f, False, True))
                 else:
-                    generateFunc(master, f, False)
+                    generateFunc(ctx, master, f, False)
         if not find:
             if rv:
-                string = generateSubs(param.subsTosubs, f, rv) + string
+                out.prepend(generateSubs(ctx, param.subsTosubs, f, rv))
             else:
-                generateSubs(param.subsTosubs, f)
+                generateSubs(ctx, param.subsTosubs, f)
         
-        if param.subsTosubs not in subsPool:
+        if param.subsTosubs not in ctx.program.subsPool:
             raise Exception(Cyan('param.subsTosubs: ' + str(param.subsTosubs)\
                 + ' not in subsPool') + Green('param: ' + str(param)) + Blue('PARAM: ' + str(PARAM)))
 
-        lt = subsPool[param.subsTosubs]
-        string += param.pref + lt[random.randint(0, len(lt)-1)] + ','
+        lt = ctx.program.subsPool[param.subsTosubs]
+        out.write(param.pref + lt[ctx.program.rng.randint(0, len(lt)-1)])
 
     else:
 
-        string += param.pref
-        string = decrypt(param.prefix[0], PARAM, f, string=string, rv=rv)
-        string += '['
-        string = decrypt(param.content[0], PARAM, f, noBracket=True, string=string, rv=rv)
-        if string[-1] == ',': string = string[:-1]
-        string += ']' + param.restname + ','
-
-    return string
+        out.write(param.pref)
+        decrypt(ctx, param.prefix[0], PARAM, f, out, rv=rv)
+        out.write('[')
+        decrypt(ctx, param.content[0], PARAM, f, out, noBracket=True, rv=rv)
+        if out.last() == ',': out.trim()
+        out.write(']' + param.restname)
 
-def decryptSet(param, string, PARAM, f, rv):
-    string += param.pref + '{'
+def decryptSet(ctx, param, out, PARAM, f, rv):
+    out.write(param.pref + '{')
+    sep = ''
     for ele in param.content:
-        string = decrypt(ele, PARAM, f, string=string, rv=rv)
-        string += ','
-    
-    if param.content:
-        string = string[:-1]
-    string += '}' + param.restname + ','
-    return string
+        out.write(sep)
+        decrypt(ctx, ele, PARAM, f, out, rv=rv)
+        sep = ','
+    out.write('}' + param.restname)
 
-def decryptLambda(param, string, PARAM, f, rv):
-    string += param.pref + 'lambda '
+def decryptLambda(ctx, param, out, PARAM, f, rv):
+    out.write(param.pref + 'lambda ')
     for arg in param.args:
-        string += arg.name + ','
-    string = string[:-1] + ': '
+        out.write(arg.name + ',')
+    out.trim()
+    out.write(': ')
     if not isinstance(param.body[0], pFunc):
-        string = decrypt(param.body[0], PARAM, f, string=string, rv=rv)
+        decrypt(ctx, param.body[0], PARAM, f, out, rv=rv)
     else:
-        string += generateFunc(param.body[0], f, False, rv=rv, lamb=True)
-    if string[-1] == '\n': string = string[:-1]
-    return string + ','
+        out.write(generateFunc(ctx, param.body[0], f, False, rv=rv, lamb=True))
+    if out.last() == '\n': out.trim()
 
-def decrypt(param, PARAM, f, noBracket=False, rv=False, string=''):
+def decrypt(ctx, param, PARAM, f, out, noBracket=False, rv=False):
+
+    '''
+        write the source of param into the Snippet out; statements
+        param depends on are either written to f right away or,
+        with rv, hoisted in front of out
+    '''
 
     if param.Type == 'const':
-        string = decryptConst(param, string, PARAM)
+        decryptConst(ctx, param, out, PARAM)
     
     elif param.Type == 'number':
-        string = decryptNumber(param, string)
+        decryptNumber(ctx, param, out)
     
     elif param.Type == 'variable':
-        string = decryptVariable(param, string, PARAM, f, rv)
+        decryptVariable(ctx, param, out, PARAM, f, rv)
     
     elif param.Type == 'keyword':
-        string += param.keywordStr + '='
-        randid = random.randint(0, len(param.keywordContent)-1)
-        string = decrypt(param.keywordContent[randid], PARAM, f, string=string, rv=rv) + ','
+        out.write(param.keywordStr + '=')
+        randid = ctx.program.rng.randint(0, len(param.keywordContent)-1)
+        decrypt(ctx, param.keywordContent[randid], PARAM, f, out, rv=rv)
     
     elif param.Type == 'list' or param.Type == 'tuple':
-        string = decryptListTuple(param, string, PARAM, f, noBracket, rv)
+        decryptListTuple(ctx, param, out, PARAM, f, noBracket, rv)
     
     elif param.Type == 'dict':
-        string = decryptDict(param, string, PARAM, f, rv)
+        decryptDict(ctx, param, out, PARAM, f, rv)
     
     elif param.Type == 'binop':
-        string = decryptBinop(param, string, PARAM, f, rv)
+        decryptBinop(ctx, param, out, PARAM, f, rv)
     
     elif param.Type == 'uop':
-        string = decryptUop(param, string, PARAM, f, rv)
+        decryptUop(ctx, param, out, PARAM, f, rv)
 
     elif param.Type == 'subscript':
-        string = decryptSubs(param, string, PARAM, f, rv)
+        decryptSubs(ctx, param, out, PARAM, f, rv)
 
     elif param.Type == 'set':
-        string = decryptSet(param, string, PARAM, f, rv)
+        decryptSet(ctx, param, out, PARAM, f, rv)
 
     elif param.Type == 'none':
-        string += 'None,'
+        out.write('None')
     
     elif param.Type == 'compare':
-        string = decryptComp(param, string, PARAM, f, rv)
+        decryptComp(ctx, param, out, PARAM, f, rv)
 
     elif param.Type == 'slice':
-        string += ':,'
+        out.write(':')
 
     elif param.Type == 'lambda':
-        string = decryptLambda(param, string, PARAM, f, rv)
-
-    return string[:-1]
+        decryptLambda(ctx, param, out, PARAM, f, rv)
 
 def generateIndent(indent):
-    string = ''
-    for _ in range(indent):
-        string += '\t'
-    return string
+    return '\t' * indent
 
-def generateFuncLeftPart_varTonothing(varobject, string):
-    name = varNameGenerator(varPool)
+def generateFuncLeftPart_varTonothing(ctx, varobject, out):
+    name = varNameGenerator(ctx.program.varPool, ctx.program.rng)
     leftname = ''
     if not varobject.restname:
         leftname = name
-        string += name + ','
+        out.write(name)
     else:
         if varobject.varTofunc:
-            randit_ = random.randint(0, len(varobject.varTofunc)-1)
-            param_ = list(varobject.varTofunc)[randit_]
-            leftnamesTuple = funcPool[param_]
+            param_ = chooseProducer(ctx, varobject.varTofunc)
+            leftnames = ctx.program.funcPool[param_]
 
-            leftname = leftnamesTuple[\
-                random.randint(0, len(leftnamesTuple)-1)]
+            leftname = leftnames[\
+                ctx.program.rng.randint(0, len(leftnames)-1)]
 
-            string += leftname + varobject.restname + ','
+            out.write(leftname + varobject.restname)
 
         else:
             leftname = name + varobject.restname
-            string += name + varobject.restname + ','
-    return string, leftname
+            out.write(leftname)
+    return leftname
 
-def generateFuncLeftPart_varTocls(varobject, string, f, pfunc, rv):
+def generateFuncLeftPart_varTocls(ctx, varobject, out, f, pfunc, rv):
     
-    parentParams = list(varobject.varTocls)
-    randit_ = random.randint(0, len(parentParams)-1)
-    parentParam = parentParams[randit_]
+    parentParam = varobject.varTocls.choice(ctx.program.rng)
 
     for master in parentParam.master:
-        if master not in lazy and master not in funcPool:
+        if master not in ctx.program.lazy and master not in ctx.program.funcPool:
             if rv and master.surround == pfunc.surround:
-                string = generateFunc(master, f, False, True) + string
+                out.prepend(generateFunc(ctx, master, f, False, True))
             else:
-                generateFunc(master, f, False)
+                generateFunc(ctx, master, f, False)
 
-    if parentParam not in clsPool:
+    if parentParam not in ctx.program.clsPool:
         raise Exception(Cyan('Not find ' + parentParam.name + \
             parentParam.restname + ' in clsPool'))
 
-    lt = clsPool[parentParam]
-    rn = lt[random.randint(0, len(lt)-1)]
-    name = rn + varobject.restname
-    leftname = name
-    string += leftname + ','
-    return string, leftname
+    lt = ctx.program.clsPool[parentParam]
+    rn = lt[ctx.program.rng.randint(0, len(lt)-1)]
+    leftname = rn + varobject.restname
+    out.write(leftname)
+    return leftname
 
-def generateFuncLeftPart_varTofunc(varobject, string, f, pfunc, rv):
+def generateFuncLeftPart_varTofunc(ctx, varobject, out, f, pfunc, rv):
 
-    funcList = list(varobject.varTofunc)
-    func = funcList[random.randint(0, len(funcList)-1)]
-    if func not in lazy and func not in funcPool:
+    func = chooseProducer(ctx, varobject.varTofunc)
+    if func not in ctx.program.lazy and func not in ctx.program.funcPool:
         if func.surround == pfunc.surround and rv:
-            string = generateFunc(func, f, False, True) + string
+            out.prepend(generateFunc(ctx, func, f, False, True))
         else:
-            generateFunc(func, f, False)
-    lt = funcPool[func]
+            generateFunc(ctx, func, f, False)
+    lt = ctx.program.funcPool[func]
     length = len(lt)
-    varname = lt[random.randint(0, length-1)]
+    varname = lt[ctx.program.rng.randint(0, length-1)]
 
     leftname = varname + varobject.restname
-    string += leftname + ','
-    return string, leftname
+    out.write(leftname)
+    return leftname
 
-def generateFuncLeftPart_varTowith(varobject, string):
+def generateFuncLeftPart_varTowith(ctx, varobject, out):
 
     pwith, withitem_id = list(varobject.varTowith)[0]
-    if pwith not in withPool:
+    if pwith not in ctx.program.withPool:
         raise Exception(Cyan(\
             'This with statement not in withPool while its '\
                 + 'components are being attended'))
@@ -477,14 +564,12 @@ def generateFuncLeftPart_varTowith(varobject, string):
     item, asitem = withitem
     if asitem:
         leftname = asitem.name + varobject.restname
-        string += leftname + ','
-        return string, leftname
     else:
         leftname = item.name + varobject.restname
-        string += leftname + ','
-        return string, leftname
+    out.write(leftname)
+    return leftname
 
-def generateFuncLeftPart(string, pfunc, breed, f, rv):
+def generateFuncLeftPart(ctx, out, pfunc, breed, f, rv):
 
     leftname = ''
 
@@ -496,34 +581,35 @@ def generateFuncLeftPart(string, pfunc, breed, f, rv):
             not varobject.varTofunc and \
                 not varobject.varTowith:
 
-            string, leftname = generateFuncLeftPart_varTonothing(varobject, string)
+            leftname = generateFuncLeftPart_varTonothing(ctx, varobject, out)
         
         elif varobject.varTocls:
-            string, leftname = generateFuncLeftPart_varTocls(varobject, string, f, pfunc, rv)
+            leftname = generateFuncLeftPart_varTocls(ctx, varobject, out, f, pfunc, rv)
         
         elif varobject.varTofunc:
-            string, leftname = generateFuncLeftPart_varTofunc(varobject, string, f, pfunc, rv)
+            leftname = generateFuncLeftPart_varTofunc(ctx, varobject, out, f, pfunc, rv)
         
         elif varobject.varTowith:
-            string, leftname = generateFuncLeftPart_varTowith(varobject, string)
+            leftname = generateFuncLeftPart_varTowith(ctx, varobject, out)
 
-        string = string[:-1]
-        string += '='
+        out.write('=')
 
-    return string, leftname
+    return leftname
 
-def generateFuncRestrictedVarPart(pfunc, string, breed, f, rv):
+def generateFuncRestrictedVarPart(ctx, pfunc, out, breed, f, rv):
 
     restrictedVarNew = ''
 
     if pfunc.restricted:
 
-        restrictedVarNew = decrypt(pfunc.restricted, pfunc, f, rv=rv)
-        string += restrictedVarNew
+        restricted = Snippet()
+        decrypt(ctx, pfunc.restricted, pfunc, f, restricted, rv=rv)
+        restrictedVarNew = restricted.getvalue()
+        out.write(restrictedVarNew)
 
-    return string, restrictedVarNew
+    return restrictedVarNew
 
-def generateFuncNamePart(pfunc, string):
+def generateFuncNamePart(pfunc, out):
 
     funcName = ''
     if pfunc.restricted:
@@ -534,84 +620,83 @@ def generateFuncNamePart(pfunc, string):
         if pfunc.funcNameSuffix:
             funcName = funcName.split(pfunc.funcNameSuffix)[0]
 
-    string += funcName + '('
-    return string
+    out.write(funcName + '(')
 
-def generateFuncParamPart(pfunc, string, f, rv):
+def generateFuncParamPart(ctx, pfunc, out, f, rv):
+    sep = ''
     for param in pfunc.params:
-        string = decrypt(param, pfunc, f, string=string, rv=rv) + ','
-
-    if pfunc.params:
-        string = string[:-1]
-    string += ')'
-    return string
+        out.write(sep)
+        decrypt(ctx, param, pfunc, f, out, rv=rv)
+        sep = ','
+    out.write(')')
 
-def generateFuncSuffixPart(pfunc, string):
+def generateFuncSuffixPart(pfunc, out):
     
     if pfunc.suffix:
         suffix_ = pfunc.suffix.replace('*', '.')
-        string += suffix_
-    return string
+        out.write(suffix_)
 
-def generateFuncRightPart(pfunc, string, breed, f, rv):
+def generateFuncRightPart(ctx, pfunc, out, breed, f, rv):
     
-    string, restrictedVarNew = generateFuncRestrictedVarPart(pfunc, string, breed, f, rv)
-    string = generateFuncNamePart(pfunc, string)
-    string = generateFuncParamPart(pfunc, string, f, rv)
-    string = generateFuncSuffixPart(pfunc, string)
+    restrictedVarNew = generateFuncRestrictedVarPart(ctx, pfunc, out, breed, f, rv)
+    generateFuncNamePart(pfunc, out)
+    generateFuncParamPart(ctx, pfunc, out, f, rv)
+    generateFuncSuffixPart(pfunc, out)
 
-    return string, restrictedVarNew
+    return restrictedVarNew
 
 def deleteFuncObsoletePart(string):
 
     string = string.replace('.[', '[')
     return string
 
-def fillIn_funcPool(pfunc, restrictedVarNew, leftname):
+def fillIn_funcPool(ctx, pfunc, restrictedVarNew, leftname):
 
-    if pfunc not in funcPool:
+    if pfunc not in ctx.program.funcPool:
         if pfunc.Type == 'restrictedOnlyFunc':
-            funcPool[pfunc] = (restrictedVarNew, )
+            ctx.program.funcPool[pfunc] = [restrictedVarNew]
         else:
-            funcPool[pfunc] = (leftname, )
+            ctx.program.funcPool[pfunc] = [leftname]
     else:
         if pfunc.Type == 'restrictedOnlyFunc':
-            funcPool[pfunc] += (restrictedVarNew, )
+            ctx.program.funcPool[pfunc].append(restrictedVarNew)
         else:
-            funcPool[pfunc] += (leftname, )
+            ctx.program.funcPool[pfunc].append(leftname)
 
-def fillIn_clsPool(param, leftname):
-    if param not in clsPool:
-        clsPool[param] = (leftname, )
+def fillIn_clsPool(ctx, param, leftname):
+    if param not in ctx.program.clsPool:
+        ctx.program.clsPool[param] = [leftname]
     
     else:
-        clsPool[param] += (leftname, )    
+        ctx.program.clsPool[param].append(leftname)
 
-def fillIn_subsPool(param, leftname):
-    if param not in subsPool:
-        subsPool[param] = (leftname, )
+def fillIn_subsPool(ctx, param, leftname):
+    if param not in ctx.program.subsPool:
+        ctx.program.subsPool[param] = [leftname]
     
     else:
-        subsPool[param] += (leftname, ) 
+        ctx.program.subsPool[param].append(leftname)
 
-def generateChildren(breed, param, f):
+def generateChildren(ctx, breed, param, f):
 
     if breed and param.children:
         for child in param.children:
+            if not bodyUsed(ctx, child):
+                continue
             if not child.surround \
                 or not param.surround \
                     or child.surround != param.surround:
                 
                 if param not in child.children or \
-                    not random.randint(0, 10):
+                    not ctx.program.rng.randint(0, 10):
                     if isinstance(child, pFunc):
-                        if child not in funcPool or not random.randint(0, 9):
-                            generateFunc(child, f, breed)
+                        if child not in ctx.program.funcPool or not ctx.program.rng.randint(0, 9):
+                            generateFunc(ctx, child, f, breed)
                     
                     elif isinstance(child, pWith):
-                        generateWith(child, f, breed)
+                        generateWith(ctx, child, f, breed)
 
-def generateAdjuncts(param, f, master, rv=False):
+def generateAdjuncts(ctx, param, f, master, rv=False):
 
     '''
     a = fun()
@@ -628,114 +713,104 @@ def generateAdjuncts(param, f, master, rv=False):
 
     '''
 
-    if param in lazy or param in clsPool or \
-        param in subsPool or random.randint(0, 1):
+    if param in ctx.program.lazy or param in ctx.program.clsPool or \
+        param in ctx.program.subsPool or ctx.program.rng.randint(0, 1):
         if rv: return ''
         return
 
-    lazy.append(param)
-    string = ''
+    ctx.program.lazy.add(param)
+    out = Snippet()
     
     for mst in param.masters:
-        if mst != master and mst not in funcPool:
+        if mst != master and mst not in ctx.program.funcPool:
             if mst.surround and param.surround and \
                 mst.surround == param.surround:
-                string = generateFunc(mst, f, False, True) + string
+                out.prepend(generateFunc(ctx, mst, f, False, True))
             else:
-                generateFunc(mst, f, False)
+                generateFunc(ctx, mst, f, False)
 
     if isinstance(param.varobjects[0], pSubs):
         if rv:
-            string = generateSubs(param, f, True) + string
+            out.prepend(generateSubs(ctx, param, f, True))
         else:
-            generateSubs(param, f)
+            generateSubs(ctx, param, f)
     
     elif isinstance(param.varobjects[0], pVar):
         if rv:
-            string = generateCls(param, f, master, True) + string
+            out.prepend(generateCls(ctx, param, f, master, True))
         else:
-            generateCls(param, f, master)
+            generateCls(ctx, param, f, master)
 
     if rv:
         for child in param.children:
-            if child not in subsPool and child not in clsPool:
+            if child not in ctx.program.subsPool and child not in ctx.program.clsPool:
                 if child.surround == param.surround:
-                    string += generateAdjuncts(child, f, master, True)
+                    out.write(generateAdjuncts(ctx, child, f, master, True))
                 else:
-                    restAdjuncts.append((child, master))
-        return string
+                    ctx.program.restAdjuncts.append((child, master))
+        return out.getvalue()
     
     else:
         for child in param.children:     
-            generateAdjuncts(child, f, master)
+            generateAdjuncts(ctx, child, f, master)
 
-def generateFunc(pfunc, f, breed, rv=False, lamb=False):
+def generateFunc(ctx, pfunc, f, breed, rv=False, lamb=False):
 
     if isinstance(pfunc, pWith):
-        generateWith(pfunc, f, breed)
+        generateWith(ctx, pfunc, f, breed)
         return
 
     if pfunc.surround and \
-        pfunc.surround not in withPool:
-        generateWith(pfunc.surround, f, breed)
+        pfunc.surround not in ctx.program.withPool:
+        generateWith(ctx, pfunc.surround, f, breed)
         return
    
 
     ori_funcName = pfunc.funcName.split(pfunc.funcNameSuffix)[0] \
                     if pfunc.funcNameSuffix else pfunc.funcName
 
-    if ori_funcName in helperFuncDef:
-        func = helperFuncDef[ori_funcName]
-        if func in funcDefParents:
-            parents = funcDefParents[func]
-            for parent in parents:
-                f.write(astunparse.unparse(parent))
-
-        f.write(astunparse.unparse(func))
+    emitHelper(ctx, ori_funcName, f)
 
-    string = generateIndent(pfunc.indent)
-    string, leftname = generateFuncLeftPart(string, pfunc, breed, f, rv)
-    string, restrictedVarNew = generateFuncRightPart(pfunc, string, breed, f, rv)
-    string = deleteFuncObsoletePart(string)
+    out = Snippet(generateIndent(pfunc.indent))
+    leftname = generateFuncLeftPart(ctx, out, pfunc, breed, f, rv)
+    restrictedVarNew = generateFuncRightPart(ctx, pfunc, out, breed, f, rv)
+    string = deleteFuncObsoletePart(out.getvalue())
     string += '\n'
     if rv:
-        fillIn_funcPool(pfunc, restrictedVarNew, leftname) 
+        fillIn_funcPool(ctx, pfunc, restrictedVarNew, leftname) 
+        out = Snippet(string)
         for adjunct in pfunc.adjuncts:
             if adjunct.surround == pfunc.surround:
-                lazy.append(pfunc)
-                string += generateAdjuncts(adjunct, f, pfunc, True)
-                lazy.reverse()
-                lazy.remove(pfunc)
-                lazy.reverse()
+                ctx.program.lazy.add(pfunc)
+                out.write(generateAdjuncts(ctx, adjunct, f, pfunc, True))
+                ctx.program.lazy.remove(pfunc)
             
             else:
-                restAdjuncts.append((adjunct, pfunc))
-        return string
+                ctx.program.restAdjuncts.append((adjunct, pfunc))
+        return out.getvalue()
 
     else:
         if lamb: 
             return string
         else:
             f.write(string)
-            fillIn_funcPool(pfunc, restrictedVarNew, leftname) 
+            fillIn_funcPool(ctx, pfunc, restrictedVarNew, leftname) 
 
             for adjunct in pfunc.adjuncts:
-                lazy.append(pfunc)
-                generateAdjuncts(adjunct, f, pfunc)
-                lazy.reverse()
-                lazy.remove(pfunc)
-                lazy.reverse()
+                ctx.program.lazy.add(pfunc)
+                generateAdjuncts(ctx, adjunct, f, pfunc)
+                ctx.program.lazy.remove(pfunc)
 
-            generateChildren(breed, pfunc, f)
+            generateChildren(ctx, breed, pfunc, f)
 
-def generateSubs(psubs, f, rv=False):
+def generateSubs(ctx, psubs, f, rv=False):
 
     '''
         generate the param string
         when the varobjects[0] is of pSubs class
     '''
 
-    string = generateIndent(psubs.indent)
+    out = Snippet(generateIndent(psubs.indent))
     
 
     '''
@@ -756,41 +831,43 @@ def generateSubs(psubs, f, rv=False):
     '''
 
     if not psubs.varobjects[0].subsTosubs:
-        psubsstring = decrypt(psubs.varobjects[0].prefix[0], psubs, f, rv=rv, string='')
-        psubsstring += '['
-        psubsstring = decrypt(psubs.varobjects[0].content[0], psubs, f, string=psubsstring, rv=rv)
-        psubsstring += ']' + psubs.varobjects[0].restname
+        subs = Snippet()
+        decrypt(ctx, psubs.varobjects[0].prefix[0], psubs, f, subs, rv=rv)
+        subs.write('[')
+        decrypt(ctx, psubs.varobjects[0].content[0], psubs, f, subs, rv=rv)
+        subs.write(']' + psubs.varobjects[0].restname)
+        psubsstring = subs.getvalue()
     
     else:
-        lt = subsPool[psubs.varobjects[0].subsTosubs]
-        psubsstring = lt[random.randint(0, len(lt)-1)] + \
+        lt = ctx.program.subsPool[psubs.varobjects[0].subsTosubs]
+        psubsstring = lt[ctx.program.rng.randint(0, len(lt)-1)] + \
             psubs.varobjects[0].restname 
 
-    fillIn_subsPool(psubs, psubsstring)
+    fillIn_subsPool(ctx, psubs, psubsstring)
 
-    string += psubsstring
-    string += '='
-    string = decrypt(psubs, psubs, f, rv=rv, string=string)
+    out.write(psubsstring + '=')
+    decrypt(ctx, psubs, psubs, f, out, rv=rv)
+    string = out.getvalue()
 
     if rv: return string + '\n'
 
     f.write(string + '\n')
 
-def generateWithItems(pwith):
+def generateWithItems(ctx, pwith):
 
     string = generateIndent(pwith.indent)
     string += 'with ' 
     for withitem in pwith.withitems:
         
         if withitem[0].varTofunc:
-            pfunc = list(withitem[0].varTofunc)[0]
-            if pfunc not in funcPool:
+            pfunc = withitem[0].varTofunc[0]
+            if pfunc not in ctx.program.funcPool:
                 raise Exception(Cyan(pfunc.funcName + ' not in funcPool!'))
 
-            lt = funcPool[pfunc]
+            lt = ctx.program.funcPool[pfunc]
             length = len(lt)
             
-            varname = lt[random.randint(0, length-1)]
+            varname = lt[ctx.program.rng.randint(0, length-1)]
             string += varname
         else:
             string += withitem[0].name
@@ -804,146 +881,227 @@ def generateWithItems(pwith):
     string += ':'
     return string
 
-def generateWithBody(pwith, f, breed):
+def generateWithBody(ctx, pwith, f, breed):
     
-    string_ = ''
+    out = Snippet()
     for ele in pwith.body:
-        if ele in funcPool or ele in withPool:
+        if ele in ctx.program.funcPool or ele in ctx.program.withPool:
             continue
 
         if isinstance(ele, pFunc):
-            string_ += generateFunc(ele, f, breed, True)
+            out.write(generateFunc(ctx, ele, f, breed, True))
 
         elif isinstance(ele, pWith):
-            string_ += generateWith(ele, f, breed, True)
+            out.write(generateWith(ctx, ele, f, breed, True))
 
-    return string_
+    return out.getvalue()
 
-def generateWith(pwith, f, breed, rv=False):
+def generateWith(ctx, pwith, f, breed, rv=False):
 
     '''generate parents'''
     
     for parent in pwith.parents:
-        if parent not in lazy and parent not in funcPool:
-            generateFunc(parent, f, False)
+        if parent not in ctx.program.lazy and parent not in ctx.program.funcPool:
+            generateFunc(ctx, parent, f, False)
 
     '''end'''
 
-    withPool.add(pwith)
+    ctx.program.withPool.add(pwith)
     
-    string = generateWithItems(pwith)
+    string = generateWithItems(ctx, pwith)
     string += '\n'
-    string += generateWithBody(pwith, f, breed)
+    string += generateWithBody(ctx, pwith, f, breed)
 
     if rv: return string
 
     f.write(string + '\n')
-    generateRestAdjuncts(f)
-    generateWithChildren(breed, pwith, f)
+    generateRestAdjuncts(ctx, f)
+    generateWithChildren(ctx, breed, pwith, f)
 
-def generateRestAdjuncts(f):
-    for adjunct, pfunc in restAdjuncts:
-        lazy.append(pfunc)
-        generateAdjuncts(adjunct, f, pfunc)
-        lazy.reverse()
-        lazy.remove(pfunc)
-        lazy.reverse() 
+def generateRestAdjuncts(ctx, f):
+    for adjunct, pfunc in ctx.program.restAdjuncts:
+        ctx.program.lazy.add(pfunc)
+        generateAdjuncts(ctx, adjunct, f, pfunc)
+        ctx.program.lazy.remove(pfunc)
 
-def generateWithChildren(breed, pwith, f):
+def generateWithChildren(ctx, breed, pwith, f):
 
     if breed:
         for ele in pwith.body:
             if isinstance(ele, pFunc):
                 for child in ele.children:
-                    if child not in funcPool:
-                        generateFunc(child, f, breed)
+                    if child not in ctx.program.funcPool and bodyUsed(ctx, child):
+                        generateFunc(ctx, child, f, breed)
 
             elif isinstance(ele, pWith):
-                generateWithChildren(breed, ele, f)
+                generateWithChildren(ctx, breed, ele, f)
             
-def generateCls_varTofunc(varobject, f, param, rv):
+def generateCls_varTofunc(ctx, varobject, f, param, rv):
     
-    randit_ = random.randint(0, len(varobject.varTofunc)-1)
-    pfunc = list(varobject.varTofunc)[randit_]
+    pfunc = chooseProducer(ctx, varobject.varTofunc)
     string = ''
-    if pfunc not in lazy and pfunc not in funcPool:
+    if pfunc not in ctx.program.lazy and pfunc not in ctx.program.funcPool:
         if rv and param.surround == pfunc.surround:
-            string += generateFunc(pfunc, f, False, True)
+            string += generateFunc(ctx, pfunc, f, False, True)
         else:
-            generateFunc(pfunc, f, False)
+            generateFunc(ctx, pfunc, f, False)
 
-    if pfunc not in funcPool:
+    if pfunc not in ctx.program.funcPool:
         raise Exception(pfunc.funcName + \
             ' not in funcPool')
     else:
-        lt = funcPool[pfunc]
+        lt = ctx.program.funcPool[pfunc]
         length = len(lt)
-        varname = lt[random.randint(0, length-1)]
+        varname = lt[ctx.program.rng.randint(0, length-1)]
         string += generateIndent(param.indent) + varname
     return string
 
-def generateCls_varTocls(varobject, f, master, param, rv):
+def generateCls_varTocls(ctx, varobject, f, master, param, rv):
     
-    randit_ = random.randint(0, len(varobject.varTocls)-1)
-    paramcls = list(varobject.varTocls)[randit_]
+    paramcls = varobject.varTocls.choice(ctx.program.rng)
     string = ''
-    if paramcls not in clsPool:
+    if paramcls not in ctx.program.clsPool:
         if rv and paramcls.surround == param.surround:
-            string += generateAdjuncts(paramcls, f, master, True)
+            string += generateAdjuncts(ctx, paramcls, f, master, True)
         else:
-            generateAdjuncts(paramcls, f, master, False)
+            generateAdjuncts(ctx, paramcls, f, master, False)
 
-    if paramcls not in clsPool:
+    if paramcls not in ctx.program.clsPool:
         raise Exception(paramcls.name + paramcls.restname + \
             ' not in clsPool')
     else:
-        lt = clsPool[paramcls]
-        rn = lt[random.randint(0, len(lt)-1)]
+        lt = ctx.program.clsPool[paramcls]
+        rn = lt[ctx.program.rng.randint(0, len(lt)-1)]
         varname = rn 
         string += generateIndent(param.indent) + varname
     return string
 
-def generateCls(param, f, master, rv=False):
+def generateCls(ctx, param, f, master, rv=False):
         
     varname = ''
     varobject = param.varobjects[0]
     
     if varobject.varTofunc:
-        varname = generateCls_varTofunc(varobject, f, param, rv)
+        varname = generateCls_varTofunc(ctx, varobject, f, param, rv)
     
     elif varobject.varTocls:
-        varname = generateCls_varTocls(varobject, f, master, param, rv)
+        varname = generateCls_varTocls(ctx, varobject, f, master, param, rv)
 
     else:
         varname = varobject.name
     varname += varobject.restname
-    fillIn_clsPool(param, varname)
-    string = varname + '='
-    string = decrypt(param, param, f, string=string, rv=rv)
+    fillIn_clsPool(ctx, param, varname)
+    out = Snippet(varname + '=')
+    decrypt(ctx, param, param, f, out, rv=rv)
+    string = out.getvalue()
     if rv: return string + '\n'
     f.write(string + '\n')
 
-def generate():
+dottedName = re.compile(r'[A-Za-z_]\w*(?:\s*\.\s*[A-Za-z_]\w*)*')
+
+def referencedNames(text):
+
+    '''
+        every dotted name in text together with all its runs of
+        consecutive segments, a.b.c gives a, b, c, a.b, b.c and
+        a.b.c; names inside strings are counted too, which only
+        keeps an import that was not needed
+    '''
+
+    names = set()
+    for match in dottedName.findall(text):
+        segments = [ele.strip() for ele in match.split('.')]
+        for i in range(len(segments)):
+            for j in range(i+1, len(segments)+1):
+                names.add('.'.join(segments[i:j]))
+    return names
+
+def generateImports(ctx, text, f):
 
-    f = open('byproduct/program.py', 'w')
+    '''only the imports that something in text refers to'''
 
-    for im in importSet:
-        f.write(im + '\n')
+    names = referencedNames(text)
+    for im in sorted(ctx.analysis.importSet):
+        uses = ctx.analysis.importUses.get(im)
+        if uses is None or any(use in names for use in uses):
+            f.write(im + '\n')
     f.write('\n')
 
-    print(Magenta('len(ingredient) = ' + str(len(ingredient))))
-    id = random.randint(0, len(ingredient)-1)
-    print(Yellow('id = ' + str(id)))
-    if isinstance(ingredient[id], pFunc):
-        print(Yellow('ingredient = ' + str(ingredient[id].funcName)))
-    if isinstance(ingredient[id], pFunc):
-        generateFunc(ingredient[id], f, True)
+def generateStatements(ctx, f):
 
-    elif isinstance(ingredient[id], pWith):
-        generateWith(ingredient[id], f, True)
+    print(Magenta('len(ingredient) = ' + str(len(ctx.analysis.ingredient))))
+    if ctx.scheduler is None:
+        root = chooseStatement(ctx, ctx.analysis.ingredient,
+            lambda ele: ele[ctx.program.rng.randint(0, len(ele)-1)])
+    else:
+        root = chooseStatement(ctx, ctx.analysis.ingredient,
+            lambda ele: ctx.scheduler.choose(ele, ctx.program.rng))
+    ctx.program.root = root
+    if isinstance(root, pFunc):
+        print(Yellow('ingredient = ' + str(root.funcName)))
+    if isinstance(root, pFunc):
+        generateFunc(ctx, root, f, True)
+
+    elif isinstance(root, pWith):
+        generateWith(ctx, root, f, True)
 
     else:
         raise Exception('Unexpected element of ingredient')
-        
-    f.close()
 
+header = re.compile(r'# TVMfuzz seed (\d+) snapshot (\w+)')
+
+def programHeader(text):
+
+    '''the seed and the snapshot of the program text, from its first line'''
+
+    match = header.match(text)
+    if not match:
+        return None, None
+    return int(match.group(1)), match.group(2)
+
+def generateProgram(ctx, f):
+
+    '''
+        the statements come first, the imports they need are known
+        after; the first line tells the seed and the snapshot that
+        replay needs to draw the program again
+    '''
+
+    program = io.StringIO()
+    generateStatements(ctx, program)
+    text = program.getvalue()
+    f.write('# TVMfuzz seed ' + str(ctx.program.seed) + \
+            ' snapshot ' + str(ctx.analysis.snapshot) + '\n')
+    generateImports(ctx, text, f)
+    f.write(text)
+
+def generate(ctx, path='byproduct/program.py', seed=None):
+
+    '''the program, and next to it what its statements need'''
+
+    ctx.reset(seed)
+    f = open(path, 'w')
+    try:
+        program = io.StringIO()
+        generateProgram(ctx, program)
+        f.write(program.getvalue())
+    finally:
+        f.close()
+    writeDependencies(path, program.getvalue())
+
+def replay(ctx, seed, snapshot=None):
+
+    '''
+        the text of the program drawn with seed, byte for byte;
+        with snapshot, the graph of ctx must be the one it names.
+        a program steered by a scheduler also depends on its
+        weights, and ctx must hold a scheduler in the same state
+    '''
+
+    if snapshot is not None and snapshot != str(ctx.analysis.snapshot):
+        raise Exception(Cyan('the program was drawn from snapshot ' + snapshot + \
+            ' but the analysis is snapshot ' + str(ctx.analysis.snapshot)))
+    ctx.reset(seed)
+    program = io.StringIO()
+    generateProgram(ctx, program)
+    return program.getvalue()
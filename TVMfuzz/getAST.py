@@ -1,17 +1,27 @@
 import ast
-import os
 from TVMfuzz.colors import *
 from TVMfuzz.analyzeSyntax import dealWithStatement, dealWithImport
 from TVMfuzz.ASTutils import *
-import random 
 from TVMfuzz.elements import *
 import copy
+from TVMfuzz.helpers import recordHelper
 
 class NodeTransformer(ast.NodeTransformer):                
 
-    def visit_ClassDef(self, node):
-        helperFuncDef[node.name] = node
-        funcDefs.append(node)
+    def __init__(self, ctx):
+        super().__init__()
+        self.ctx = ctx
+
+    def helperParents(self, func):
+        ctx = self.ctx
+        tp = ()
+        if func and func in ctx.helperStatDef_local:
+            tp = ctx.helperStatDef_local[func]
+        return tuple(ctx.helperStatDef_global) + tuple(ctx.funcDefs) + tp
+
+    def visit_ClassDef(self, node, func=None):
+        recordHelper(self.ctx, node, self.helperParents(func))
+        self.ctx.funcDefs.append(node)
 
     def visit_FunctionDef(self, FunctionDef, func=None):
 
@@ -23,29 +33,28 @@ class NodeTransformer(ast.NodeTransformer):
                 if isinstance(ele, ast.Return):
                     copy = True
                     break
+        ctx = self.ctx
         if FunctionDef.name not in forbiddenFuncDef:
-            helperFuncDef[FunctionDef.name] = FunctionDef
-            tp = ()
-            if func and func in helperStatDef_local:
-                tp = helperStatDef_local[func]
-            funcDefParents[FunctionDef] = tuple(helperStatDef_global) + \
-                                          tuple(funcDefs) + \
-                                          tp            
-            funcDefs.append(FunctionDef)
+            recordHelper(ctx, FunctionDef, self.helperParents(func))
+            ctx.funcDefs.append(FunctionDef)
         if copy:
-            functionDefNames.add(FunctionDef.name)
+            ctx.functionDefNames.add(FunctionDef.name)
 
-        elif not random.randint(0, 14):
+        else:
 
-            funcID = int(os.getenv('funcID'))
-            funcID += 1
-            os.environ['isFunc'] = 'True'
-            os.environ['funcID'] = str(funcID)
+            '''
+                the body gets a scope of its own, left again afterwards;
+                its statements are tagged with it, for generation to
+                decide which bodies a program draws from
+            '''
+            outer = ctx.body
+            ctx.body = (outer + '.' if outer else ctx.source + '::') + FunctionDef.name
+            ctx.symbols.enterScope()
             function_body = FunctionDef.body
             for function_element in function_body:
 
                 if isinstance(function_element, ast.Assign):
-                    AssignNode(function_element, func=FunctionDef)
+                    AssignNode(ctx, function_element, func=FunctionDef)
                 elif isinstance(function_element, ast.Expr):
                     self.visit_Expr(function_element)
                 elif isinstance(function_element, ast.With):
@@ -53,7 +62,9 @@ class NodeTransformer(ast.NodeTransformer):
                 elif isinstance(function_element, ast.FunctionDef):
                     self.visit_FunctionDef(function_element, func=FunctionDef)
                 elif isinstance(function_element, ast.ClassDef):
-                    self.visit_ClassDef(function_element)
+                    self.visit_ClassDef(function_element, func=FunctionDef)
+            ctx.symbols.leaveScope()
+            ctx.body = outer
 
     def visit_WithItems(self, With, surround=None, indent=0):
 
@@ -64,9 +75,9 @@ class NodeTransformer(ast.NodeTransformer):
             param1 = None
             param2 = None
             if hasattr(item, 'context_expr'):
-                param1 = recognizeMultiAssignment(item.context_expr, indent=indent)
+                param1 = recognizeMultiAssignment(self.ctx, item.context_expr, indent=indent)
                 if isinstance(param1, pFunc):
-                    randomname = varNameGenerator(varnamesRead)
+                    randomname = varNameGenerator(self.ctx.varnamesRead, self.ctx.rng)
                     pfunc = pFunc(funcName=param1.funcName,
                                 params=param1.params,
                                 suffix=param1.suffix, 
@@ -76,10 +87,12 @@ class NodeTransformer(ast.NodeTransformer):
                     if pfunc.restricted:
                         pfunc.add_Type('restrictedFunc')
                     pfunc.add_surround(surround)
-                    pfunc.add_child(param)
                     vparam = pVar(randomname)
                     param1 = copy.deepcopy(vparam)
-                    dealWithStatement(param=pfunc, varobjects=[vparam])
+                    dealWithStatement(self.ctx, param=pfunc, varobjects=[vparam])
+                    # the statement pfunc was folded into, if it was met before
+                    pfunc = self.ctx.funcNameTopFunc.get(pfunc.funcName, pfunc)
+                    pfunc.add_child(param)
                     param.add_parent(pfunc)
                     param1.update_varTofunc_ele(pfunc)
 
@@ -90,7 +103,7 @@ class NodeTransformer(ast.NodeTransformer):
                     raise Exception(Cyan('with context_expr\'s type is not handled: ' \
                             + str(param1)))
             if item.optional_vars:
-                param2 = recognizeMultiAssignment(item.optional_vars, indent=indent)
+                param2 = recognizeMultiAssignment(self.ctx, item.optional_vars, indent=indent)
             param.add_withitem((param1, param2))
             param.add_surround(surround)
             param.add_indent(indent)
@@ -104,49 +117,50 @@ class NodeTransformer(ast.NodeTransformer):
             elif isinstance(ele, ast.With):
                 self.visit_With(ele, param, indent+1)
             elif isinstance(ele, ast.Assign):
-                AssignNode(ele, param, indent+1, func=func)
+                AssignNode(self.ctx, ele, param, indent+1, func=func)
 
     def visit_With(self, With, surround=None, indent=0, func=None):
         param = self.visit_WithItems(With, surround=surround, indent=indent)
-        dealWithStatement(param=param)
+        dealWithStatement(self.ctx, param=param)
         self.visit_WithBody(With, param, indent, func)
 
     def visit_Import(self, Import):
         for name in Import.names:
             if hasattr(name, 'asname') and name.asname:
-                dealWithImport('import', 
+                dealWithImport(self.ctx, 'import', 
                                importWhat=name.name, 
                                asWhat=name.asname)
             else:
-                dealWithImport('import', 
+                dealWithImport(self.ctx, 'import', 
                                 importWhat=name.name)
     
     def visit_ImportFrom(self, ImportFrom):
         for name in ImportFrom.names:
             if hasattr(name, 'asname') and name.asname:
-                dealWithImport('fromImport', 
+                dealWithImport(self.ctx, 'fromImport', 
                                fromWhat=ImportFrom.module,
                                importWhat=name.name, 
                                asWhat=name.asname)
             else:
-                dealWithImport('fromImport', 
+                dealWithImport(self.ctx, 'fromImport', 
                                fromWhat=ImportFrom.module,
                                importWhat=name.name)
     
     def visit_Assign(self, Assign):
-        AssignNode(Assign)
+        AssignNode(self.ctx, Assign)
     
     def visit_Expr(self, Expr, surround=None, indent=0):
         if isinstance(Expr.value, ast.Call):
-            param = recognizeMultiAssignment(value=Expr.value, 
+            param = recognizeMultiAssignment(self.ctx,
+                                             value=Expr.value, 
                                              indent=indent,
                                              surround=surround)
             if not isinstance(param, pFunc):
                 raise Exception('Type error! Expect pFunc but receive ' + str(type(param)))
             if not param.restricted:
-                dealWithStatement(param=param)
+                dealWithStatement(self.ctx, param=param)
             else:
-                dealWithStatement(param=param)
+                dealWithStatement(self.ctx, param=param)
     
     def visit_If(self, node):
         pass
@@ -0,0 +1,102 @@
+import ast
+import astunparse
+
+'''
+    helper definitions of the test files (functions, classes and
+    the statements they rely on) are written into a program only
+    when a statement calls them, and then only once
+'''
+
+def loadedNames(node):
+    return set(ele.id for ele in ast.walk(node)
+               if isinstance(ele, ast.Name) and isinstance(ele.ctx, ast.Load))
+
+def boundNames(node):
+
+    '''names a statement rebinds as a whole'''
+
+    if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+        return set([node.name])
+
+    names = set()
+    if isinstance(node, ast.Assign):
+        for target in node.targets:
+            for ele in ast.walk(target):
+                if isinstance(ele, ast.Name) and isinstance(ele.ctx, ast.Store):
+                    names.add(ele.id)
+    return names
+
+def touchedNames(node):
+
+    '''names a statement rebinds or changes, a.b = 1 changes a'''
+
+    names = boundNames(node)
+    if isinstance(node, ast.Assign):
+        for target in node.targets:
+            while isinstance(target, (ast.Attribute, ast.Subscript)):
+                target = target.value
+            if isinstance(target, ast.Name):
+                names.add(target.id)
+    return names
+
+def helperDependencies(node, parents):
+
+    '''
+        the parents node needs, in their original order, and the
+        names node still needs that none of the parents define;
+        parents are walked backwards keeping the set of names
+        needed so far, like a liveness analysis
+    '''
+
+    needed = loadedNames(node)
+    needed.discard(getattr(node, 'name', None))
+    selected = []
+    for parent in reversed(parents):
+        if touchedNames(parent) & needed:
+            selected.append(parent)
+            needed -= boundNames(parent)
+            needed |= loadedNames(parent)
+    selected.reverse()
+    return tuple(selected), tuple(sorted(needed))
+
+def recordHelper(ctx, node, parents):
+
+    ctx.helperFuncDef[node.name] = node
+    selected, needed = helperDependencies(node, parents)
+    ctx.funcDefParents[node] = selected
+    ctx.helperNames[node] = needed
+
+    for ele in selected + (node, ):
+        if ele not in ctx.helperSource:
+            ctx.helperSource[ele] = astunparse.unparse(ele)
+
+def emitHelper(ctx, name, f):
+
+    '''
+        write the helper called name, what it needs first; every
+        definition and statement goes into a program at most once
+    '''
+
+    analysis = ctx.analysis
+    if name not in analysis.helperFuncDef:
+        return
+
+    node = analysis.helperFuncDef[name]
+    if node in ctx.program.helpers:
+        return
+    ctx.program.helpers.add(node)
+
+    for other in analysis.helperNames.get(node, ()):
+        emitHelper(ctx, other, f)
+
+    for parent in analysis.funcDefParents.get(node, ()):
+        if parent not in ctx.program.helpers:
+            ctx.program.helpers.add(parent)
+            f.write(helperSource(analysis, parent))
+
+    f.write(helperSource(analysis, node))
+
+def helperSource(analysis, node):
+    if node in analysis.helperSource:
+        return analysis.helperSource[node]
+    return astunparse.unparse(node)
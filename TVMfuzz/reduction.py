@@ -0,0 +1,283 @@
+import os
+import ast
+import shutil
+import tempfile
+import argparse
+import astunparse
+from TVMfuzz.colors import *
+from TVMfuzz.triage import crashSignature
+from TVMfuzz.execution import runProgram, sandboxEnv, ForkServer
+from TVMfuzz.dependencies import statementDependencies, readDependencies
+
+'''
+    delta debugging of a crashing program: the smallest program
+    made of its statements, and then of its lines, that still
+    crashes with the same signature; statements are only removed
+    together with those needing them, and the candidates of a
+    round are all run at once, on as many workers as there are
+    cores
+'''
+
+def statementUnits(source):
+
+    '''
+        the top-level statements of source, each with the comments
+        and blank lines above it; the lines when it does not parse
+    '''
+
+    lines = source.splitlines(True)
+    try:
+        body = ast.parse(source).body
+    except SyntaxError:
+        return lineUnits(source)
+
+    units = []
+    start = 0
+    for stmt in body:
+        units.append(''.join(lines[start:stmt.end_lineno]))
+        start = stmt.end_lineno
+    if units and start < len(lines):
+        units[-1] += ''.join(lines[start:])
+    return units
+
+def lineUnits(source):
+    return source.splitlines(True)
+
+def split(units, n):
+
+    '''units in n chunks as even as possible, in order'''
+
+    chunks = []
+    start = 0
+    for i in range(n):
+        end = start + (len(units) - start) // (n - i)
+        chunks.append(units[start:end])
+        start = end
+    return chunks
+
+def withDependencies(kept, dependencies):
+
+    '''kept and everything it needs, in order'''
+
+    closed = set()
+    todo = list(kept)
+    while todo:
+        i = todo.pop()
+        if i not in closed:
+            closed.add(i)
+            todo.extend(dependencies[i])
+    return sorted(closed)
+
+def withoutDependents(current, removed, dependencies):
+
+    '''current without removed and everything that needs it'''
+
+    gone = set(removed)
+    kept = []
+    for i in current:
+        if i in gone or any(j in gone for j in dependencies[i]):
+            gone.add(i)
+        else:
+            kept.append(i)
+    return kept
+
+def ddmin(units, test, dependencies=None):
+
+    '''
+        Zeller's ddmin over the indices of units; test takes a list
+        of candidates, each a list of indices in order, and tells
+        for each of them whether it still fails the same way. the
+        first reproducing subset, else the first complement, wins,
+        so the outcome does not depend on which worker ends first.
+
+        with dependencies, the indices each unit needs, a subset is
+        completed with what it needs and a complement loses what
+        needs the removed chunk, so that no candidate is tried that
+        could only fail on a missing name
+    '''
+
+    current = list(range(len(units)))
+    n = 2
+    while len(current) >= 2:
+        chunks = split(current, n)
+        complements = [[i for i in current if i not in chunk] for chunk in chunks]
+        if dependencies:
+            chunks = [withDependencies(chunk, dependencies) for chunk in chunks]
+            complements = [withoutDependents(current, chunk, dependencies)
+                           for chunk in split(current, n)]
+        candidates = []
+        for candidate in chunks + (complements if n > 2 or dependencies else []):
+            if candidate and len(candidate) < len(current) and \
+                candidate not in candidates:
+                candidates.append(candidate)
+        if candidates:
+            results = test(candidates)
+        else:
+            results = []
+
+        reduced = None
+        for candidate, result in zip(candidates, results):
+            if result:
+                reduced = candidate
+                break
+
+        if reduced is not None and reduced in chunks:
+            current = reduced
+            n = 2
+        elif reduced is not None:
+            current = reduced
+            n = max(n - 1, 2)
+        elif n >= len(current):
+            break
+        else:
+            n = min(n * 2, len(current))
+
+    return [units[i] for i in current]
+
+class Oracle:
+
+    '''
+        runs candidate programs and compares the signature of their
+        crash with the one being reduced; every candidate is kept
+        under the name of the original program, since the name
+        shows up in the Python frames of a signature
+    '''
+
+    def __init__(self, name, signature, jobs=None, timeout=60,
+                 pythonpath=(), python=None, preload=None):
+        self.name = os.path.basename(name)
+        self.signature = signature
+        self.jobs = jobs or os.cpu_count() or 1
+        self.timeout = timeout
+        self.scratch = tempfile.mkdtemp(prefix='tvmfuzz-reduce-')
+        self.tested = {}
+        self.runs = 0
+        self.server = None
+        if preload is not None:
+            self.server = ForkServer(preload, self.jobs, pythonpath, python)
+            self.run = lambda path: self.server.submit(path, self.timeout).result()
+        else:
+            env = sandboxEnv(pythonpath)
+            self.run = lambda path: runProgram(path, self.timeout, env, python)
+
+    def write(self, source):
+        folder = tempfile.mkdtemp(dir=self.scratch)
+        path = os.path.join(folder, self.name)
+        with open(path, 'w') as program:
+            program.write(source)
+        return path
+
+    def reproduces(self, record):
+        return record['status'] in ('error', 'crash') and \
+            crashSignature(record['stderr']) == self.signature
+
+    def test(self, sources):
+
+        '''for each of sources, whether it crashes with the signature'''
+
+        from concurrent.futures import ThreadPoolExecutor
+
+        todo = [source for source in set(sources) if source not in self.tested]
+        paths = [self.write(source) for source in todo]
+        with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+            records = list(pool.map(self.run, paths))
+        for source, path, record in zip(todo, paths, records):
+            self.tested[source] = self.reproduces(record)
+            shutil.rmtree(os.path.dirname(path), ignore_errors=True)
+        self.runs += len(todo)
+        return [self.tested[source] for source in sources]
+
+    def close(self):
+        if self.server:
+            self.server.close()
+        shutil.rmtree(self.scratch, ignore_errors=True)
+
+def reduceUnits(units, oracle, dependencies=None):
+    test = lambda candidates: oracle.test([''.join(units[i] for i in candidate)
+                                           for candidate in candidates])
+    return ddmin(units, test, dependencies)
+
+def programDependencies(path, source):
+
+    '''
+        what the statements of source need, from the sidecar the
+        generator wrote next to path, else worked out here
+    '''
+
+    dependencies = readDependencies(path, source)
+    if dependencies is None:
+        try:
+            dependencies = statementDependencies(source)
+        except SyntaxError:
+            return None
+    return dependencies
+
+def reduceProgram(path, signature=None, jobs=None, timeout=60,
+                  pythonpath=(), python=None, preload=None):
+
+    '''
+        the reduced source of the program path; without signature,
+        the one of the crash path shows when it is run. statements
+        are removed first, then single lines of what is left
+    '''
+
+    with open(path, 'r') as program:
+        source = program.read()
+
+    oracle = Oracle(path, signature, jobs, timeout, pythonpath, python, preload)
+    try:
+        if oracle.signature is None:
+            record = oracle.run(path)
+            if record['status'] not in ('error', 'crash'):
+                raise Exception(Cyan(path + ' does not crash, it ended ' + record['status']))
+            oracle.signature = crashSignature(record['stderr'])
+
+        if not oracle.test([source])[0]:
+            raise Exception(Cyan(path + ' does not crash with signature ' + \
+                oracle.signature))
+
+        units = statementUnits(source)
+        dependencies = programDependencies(path, source)
+        if dependencies is not None and len(dependencies) != len(units):
+            dependencies = None
+        source = ''.join(reduceUnits(units, oracle, dependencies))
+        source = ''.join(reduceUnits(lineUnits(source), oracle))
+        print(Green('reduced ' + path + ' to ' + str(len(lineUnits(source))) + \
+            ' lines in ' + str(oracle.runs) + ' runs'))
+        return source
+    finally:
+        oracle.close()
+
+def main():
+
+    parser = argparse.ArgumentParser(description='Reduce a crashing program')
+    parser.add_argument('program')
+    parser.add_argument('-s', '--signature', default=None,
+                        help='signature to keep (default: the program\'s own)')
+    parser.add_argument('-o', '--output', default=None,
+                        help='file receiving the reduced program (default: PROGRAM.reduced.py)')
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help='candidates run at once (default: all cores)')
+    parser.add_argument('--timeout', type=float, default=60,
+                        help='seconds a candidate may run before it is killed')
+    parser.add_argument('--pythonpath', action='append', default=[], metavar='DIR',
+                        help='folder put first on the path of the candidates')
+    parser.add_argument('--fork-server', action='store_true',
+                        help='fork the candidates off a process that ran the program\'s imports')
+    args = parser.parse_args()
+
+    preload = None
+    if args.fork_server:
+        with open(args.program, 'r') as program:
+            preload = [astunparse.unparse(stmt) for stmt in ast.parse(program.read()).body
+                       if isinstance(stmt, (ast.Import, ast.ImportFrom))]
+
+    source = reduceProgram(args.program, args.signature, args.jobs, args.timeout,
+                           args.pythonpath, preload=preload)
+    output = args.output or os.path.splitext(args.program)[0] + '.reduced.py'
+    with open(output, 'w') as reduced:
+        reduced.write(source)
+    print(Green('written to ' + output))
+
+if __name__ == '__main__':
+    main()
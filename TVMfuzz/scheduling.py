@@ -0,0 +1,191 @@
+import os
+import json
+import random
+from TVMfuzz.colors import *
+from TVMfuzz.syntax import pFunc
+from TVMfuzz.utils import WeightedSampler
+from TVMfuzz.generation import generate
+from TVMfuzz.campaign import streamSeed, programPath
+from TVMfuzz.execution import executePrograms, ForkServer
+
+'''
+    coverage feedback in the manner of AFL: every ingredient,
+    producer and constant has an energy, its weight when they are
+    drawn, which starts from a weights file or at 1. the statements
+    of a program that reached lines or branches of the target no
+    program reached before gain energy, those of the other programs
+    lose what they gained, slowly. constants are credited the
+    same way, by their text
+'''
+
+def weightKey(ele):
+
+    '''the name a weights file gives ele by'''
+
+    if isinstance(ele, pFunc):
+        return ele.funcName.split(ele.funcNameSuffix)[0] \
+            if ele.funcNameSuffix else ele.funcName
+    if isinstance(ele, str):
+        return ele
+    return None
+
+def loadWeights(path):
+
+    '''a JSON object of initial energies, {"tvm.IRModule.from_expr": 4, "NCHW": 2}'''
+
+    with open(path, 'r') as weights:
+        weights = json.load(weights)
+    if not isinstance(weights, dict):
+        raise Exception(Cyan(path + ' does not hold a JSON object'))
+    return weights
+
+class EnergyScheduler:
+
+    '''
+        the weights of roots, producers and constants; every set
+        of candidates gets an alias table, whose weights follow the
+        energies, so a draw stays O(1) however large the set is.
+        weights, a dict, gives the initial energy of a function by
+        its name, or of a constant by its text
+    '''
+
+    def __init__(self, weights=None, boost=2.0, decay=0.8, cap=64.0):
+        self.boost = boost
+        self.decay = decay
+        self.cap = cap
+        self.initial = weights or {}
+        self.energy = {} # param or constant -> weight
+        self.seen = set() # locations of the target reached so far
+        self.samplers = {} # id of a set of candidates -> (the set, its sampler)
+        self.members = {} # candidate -> samplers it is in
+
+    def weightOf(self, ele):
+        if ele not in self.energy:
+            self.energy[ele] = float(self.initial.get(weightKey(ele), 1.0))
+        return self.energy[ele]
+
+    def sampler(self, candidates):
+        key = id(candidates)
+        if key not in self.samplers or len(self.samplers[key][1]) != len(candidates):
+            if key in self.samplers:
+                self.forget(self.samplers[key][1])
+            items = list(candidates)
+            sampler = WeightedSampler(items, [self.weightOf(ele) for ele in items])
+            self.samplers[key] = (candidates, sampler)
+            for ele in items:
+                self.members.setdefault(ele, []).append(sampler)
+        return self.samplers[key][1]
+
+    def forget(self, sampler):
+
+        '''a sampler replaced by a new one no longer follows energies'''
+
+        for ele in sampler.items:
+            members = self.members[ele]
+            members.remove(sampler)
+            if not members:
+                del self.members[ele]
+
+    def choose(self, candidates, rng=random):
+        if not candidates:
+            raise Exception(Cyan('Cannot choose from no candidates'))
+        return self.sampler(candidates).sample(rng)
+
+    def setEnergy(self, ele, energy):
+        self.energy[ele] = energy
+        for sampler in self.members.get(ele, ()):
+            sampler.setWeight(ele, energy)
+
+    def feedback(self, params, coverage):
+
+        '''
+            credit params, the statements and constants of one
+            program, with what it reached; returns how many locations
+            were new
+        '''
+
+        new = len(coverage - self.seen)
+        self.seen.update(coverage)
+        for param in params:
+            energy = self.weightOf(param)
+            if new:
+                energy = min(energy * self.boost, self.cap)
+            else:
+                energy = 1.0 + (energy - 1.0) * self.decay
+            self.setEnergy(param, energy)
+        return new
+
+def programParams(ctx):
+
+    '''the statements and constants the program just generated is made of'''
+
+    params = set(ctx.program.funcPool)
+    params.update(ctx.program.withPool)
+    params.update(ctx.program.consts)
+    if ctx.program.root is not None:
+        params.add(ctx.program.root)
+    return params
+
+def fuzzWithCoverage(ctx, output, number, target, batch=None, results=None,
+                     jobs=None, campaign=None, **options):
+
+    '''
+        generate number programs into output batch by batch, each
+        batch run with coverage of the folder target before the
+        next one is drawn; program i is seeded from campaign and i,
+        when campaign is given. options go to executePrograms; with
+        preload, one fork server runs every batch. returns the paths
+        of the programs and their records, which tell how many new
+        locations each program reached
+    '''
+
+    if ctx.scheduler is None:
+        ctx.scheduler = EnergyScheduler()
+    jobs = jobs or os.cpu_count() or 1
+    batch = batch or 2 * jobs
+
+    server = None
+    preload = options.pop('preload', None)
+    if preload is not None:
+        server = ForkServer(preload, jobs, options.get('pythonpath', ()), options.get('python'))
+
+    paths = []
+    records = []
+    sink = open(results, 'w') if results else None
+    try:
+        for start in range(0, number, batch):
+            batchPaths = []
+            used = []
+            for i in range(start, min(start + batch, number)):
+                path = programPath(output, i)
+                try:
+                    generate(ctx, path, None if campaign is None else streamSeed(campaign, i))
+                except Exception as e:
+                    print(Red('program ' + str(i) + ' failed: ' + str(e)))
+                    os.remove(path)
+                    continue
+                batchPaths.append(path)
+                used.append(programParams(ctx))
+
+            batchRecords = executePrograms(batchPaths, jobs=jobs, coverage=target,
+                                           server=server, **options)
+            new = 0
+            for record, params in zip(batchRecords, used):
+                record['new'] = ctx.scheduler.feedback(params, record.get('coverage', set()))
+                new += record['new']
+                if sink:
+                    sink.write(json.dumps({key: record[key] for key in record
+                                           if key != 'coverage'}) + '\n')
+                    sink.flush()
+            print(Green('batch ' + str(start // batch) + ': ' + str(new) + \
+                ' new locations, ' + str(len(ctx.scheduler.seen)) + ' in all'))
+
+            paths.extend(batchPaths)
+            records.extend(batchRecords)
+    finally:
+        if server:
+            server.close()
+        if sink:
+            sink.close()
+
+    return paths, records
@@ -0,0 +1,101 @@
+from TVMfuzz.colors import *
+
+'''
+    kinds of definitions, named after the dictionaries they replace
+
+    function: a = fun()         (varTofuncst)
+    cls:      a.b = ...         (clsInstanceToParam)
+    record:   a = b             (records)
+    with:     with x as a:      (varTowith)
+    subs:     a[0] = ...        (fullstrTopsubs)
+'''
+kinds = ('function', 'cls', 'record', 'with', 'subs')
+
+class Symbol:
+
+    def __init__(self, kind, value, st_id):
+
+        if kind not in kinds:
+            raise Exception(Cyan('Incorrect Symbol kind: ' + str(kind)))
+
+        self.kind = kind
+        self.value = value # the Param, or (pWith, withitem_id) for with
+        self.st_id = st_id
+
+class TrieNode:
+
+    def __init__(self):
+        self.children = {} # next dotted segment -> TrieNode
+        self.symbol = None
+
+class SymbolTable:
+
+    '''
+        names defined so far, one scope per function body on top
+        of the file scope; a lookup returns the latest definition
+        in the innermost scope that knows the name
+
+        every scope is a trie over the dotted segments of the
+        names, so the longest defined prefix of a.b.c.d is found
+        in one walk instead of probing a, a.b, a.b.c and a.b.c.d
+    '''
+
+    def __init__(self):
+        self.scopes = [TrieNode()]
+
+    def enterScope(self):
+        self.scopes.append(TrieNode())
+
+    def leaveScope(self):
+        if len(self.scopes) == 1:
+            raise Exception(Cyan('Cannot leave the file scope'))
+        self.scopes.pop()
+
+    def define(self, name, kind, value, st_id):
+        node = self.scopes[-1]
+        for segment in name.split('.'):
+            if segment not in node.children:
+                node.children[segment] = TrieNode()
+            node = node.children[segment]
+        node.symbol = Symbol(kind, value, st_id)
+
+    def lookup(self, name):
+        segments = name.split('.')
+        for scope in reversed(self.scopes):
+            node = scope
+            for segment in segments:
+                node = node.children.get(segment)
+                if node is None:
+                    break
+            if node is not None and node.symbol is not None:
+                return node.symbol
+        return None
+
+    def lookupPrefix(self, name, proper=False):
+
+        '''
+            the longest prefix of name defined in any scope, the
+            inner scope winning between prefixes of equal length;
+            with proper set the whole name is not a candidate.
+            returns (prefix, symbol), or (None, None)
+        '''
+
+        segments = name.split('.')
+        if proper:
+            segments.pop()
+
+        symbol = None
+        depth = 0
+        for scope in reversed(self.scopes):
+            node = scope
+            for i in range(len(segments)):
+                node = node.children.get(segments[i])
+                if node is None:
+                    break
+                if node.symbol is not None and i + 1 > depth:
+                    symbol = node.symbol
+                    depth = i + 1
+
+        if symbol is None:
+            return None, None
+        return '.'.join(segments[:depth]), symbol
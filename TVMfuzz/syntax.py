@@ -1,4 +1,5 @@
 from TVMfuzz.colors import *
+from TVMfuzz.utils import IndexedSet
 import ast
 
 def mainstring(self, string, surround, restname, prefix):
@@ -54,9 +55,10 @@ class Param:
         self.surround = None
         self.restname = ''
         self.parents = {} # a dict mapping param to the number of the param
-        self.children = set() # a set of params
+        self.children = IndexedSet() # a set of params, in the order they were met
         self.varobjects = [] # list of param (variable)
-        self.masters = set()
+        self.masters = IndexedSet()
+        self.bodies = None # test function bodies the statement was met in
         self.shouldBeAdjunct = False
         self.indent = -1
 
@@ -72,7 +74,7 @@ class Param:
         self.indent = indent
     
     def update_masters(self, masters):
-        if not isinstance(masters, set) and masters != None:
+        if not isinstance(masters, (set, IndexedSet)) and masters != None:
             raise Exception(Cyan('Type error! Expect set but receive ' + str(type(masters))))
         self.masters.update(masters)
 
@@ -132,7 +134,7 @@ class pConst(Param):
         if not isinstance(const, str) and const != None:
             raise Exception(Cyan('Type error! Expect str but receive ' + str(type(const))))
         self.const = const
-        self.consts = set()
+        self.consts = IndexedSet()
         if const: self.consts.add(const)
 
     def add_const(self, const):
@@ -142,7 +144,7 @@ class pConst(Param):
         self.consts.add(const)
     
     def add_consts_set(self, consts):
-        if not isinstance(consts, set):
+        if not isinstance(consts, (set, IndexedSet)):
             raise Exception(Cyan('Type error! Expect set but receive ' + str(type(consts))))
         self.consts.update(consts)
     
@@ -203,9 +205,9 @@ class pVar(Param):
         
         super().__init__()
         self.name = name
-        self.varTofunc = set()
-        self.varTocls = set()
-        self.varTowith = set()
+        self.varTofunc = IndexedSet()
+        self.varTocls = IndexedSet()
+        self.varTowith = IndexedSet()
         self.Type = 'variable'
     
     def add_name(self, name):
@@ -219,7 +221,7 @@ class pVar(Param):
         self.varTocls.add(ele)
 
     def update_varTofunc_set(self, se):
-        if not isinstance(se, set):
+        if not isinstance(se, (set, IndexedSet)):
             raise Exception(Cyan('Type error! Expect set but receive ' + str(type(se))))
         self.varTofunc.update(se)
     
@@ -590,7 +592,7 @@ class pFunc(Param):
         self.restricted = restricted
         self.suffix = suffix
         self.indent = indent
-        self.adjuncts = set()
+        self.adjuncts = IndexedSet()
         self.surround = surround
 
     def add_adjunct(self, adjunct):
@@ -0,0 +1,339 @@
+import re
+import os
+import json
+import zlib
+import random
+import hashlib
+import numpy as np
+from TVMfuzz.elements import message
+from TVMfuzz.utils import levenshteinMany
+
+'''
+    crashes are put into buckets by a signature: the failed check
+    and the innermost frames of the native backtrace, with the
+    addresses, offsets, paths, timestamps and numbers taken out,
+    so that two runs of one bug agree on it and bucketing a crash,
+    or matching it to a known bug, is a dictionary lookup
+'''
+
+btFrame = re.compile(r'\[bt\] \((\d+)\) (\S*?)\((.*)\+0x[0-9a-fA-F]+\) \[0x[0-9a-fA-F]+\]')
+pyFrame = re.compile(r'File "([^"]+)", line (\d+)(?:, in (\S+))?')
+checkFailed = re.compile(r'Check failed: (.*)')
+timestamp = re.compile(r'\[\d\d:\d\d:\d\d\] ')
+directory = re.compile(r'(?:/[^\s/:"()\[\]]+)+/')
+hexNumber = re.compile(r'0x[0-9a-fA-F]+')
+number = re.compile(r'\d+')
+versus = re.compile(r'\s*\([^()]* vs\. [^()]*\)\s*$')
+quoted = re.compile(r'\'[^\']*\'|"[^"]*"')
+generatedName = re.compile(r'\b[A-Za-z][A-Za-z0-9]{4}\b')
+wordName = re.compile(r'[A-Z]?[a-z]+\d*|[A-Z]+\d*')
+nameErrors = ('NameError', 'ImportError', 'ModuleNotFoundError', 'AttributeError')
+noiseFrames = ('LogMessageFatal', 'LogFatal', 'get_last_ffi_error')
+
+def normalize(text):
+    text = timestamp.sub('', text)
+    text = directory.sub('', text)
+    text = hexNumber.sub('ADDR', text)
+    text = number.sub('N', text)
+    return ' '.join(text.split())
+
+def dropGeneratedNames(text):
+
+    '''
+        the variables of a generated program are five random
+        letters and digits; a name that reads like a word, such
+        as shape, Tuple or int32, is kept
+    '''
+
+    return generatedName.sub(lambda match: match.group(0)
+        if wordName.fullmatch(match.group(0)) else '.', text)
+
+def exceptionLine(line):
+
+    '''
+        the names quoted in most messages are generated ones, but
+        those of a NameError, an ImportError or an AttributeError
+        say which name was missing
+    '''
+
+    if line.split(':')[0].split('.')[-1] in nameErrors:
+        line = quoted.sub(lambda match: dropGeneratedNames(match.group(0)), line)
+    else:
+        line = quoted.sub("'.'", line)
+    return normalize(line)
+
+def frameFile(path):
+
+    '''program_7.py, bundle snippet <program_3> and the like alike'''
+
+    return normalize(os.path.splitext(os.path.basename(path))[0].strip('<>'))
+
+def frameName(symbol):
+
+    '''the function of a [bt] frame without its parameter list'''
+
+    return normalize(symbol.split('(')[0])
+
+def checkCondition(line):
+
+    '''
+        the condition of a Check failed line: the values it was
+        checked with and the message after it say which instance
+        of the bug this is, not which bug
+    '''
+
+    text = checkFailed.search(line).group(1)
+    for separator in (' : ', ': '):
+        if separator in text:
+            text = text.split(separator)[0]
+            break
+    return normalize(versus.sub('', text.rstrip(' :')))
+
+def parseCrash(text):
+
+    '''
+        the parts of a crash report the signature is made from;
+        frames run from the innermost one outwards
+    '''
+
+    text = timestamp.sub('', text)
+    crash = {'frames': [], 'check': None, 'pyFrames': [], 'exception': None,
+             'diagnostic': None, 'moduleLine': None}
+
+    '''only the first backtrace, later ones report the error again'''
+    block = {}
+    for line in text.splitlines():
+        line = line.strip()
+        match = btFrame.search(line)
+        if match:
+            index = int(match.group(1))
+            if index in block:
+                break
+            block[index] = match.group(3)
+    for index in sorted(block):
+        symbol = block[index]
+        if symbol and not any(noise in symbol for noise in noiseFrames):
+            crash['frames'].append(frameName(symbol))
+
+    inModule = False
+    for line in text.splitlines():
+        line = line.strip()
+        if 'Check failed: ' in line and crash['check'] is None:
+            crash['check'] = checkCondition(line)
+            continue
+
+        match = pyFrame.search(line)
+        if match:
+            path, func = match.group(1), match.group(3)
+            inModule = not func or func == '<module>'
+            if not inModule:
+                crash['pyFrames'].append((frameFile(path), func))
+            continue
+
+        '''the line of the innermost top-level frame'''
+        if inModule and line and not line.startswith('Traceback'):
+            crash['moduleLine'] = normalize(dropGeneratedNames(line))
+        inModule = False
+
+        if re.match(r'^[\w.]+(Error|Exception|Interrupt|Exit)\b', line):
+            crash['exception'] = exceptionLine(line)
+
+        elif 'error: ' in line and crash['diagnostic'] is None:
+            '''file:10:18: parse error: ... and the like'''
+            crash['diagnostic'] = normalize(line[line.index('error: '):])
+
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    if crash['diagnostic'] is None and lines:
+        crash['diagnostic'] = normalize(lines[0])
+
+    crash['pyFrames'].reverse()
+    return crash
+
+def crashSignature(text, k=5):
+
+    '''
+        the bucket of a crash report: the failed check with the
+        k innermost native frames, or, for a crash in Python only,
+        the exception with the k innermost Python frames, or with
+        the line of the program it was raised on when it has none
+    '''
+
+    crash = parseCrash(text)
+    if crash['check'] or crash['frames']:
+        parts = ['check ' + str(crash['check'])] + crash['frames'][:k]
+    else:
+        parts = ['exception ' + str(crash['exception'] or crash['diagnostic'])] + \
+                [path + ':' + func for path, func in crash['pyFrames'][:k]]
+        if not crash['pyFrames'] and crash['moduleLine']:
+            parts.append('line ' + crash['moduleLine'])
+    return hashlib.sha1('\n'.join(parts).encode()).hexdigest()[:16]
+
+word = re.compile(r'\w+')
+
+def shingles(text, k=3):
+
+    '''the runs of k words of the normalized text, hashed'''
+
+    words = word.findall(normalize(text))
+    if len(words) < k:
+        words = words + [''] * (k - len(words))
+    return set(zlib.crc32(' '.join(words[i:i+k]).encode())
+               for i in range(len(words) - k + 1))
+
+class MinHashIndex:
+
+    '''
+        reports by MinHash signature, split into bands of rows
+        hashed into tables, so that the reports sharing a band
+        with a query, the candidates, are found without looking
+        at the others; two reports of Jaccard similarity s share
+        a band with probability 1 - (1 - s^rows)^bands
+    '''
+
+    prime = (1 << 31) - 1
+
+    def __init__(self, bands=16, rows=4, k=3, seed=1):
+        self.bands = bands
+        self.rows = rows
+        self.k = k
+        rng = random.Random(seed) # the same hashes in every process
+        n = bands * rows
+        self.a = np.array([rng.randint(1, self.prime - 1) for i in range(n)],
+                          dtype=np.int64)
+        self.b = np.array([rng.randint(0, self.prime - 1) for i in range(n)],
+                          dtype=np.int64)
+        self.tables = [{} for i in range(bands)]
+        self.signatures = {}
+
+    def minhash(self, text):
+        x = np.fromiter(shingles(text, self.k), dtype=np.int64) % self.prime
+        return ((self.a[:, None] * x[None, :] + self.b[:, None]) % self.prime).min(axis=1)
+
+    def bandKeys(self, signature):
+        return [signature[i*self.rows:(i+1)*self.rows].tobytes()
+                for i in range(self.bands)]
+
+    def add(self, name, text):
+        signature = self.minhash(text)
+        self.signatures[name] = signature
+        for table, key in zip(self.tables, self.bandKeys(signature)):
+            table.setdefault(key, []).append(name)
+
+    def query(self, text, threshold=0.5):
+
+        '''
+            the candidates whose estimated similarity to text is at
+            least threshold, most similar first
+        '''
+
+        signature = self.minhash(text)
+        candidates = set()
+        for table, key in zip(self.tables, self.bandKeys(signature)):
+            candidates.update(table.get(key, ()))
+
+        similar = []
+        for name in candidates:
+            similarity = float((self.signatures[name] == signature).mean())
+            if similarity >= threshold:
+                similar.append((similarity, name))
+        similar.sort(key=lambda ele: (-ele[0], ele[1]))
+        return similar
+
+class CrashIndex:
+
+    '''
+        buckets of crashes by signature, and the known bugs of
+        message by signature, version and position in the list.
+        a new bucket that neither matches a known bug nor shares
+        a MinHash band with one is compared by edit distance, up
+        to distance times the length of its normalized report
+    '''
+
+    def __init__(self, k=5, known=message, threshold=0.5, distance=0.25):
+        self.k = k
+        self.threshold = threshold
+        self.distance = distance
+        self.knownReports = known
+        self.buckets = {}
+        self.similar = {}
+        self.known = {}
+        self.reports = MinHashIndex()
+        for version in known:
+            for i in range(len(known[version])):
+                self.addKnownBug(version + '#' + str(i), known[version][i])
+
+    def addKnownBug(self, name, text):
+        self.known.setdefault(crashSignature(text, self.k), name)
+        self.reports.add(name, text)
+
+    def add(self, program, text):
+
+        '''
+            the signature of the crash, and whether it is a new
+            bucket; a new bucket is compared once with the reports
+            of the known bugs, for those it does not match exactly
+        '''
+
+        signature = crashSignature(text, self.k)
+        new = signature not in self.buckets
+        if new:
+            self.similar[signature] = [name for similarity, name in
+                                       self.reports.query(text, self.threshold)]
+            if not self.similar[signature] and signature not in self.known:
+                bound = int(self.distance * len(normalize(text)))
+                self.similar[signature] = [name for distance, name in
+                    nearestKnownBugs(text, bound, self.knownReports)]
+        self.buckets.setdefault(signature, []).append(program)
+        return signature, new
+
+    def knownBug(self, signature):
+
+        '''the known bug of the bucket, the exact one or the most similar'''
+
+        if signature in self.known:
+            return self.known[signature]
+        similar = self.similar.get(signature)
+        return similar[0] if similar else None
+
+    def summary(self):
+        return {signature: {'known': self.known.get(signature),
+                            'similar': self.similar.get(signature, []),
+                            'programs': programs}
+                for signature, programs in self.buckets.items()}
+
+def bucketRecords(records, path=None, k=5):
+
+    '''
+        bucket the records of executePrograms that did not end
+        well, by their stderr; the buckets go to the JSON file path
+    '''
+
+    index = CrashIndex(k)
+    for record in records:
+        if record['status'] in ('error', 'crash'):
+            record['signature'], _ = index.add(record['program'], record['stderr'])
+
+    if path:
+        with open(path, 'w') as buckets:
+            json.dump(index.summary(), buckets, indent=2)
+    return index
+
+def nearestKnownBugs(text, bound=None, known=message):
+
+    '''
+        the known bugs by edit distance of their normalized report
+        to the normalized text, closest first, for a crash whose
+        signature matches none of them; with bound, only the bugs
+        at most bound away
+    '''
+
+    names = []
+    reports = []
+    for version in known:
+        for i in range(len(known[version])):
+            names.append(version + '#' + str(i))
+            reports.append(normalize(known[version][i]))
+
+    distances = levenshteinMany(normalize(text), reports, bound)
+    return sorted((distance, name) for distance, name in zip(distances, names)
+                  if bound is None or distance <= bound)
@@ -1,43 +1,251 @@
 import random
-import numpy as np
+from TVMfuzz.colors import *
 
-def varNameGenerator(oneSet):
+def varNameGenerator(oneSet, rng=random):
     name = ''
     while True:
         space = ['a', 'b', 'c', 'd', 'e', 'f', 'g', 'h', 'i', 'j', 'k', 'l',
         'm', 'n', 'o', 'p', 'q', 'r', 's', 't', 'u', 'v', 'w', 'x', 'y', 'z']
         space += ([i.upper() for i in space])
-        name = ''.join(random.choices(space, k=1))
+        name = ''.join(rng.choices(space, k=1))
         space += ['1','2','3','4','5','6','7','8','9','0']
-        name += ''.join(random.choices(space, k=4))
+        name += ''.join(rng.choices(space, k=4))
         if name not in oneSet:
             oneSet.add(name)
             break                
     return name
 
-def levenshtein(seq1, seq2):
-    size_x = len(seq1) + 1
-    size_y = len(seq2) + 1
-    matrix = np.zeros((2, size_y))
-    for x in range(2):
-        matrix [x, 0] = x
-    for y in range(size_y):
-        matrix [0, y] = y
-
-    for x in range(1, size_x):
-        if x >= 2:
-            matrix[x%2, 0] = x
-        for y in range(1, size_y):
-            if seq1[x-1] == seq2[y-1]:
-                matrix [x%2,y] = min(
-                    matrix[(x-1)%2, y] + 1,
-                    matrix[(x-1)%2, y-1],
-                    matrix[x%2, y-1] + 1
-                )
+class IndexedSet:
+
+    '''
+        a set that also keeps its elements in a list, so that
+        drawing a random element is O(1) and allocates nothing;
+        elements keep the order they were first added in
+    '''
+
+    def __init__(self, iterable=()):
+        self.items = []
+        self.positions = {}
+        self.update(iterable)
+
+    def add(self, ele):
+        if ele not in self.positions:
+            self.positions[ele] = len(self.items)
+            self.items.append(ele)
+
+    def update(self, iterable):
+        for ele in iterable:
+            self.add(ele)
+
+    def remove(self, ele):
+        pos = self.positions.pop(ele)
+        last = self.items.pop()
+        if pos < len(self.items):
+            self.items[pos] = last
+            self.positions[last] = pos
+
+    def discard(self, ele):
+        if ele in self.positions:
+            self.remove(ele)
+
+    def choice(self, rng=random):
+        if not self.items:
+            raise Exception(Cyan('Cannot choose from an empty IndexedSet'))
+        return self.items[rng.randint(0, len(self.items)-1)]
+
+    def __getitem__(self, index):
+        return self.items[index]
+
+    def __contains__(self, ele):
+        return ele in self.positions
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+class Multiset:
+
+    '''
+        counts how many times each element has been added and
+        not removed yet; add, remove and membership are all O(1)
+    '''
+
+    def __init__(self):
+        self.counts = {}
+
+    def add(self, ele):
+        self.counts[ele] = self.counts.get(ele, 0) + 1
+
+    def remove(self, ele):
+        if ele not in self.counts:
+            raise Exception(Cyan('Cannot remove an element not in the Multiset'))
+        if self.counts[ele] == 1:
+            del self.counts[ele]
+        else:
+            self.counts[ele] -= 1
+
+    def __contains__(self, ele):
+        return ele in self.counts
+
+    def __len__(self):
+        return sum(self.counts.values())
+
+class WeightedSampler:
+
+    '''
+        draws items with probability proportional to their weight
+        in O(1), from Vose's alias tables; changing a weight only
+        marks the tables stale, and they are built again, in O(n),
+        by the next draw
+    '''
+
+    def __init__(self, items=(), weights=None):
+        self.items = list(items)
+        self.weights = list(weights) if weights is not None else [1.0] * len(self.items)
+        if len(self.weights) != len(self.items):
+            raise Exception(Cyan('Expect one weight per item'))
+        self.positions = dict((self.items[i], i) for i in range(len(self.items)))
+        self.prob = []
+        self.alias = []
+        self.stale = True
+
+    def add(self, ele, weight=1.0):
+        if ele in self.positions:
+            self.setWeight(ele, weight)
+            return
+        self.positions[ele] = len(self.items)
+        self.items.append(ele)
+        self.weights.append(weight)
+        self.stale = True
+
+    def setWeight(self, ele, weight):
+        if weight < 0:
+            raise Exception(Cyan('Negative weight ' + str(weight)))
+        pos = self.positions[ele]
+        if self.weights[pos] != weight:
+            self.weights[pos] = weight
+            self.stale = True
+
+    def weight(self, ele):
+        return self.weights[self.positions[ele]]
+
+    def build(self):
+
+        '''
+            scaled so that the weights average 1, every column i is
+            filled up to 1 by the item alias[i], taken from a column
+            above 1; a draw is a column and a biased coin
+        '''
+
+        n = len(self.items)
+        total = float(sum(self.weights))
+        if n == 0 or total <= 0:
+            raise Exception(Cyan('Cannot sample without a positive weight'))
+        scaled = [weight * n / total for weight in self.weights]
+        self.prob = [1.0] * n
+        self.alias = list(range(n))
+        small = [i for i in range(n) if scaled[i] < 1.0]
+        large = [i for i in range(n) if scaled[i] >= 1.0]
+        while small and large:
+            less = small.pop()
+            more = large.pop()
+            self.prob[less] = scaled[less]
+            self.alias[less] = more
+            scaled[more] = scaled[more] + scaled[less] - 1.0
+            if scaled[more] < 1.0:
+                small.append(more)
             else:
-                matrix [x%2,y] = min(
-                    matrix[(x-1)%2,y] + 1,
-                    matrix[(x-1)%2,y-1] + 1,
-                    matrix[x%2,y-1] + 1
-                )
-    return (matrix[(size_x - 1)%2, size_y - 1])
+                large.append(more)
+        self.stale = False
+
+    def sample(self, rng=random):
+        if self.stale:
+            self.build()
+        i = rng.randrange(len(self.items))
+        if rng.random() < self.prob[i]:
+            return self.items[i]
+        return self.items[self.alias[i]]
+
+    def __contains__(self, ele):
+        return ele in self.positions
+
+    def __len__(self):
+        return len(self.items)
+
+def patternMasks(seq):
+
+    '''for every symbol of seq, the bits of the positions it is at'''
+
+    peq = {}
+    for i in range(len(seq)):
+        peq[seq[i]] = peq.get(seq[i], 0) | (1 << i)
+    return peq
+
+def bitParallel(peq, m, seq, bound=None):
+
+    '''
+        the edit distance between the pattern of peq, of length m,
+        and seq, by Myers' bit-vector algorithm in Hyyro's form: a
+        column of the matrix is two integers of m bits, so a step
+        costs a few operations on machine words instead of m cells;
+        with bound, bound + 1 as soon as the distance must exceed it
+    '''
+
+    n = len(seq)
+    if m == 0:
+        return n if bound is None or n <= bound else bound + 1
+
+    mask = (1 << m) - 1
+    high = 1 << (m - 1)
+    pv = mask
+    mv = 0
+    score = m
+    for j in range(n):
+        eq = peq.get(seq[j], 0)
+        xv = eq | mv
+        xh = ((((eq & pv) + pv) & mask) ^ pv) | eq
+        ph = mv | (~(xh | pv) & mask)
+        mh = pv & xh
+        if ph & high:
+            score += 1
+        elif mh & high:
+            score -= 1
+        ph = ((ph << 1) | 1) & mask
+        mh = (mh << 1) & mask
+        pv = mh | (~(xv | ph) & mask)
+        mv = ph & xv
+
+        '''every symbol left lowers the distance by one at most'''
+        if bound is not None and score - (n - j - 1) > bound:
+            return bound + 1
+    return score
+
+def levenshtein(seq1, seq2, bound=None):
+
+    '''
+        the edit distance between seq1 and seq2, or bound + 1 when
+        it is larger than bound
+    '''
+
+    if len(seq1) > len(seq2):
+        seq1, seq2 = seq2, seq1 # fewer bits in a column
+    return levenshteinMany(seq1, [seq2], bound)[0]
+
+def levenshteinMany(seq, seqs, bound=None):
+
+    '''
+        the edit distances between seq and each of seqs, the bit
+        masks of seq being built once for all of them; with bound,
+        pairs whose lengths differ by more are not compared at all
+    '''
+
+    peq = patternMasks(seq)
+    distances = []
+    for other in seqs:
+        if bound is not None and abs(len(seq) - len(other)) > bound:
+            distances.append(bound + 1)
+        else:
+            distances.append(bitParallel(peq, len(seq), other, bound))
+    return distances
@@ -0,0 +1,108 @@
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, '.')
+from TVMfuzz.elements import message
+from TVMfuzz.utils import levenshtein, levenshteinMany
+from TVMfuzz.triage import normalize
+
+'''
+    the edit distance of TVMfuzz.utils against the numpy one it
+    replaced, on the known bugs of elements.message; run from the
+    root of the repository: python benchmarks/editDistance.py
+'''
+
+def numpyLevenshtein(seq1, seq2):
+    size_x = len(seq1) + 1
+    size_y = len(seq2) + 1
+    matrix = np.zeros((2, size_y))
+    for x in range(2):
+        matrix [x, 0] = x
+    for y in range(size_y):
+        matrix [0, y] = y
+
+    for x in range(1, size_x):
+        if x >= 2:
+            matrix[x%2, 0] = x
+        for y in range(1, size_y):
+            if seq1[x-1] == seq2[y-1]:
+                matrix [x%2,y] = min(
+                    matrix[(x-1)%2, y] + 1,
+                    matrix[(x-1)%2, y-1],
+                    matrix[x%2, y-1] + 1
+                )
+            else:
+                matrix [x%2,y] = min(
+                    matrix[(x-1)%2,y] + 1,
+                    matrix[(x-1)%2,y-1] + 1,
+                    matrix[x%2,y-1] + 1
+                )
+    return (matrix[(size_x - 1)%2, size_y - 1])
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+reports = [report for version in message for report in message[version]]
+
+'''the numpy version takes seconds a pair, it only gets a few short prefixes'''
+pairs = [(reports[i][:400], reports[i+1][:400]) for i in range(0, 10, 2)]
+old = new = 0
+for seq1, seq2 in pairs:
+    expected, seconds = timed(numpyLevenshtein, seq1, seq2)
+    old += seconds
+    distance, seconds = timed(levenshtein, seq1, seq2)
+    new += seconds
+    if distance != expected:
+        raise Exception('distance ' + str(distance) + ' but expected ' + str(expected))
+print('%d pairs of 400 characters: numpy %.3fs, bit-parallel %.4fs, %.0fx' % \
+      (len(pairs), old, new, old / new))
+
+def check(seq1, seq2, distance, expected, bound):
+    if bound is not None and expected > bound:
+        expected = bound + 1
+    if distance != expected:
+        raise Exception('distance ' + str(distance) + ' but expected ' + str(expected) + \
+                        ' with bound ' + str(bound) + ' for ' + repr(seq1[:40]) + \
+                        ' and ' + repr(seq2[:40]))
+
+'''
+    whole normalized reports: the ten shortest against numpy, every
+    pair of them all unbounded against bounded
+'''
+normalized = sorted((normalize(report) for report in reports), key=len)
+shortest = normalized[:10]
+start = time.perf_counter()
+for i in range(len(shortest)):
+    expected = [numpyLevenshtein(shortest[i], other) for other in shortest[i+1:]]
+    for bound in (None, 500, 100):
+        distances = levenshteinMany(shortest[i], shortest[i+1:], bound)
+        for other, distance, exact in zip(shortest[i+1:], distances, expected):
+            check(shortest[i], other, distance, exact, bound)
+print('%d whole normalized reports agree with numpy, bounded or not: %.1fs' % \
+      (len(shortest), time.perf_counter() - start))
+
+for report in normalized:
+    exact = levenshteinMany(report, normalized)
+    for bound in (500, 100):
+        distances = levenshteinMany(report, normalized, bound)
+        for other, distance, expected in zip(normalized, distances, exact):
+            check(report, other, distance, expected, bound)
+print('all %d x %d normalized reports agree unbounded and bounded' % \
+      (len(normalized), len(normalized)))
+
+start = time.perf_counter()
+for report in reports:
+    levenshteinMany(report, reports)
+seconds = time.perf_counter() - start
+print('all %d x %d full reports: %.3fs' % (len(reports), len(reports), seconds))
+
+normalized = [normalize(report) for report in reports]
+for bound in (None, 500, 100):
+    start = time.perf_counter()
+    for report in normalized:
+        levenshteinMany(report, normalized, bound)
+    seconds = time.perf_counter() - start
+    print('all normalized reports, bound %s: %.3fs' % (bound, seconds))
@@ -0,0 +1,73 @@
+import os
+import sys
+import time
+import shutil
+import tempfile
+
+sys.path.insert(0, '.')
+from TVMfuzz.execution import executePrograms, summarize
+
+'''
+    the fork server against fresh interpreters, on programs that
+    import the stub tvm of benchmarks/stub, whose import is slow;
+    both must give every program the same status and output. run
+    from the root of the repository: python benchmarks/forkServer.py
+'''
+
+stub = os.path.join('benchmarks', 'stub')
+
+programs = {
+    'ok': ('import tvm\nprint(tvm.__version__)\n',
+           'ok', 0),
+    'error': ('import tvm\nraise ValueError("bad shape")\n',
+              'error', 1),
+    'crash': ('import tvm\ntvm.abort()\n',
+              'crash', -6),
+    'timeout': ('import tvm\nwhile True:\n    pass\n',
+                'timeout', None),
+    'exit0': ('import sys\nimport tvm\nsys.exit(0)\n',
+              'ok', 0),
+    'exit3': ('import sys\nimport tvm\nsys.exit(3)\n',
+              'error', 3),
+    'exitText': ('import sys\nimport tvm\nsys.exit("giving up")\n',
+                 'error', 1),
+}
+
+def check(records, paths, executor):
+    for record, name in zip(records, paths):
+        source, status, returncode = programs[name]
+        if record['status'] != status:
+            raise Exception(executor + ': ' + name + ' is ' + record['status'] + \
+                            ', expected ' + status + '\n' + record['stderr'])
+        if returncode is not None and record['returncode'] != returncode:
+            raise Exception(executor + ': ' + name + ' exited with ' + \
+                            str(record['returncode']) + ', expected ' + str(returncode))
+    return {name: (record['status'], record['returncode'], record['stdout'])
+            for record, name in zip(records, paths)}
+
+folder = tempfile.mkdtemp(prefix='tvmfuzz-')
+try:
+    names = []
+    paths = []
+    for copy in range(4):
+        for name, (source, status, returncode) in programs.items():
+            path = os.path.join(folder, name + '_' + str(copy) + '.py')
+            with open(path, 'w') as program:
+                program.write(source)
+            names.append(name)
+            paths.append(path)
+
+    outcomes = {}
+    for executor, preload in (('fresh', None), ('fork server', ['import tvm'])):
+        start = time.perf_counter()
+        records = executePrograms(paths, jobs=4, timeout=5, pythonpath=[stub],
+                                  preload=preload)
+        seconds = time.perf_counter() - start
+        outcomes[executor] = check(records, names, executor)
+        print('%s: %d programs in %.1fs, %s' % \
+              (executor, len(paths), seconds, summarize(records)))
+
+    if outcomes['fresh'] != outcomes['fork server']:
+        raise Exception('the executors disagree')
+finally:
+    shutil.rmtree(folder, ignore_errors=True)
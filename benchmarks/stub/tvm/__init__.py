@@ -0,0 +1,16 @@
+import os
+import time
+
+'''
+    a stand-in for TVM whose import is slow, as the real one is;
+    TVMFUZZ_STUB_IMPORT sets how many seconds it takes, 1.5 by
+    default. put its folder first on the path with --pythonpath
+'''
+
+time.sleep(float(os.environ.get('TVMFUZZ_STUB_IMPORT', '1.5')))
+
+__version__ = '0.0.stub'
+
+def abort():
+    '''dies the way a failed native check does'''
+    os.abort()
@@ -1,10 +1,55 @@
-import ast 
-from TVMfuzz.elements import ingredient
+import io
 import os
+import sys
+import json
+import argparse
 from TVMfuzz.colors import *
 from TVMfuzz.elements import *
 import random
 
+parser = argparse.ArgumentParser(description='Build test programs for TVM')
+parser.add_argument('-n', '--number', type=int, default=1,
+                    help='number of programs generated from one analysis pass')
+parser.add_argument('-o', '--output', default='byproduct',
+                    help='folder receiving the numbered programs')
+parser.add_argument('--stream', default=None, metavar='PATH',
+                    help='append all programs to one file instead ("-" for stdout)')
+parser.add_argument('--no-cache', action='store_true',
+                    help='analyze the test files even if a snapshot exists')
+parser.add_argument('-j', '--jobs', type=int, default=None,
+                    help='processes analyzing test files or running programs (default: all cores)')
+parser.add_argument('--bundle', type=int, default=None, metavar='K',
+                    help='write the programs K to a file, as functions of one bundle')
+parser.add_argument('-x', '--execute', action='store_true',
+                    help='run the generated programs, results go to OUTPUT/results.jsonl')
+parser.add_argument('--timeout', type=float, default=60,
+                    help='seconds a program may run before it is killed')
+parser.add_argument('--fork-server', action='store_true',
+                    help='fork the programs off a process that imported the test files\' imports once')
+parser.add_argument('--pythonpath', action='append', default=[], metavar='DIR',
+                    help='folder put first on the path of the programs, e.g. a stub tvm')
+parser.add_argument('--coverage', default=None, metavar='TARGET',
+                    help='steer generation towards new lines and branches of the package folder TARGET (with -x)')
+parser.add_argument('--weights', default=None, metavar='FILE',
+                    help='JSON object weighting functions by name and constants by text')
+parser.add_argument('--seed', type=int, default=None,
+                    help='campaign seed, program i gets a seed hashed from it and i (default: a fresh one)')
+parser.add_argument('--replay', action='append', default=[], metavar='PROGRAM|SEED|CAMPAIGN:INDEX',
+                    help='draw a program again from its seed, into OUTPUT/replay_SEED.py')
+parser.add_argument('--drop-ok', action='store_true',
+                    help='with -x, delete the programs that ran fine, seeds.jsonl keeps their seeds')
+args = parser.parse_args()
+
+if args.coverage and (not args.execute or args.stream or args.bundle):
+    parser.error('--coverage needs --execute and program files')
+
+if args.stream == '-':
+    '''the programs own stdout, every diagnostic goes to stderr'''
+    stream = sys.stdout
+    sys.stdout = sys.stderr
+elif args.stream:
+    stream = open(args.stream, 'a')
+
 if not os.path.exists('byproduct'):
     import platform
     osType = platform.system()
@@ -13,43 +58,174 @@ if not os.path.exists('byproduct'):
 
     elif osType == 'Linux':
         os.makedirs('byproduct')
-        
-record_path = 'byproduct/astTree.txt'
+
+if not os.path.exists(args.output):
+    os.makedirs(args.output)
 
 dir = 'tests/'
 print(Red('dir: '+ dir))
-filelist = os.listdir(dir)
-fileID = 0
-os.environ['funcID'] = str(0)
-os.environ['isFunc'] = str('False')
 
-import random
-random.shuffle(filelist)
+from TVMfuzz.corpus import analyzeCorpus
+analysis = analyzeCorpus(dir, useCache=not args.no_cache, jobs=args.jobs)
+
+f = open('byproduct/log.txt', 'w')
+for ing in analysis.ingredient:
+    f.write('~~~~~~~~~~~~~~~~~~~~\n')
+    f.write(str(ing) + '\n')
+f.close()
 
-for file in filelist:
-    
-    helperStatDef_global.clear()
-    helperStatDef_local.clear()
-    funcDefs.clear()
+from TVMfuzz.generation import generate, generateProgram
+from TVMfuzz.bundle import generateBundle
 
-    fileID += 1
-    os.environ['fileID'] = str(fileID)
-    from TVMfuzz.getAST import *
+'''
+    The analysis above is paid only once; every program below
+    is built from the same ingredient graph, and only the
+    per-program pools are reset in between.
+'''
 
-    file_path = dir + file
+ctx = FuzzContext(analysis)
+if args.weights or args.coverage:
+    from TVMfuzz.scheduling import EnergyScheduler, loadWeights
+    ctx.scheduler = EnergyScheduler(loadWeights(args.weights) if args.weights else None)
+failures = 0
+generated = []
+records = None
+from TVMfuzz.campaign import streamSeed, newCampaign, generatePrograms
+campaign = args.seed if args.seed is not None else newCampaign()
+if not args.replay:
+    print(Green('campaign ' + str(campaign)))
 
-    with open(file_path, 'r') as source:
-	    tree_node = ast.parse(source.read())
+def writeSeed(seeds, path, index, seed):
+    seeds.write(json.dumps({'program': path, 'campaign': campaign, 'index': index,
+                            'seed': seed, 'snapshot': analysis.snapshot}) + '\n')
 
-    with open(record_path, 'w') as astTree:
-        astTree.write(ast.dump(tree_node, indent=2))
+options = dict(results=os.path.join(args.output, 'results.jsonl'),
+               jobs=args.jobs,
+               timeout=args.timeout,
+               pythonpath=args.pythonpath,
+               preload=sorted(analysis.importSet) if args.fork_server else None)
 
-    NodeTransformer().visit(tree_node)
+if args.replay:
 
-f = open('byproduct/log.txt', 'w')
-for ing in ingredient:
-    f.write('~~~~~~~~~~~~~~~~~~~~\n')
-    f.write(str(ing) + '\n')
+    from TVMfuzz.generation import replay, programHeader
+    for ele in args.replay:
+        if os.path.exists(ele):
+            with open(ele, 'r') as program:
+                original = program.read()
+            seed, snapshot = programHeader(original)
+            if seed is None:
+                raise Exception(Cyan(ele + ' does not tell the seed it was drawn with'))
+        elif ':' in ele:
+            original, snapshot = None, None
+            seed = streamSeed(int(ele.split(':')[0]), int(ele.split(':')[1]))
+        else:
+            original, seed, snapshot = None, int(ele), None
+        text = replay(ctx, seed, snapshot)
+        path = os.path.join(args.output, 'replay_' + str(seed) + '.py')
+        with open(path, 'w') as program:
+            program.write(text)
+        generated.append(path)
+        if original is None:
+            print(Green('replayed seed ' + str(seed) + ' into ' + path))
+        elif original == text:
+            print(Green('replayed ' + ele + ' into ' + path + ', identical'))
+        else:
+            print(Red('replayed ' + ele + ' into ' + path + ', it differs'))
+
+elif args.stream:
+
+    for i in range(args.number):
+        ctx.reset(streamSeed(campaign, i))
+        program = io.StringIO()
+        try:
+            generateProgram(ctx, program)
+        except Exception as e:
+            failures += 1
+            print(Red('program ' + str(i) + ' failed: ' + str(e)))
+            continue
+        stream.write('# ---- program ' + str(i) + ' ----\n')
+        stream.write(program.getvalue())
+        stream.flush()
+    stream.close()
+
+elif args.bundle:
+
+    '''snippet i of a bundle is listed in seeds.jsonl as bundle_j.py#i'''
+    bundles = []
+    seeds = open(os.path.join(args.output, 'seeds.jsonl'), 'w')
+    for j in range(0, args.number, args.bundle):
+        path = os.path.join(args.output, 'bundle_' + str(j // args.bundle) + '.py')
+        count = min(args.bundle, args.number - j)
+        with open(path, 'w') as bundle:
+            kept = generateBundle(ctx, bundle, count,
+                                  [streamSeed(campaign, j + i) for i in range(count)])
+        for i in range(len(kept)):
+            writeSeed(seeds, path + '#' + str(i), j + kept[i], streamSeed(campaign, j + kept[i]))
+        failures += count - len(kept)
+        bundles.append((path, len(kept)))
+    seeds.close()
+
+elif args.coverage:
+
+    '''every batch is drawn knowing what the ones before reached'''
+    from TVMfuzz.scheduling import fuzzWithCoverage
+    generated, records = fuzzWithCoverage(ctx, args.output, args.number,
+                                          args.coverage, campaign=campaign, **options)
+    failures = args.number - len(generated)
+
+elif args.number == 1:
+
+    seeds = open(os.path.join(args.output, 'seeds.jsonl'), 'w')
+    generate(ctx, os.path.join(args.output, 'program.py'), streamSeed(campaign, 0))
+    generated.append(os.path.join(args.output, 'program.py'))
+    writeSeed(seeds, generated[-1], 0, ctx.program.seed)
+    seeds.close()
+
+else:
+
+    '''each worker inherits the graph and draws its share of the indices'''
+    seeds = open(os.path.join(args.output, 'seeds.jsonl'), 'w')
+    for index, path, seed, error in generatePrograms(ctx, args.output, args.number, campaign,
+                                                     args.jobs or os.cpu_count() or 1):
+        if error is not None:
+            failures += 1
+            print(Red('program ' + str(index) + ' failed: ' + error))
+            continue
+        generated.append(path)
+        writeSeed(seeds, path, index, seed)
+    seeds.close()
+
+if args.number > 1 and not args.replay:
+    print(Green(str(args.number - failures) + '/' + str(args.number) + \
+        ' programs generated'))
+
+if args.execute and args.stream:
+    print(Red('--execute needs program files, it is ignored with --stream'))
+
+elif args.execute:
+    from TVMfuzz.execution import executePrograms, summarize
+    from TVMfuzz.bundle import executeBundles
+    if args.bundle:
+        records = executeBundles(bundles, **options)
+    elif records is None:
+        records = executePrograms(generated, **options)
+    print(Green('executed ' + str(len(records)) + ' programs: ' + summarize(records)))
+
+    if args.drop_ok and args.bundle:
+        print(Red('--drop-ok keeps bundles, a bundle holds programs that failed too'))
+
+    elif args.drop_ok:
+        '''seeds.jsonl is enough to draw them again'''
+        from TVMfuzz.dependencies import sidecarPath
+        dropped = [record['program'] for record in records if record['status'] == 'ok']
+        for path in dropped:
+            for ele in (path, sidecarPath(path)):
+                if os.path.exists(ele):
+                    os.remove(ele)
+        print(Green('dropped the ' + str(len(dropped)) + ' programs that ran fine'))
 
-from TVMfuzz.generation import generate
-generate()
+    from TVMfuzz.triage import bucketRecords
+    index = bucketRecords(records, os.path.join(args.output, 'buckets.json'))
+    known = [signature for signature in index.buckets if index.knownBug(signature)]
+    print(Green(str(len(index.buckets)) + ' crash buckets, ' + \
+        str(len(known)) + ' of them known bugs'))